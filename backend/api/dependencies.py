@@ -1,10 +1,13 @@
 import asyncio
 import os
 from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
 
 import psycopg
 from dotenv import load_dotenv
-from psycopg_pool import AsyncConnectionPool
+
+if TYPE_CHECKING:
+    from psycopg_pool import AsyncConnectionPool
 
 load_dotenv(override=True)
 
@@ -22,7 +25,33 @@ conninfo = f"""
     sslmode={os.getenv("PG_SSLMODE")}
 """
 
-pool = AsyncConnectionPool(conninfo, open=False)
+_pool: "AsyncConnectionPool | None" = None
+
+
+def get_pool() -> "AsyncConnectionPool":
+    """Returns the connection pool, creating it on first use so that serverless
+    cold starts, which never use it, skip importing psycopg_pool."""
+    global _pool
+    if _pool is None:
+        from psycopg_pool import AsyncConnectionPool
+
+        _pool = AsyncConnectionPool(conninfo, open=False)
+    return _pool
+
+
+# serve the API from `CSV_PATH` instead of the db; see api/services/embedded.py
+EMBEDDED = os.getenv("DATA_BACKEND") == "csv"
+CSV_PATH = os.getenv("CSV_PATH") or os.path.join(
+    os.path.dirname(__file__), "..", "..", "data", "oscars.csv"
+)
+
+# compute stats and rankings with the NumPy columnar store (requires numpy); see
+# api/services/columnar.py
+COLUMNAR = os.getenv("COLUMNAR") == "1"
+
+ALLOWED_ORIGIN_REGEX = (
+    r"http://localhost:\d+|https://oscy.vercel.app|https://oscy.evanxiong.com"
+)
 
 
 @asynccontextmanager
@@ -38,7 +67,7 @@ async def connect():
             yield aconn
     else:
         try:
-            async with pool.connection() as con:
+            async with get_pool().connection() as con:
                 print("Accessing connection pool")
                 yield con
         except:
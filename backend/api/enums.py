@@ -36,3 +36,29 @@ class FilterEntityType(str, Enum):
     person = "person"
     company = "company"
     country = "country"
+
+
+class NominationsSection(str, Enum):
+    editions = "editions"
+    stats = "stats"  # both title_stats and entity_stats
+    title_stats = "title_stats"
+    entity_stats = "entity_stats"
+
+
+class EntityOrTitleSection(str, Enum):
+    rankings = "rankings"
+    nominations = "nominations"
+
+
+class LeaderboardMetric(str, Enum):
+    noms = "noms"
+    wins = "wins"
+    win_rate = "win_rate"
+
+
+class LeaderboardType(str, Enum):
+    title_ = "title"
+    entity = "entity"  # people, companies, and countries
+    person = "person"
+    company = "company"
+    country = "country"
@@ -1,30 +1,53 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, Response
+from fastapi.responses import RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from .dependencies import pool
+from .dependencies import ALLOWED_ORIGIN_REGEX, EMBEDDED, get_pool
 from .enums import AwardType
+from .models.version import Version
 from .routers import (
     categories,
     ceremonies,
     entities_titles,
+    leaderboards,
     nominations,
     search,
+    superlatives,
     version,
 )
-from .services.version import get_current_version
-
-ALLOWED_ORIGIN_REGEX = (
-    r"http://localhost:\d+|https://oscy.vercel.app|https://oscy.evanxiong.com"
+from .services.cache_headers import REDIRECT, cache_control
+from .services.canonical import canonical_redirect
+from .services.imdb_ids import get_imdb_id_map
+from .services.response_cache import (
+    cache_key,
+    cache_response,
+    get_response,
+    is_cacheable,
+    version_etag,
+)
+from .services.snapshot import snapshot_response
+from .services.version import (
+    get_cache_version,
+    get_current_version,
+    set_latest_version,
 )
+from .services.warmup import warm_up
 
 
 @asynccontextmanager
 async def lifespan(instance: FastAPI):
-    await pool.open()
+    if not EMBEDDED:
+        await get_pool().open()
+    # build in-memory IMDb id map before serving requests; it is rebuilt
+    # whenever the data version changes
+    await get_imdb_id_map()
+    # open connections and precompute hot routes, up to WARMUP_TIMEOUT seconds
+    await warm_up(instance)
     yield
-    await pool.close()
+    if not EMBEDDED:
+        await get_pool().close()
 
 
 summary = """
@@ -54,6 +77,13 @@ with optional sorting/filtering.
 * Get nominations, stats, and rankings for a single entity via oscy id.
 * Get nominations, stats, and rankings for a single title via oscy id.
 * Get nominations, stats, and rankings for a single entity or title via IMDb id.
+* Get nominations, stats, and rankings for up to 200 entities, titles, or IMDb
+ids in a single request.
+* Get an entity's most frequent collaborators, or a title's most closely related
+titles, based on shared nominations.
+* Find a shortest chain of collaborators between two entities.
+* Compare nominations and wins of up to 10 entities and titles by ceremony and
+category.
 
 Entities can be people, companies, or countries.
 
@@ -62,10 +92,21 @@ Entities can be people, companies, or countries.
 * List all ceremonies.
 * Get nominations and stats for a single ceremony via oscy id.
 
+### Leaderboards
+
+* Get the top titles or entities by nominations, wins, or win rate, overall or
+within a category group or category, with an optional range of ceremonies.
+
+### Superlatives
+
+* Get the longest nomination streaks and the most nominations before a first
+win.
+
 ### Search
 
 * Perform a paginated text search across titles, entities, categories, and
 ceremonies, with optional filtering for titles and entities.
+* Get prefix-based typeahead suggestions for titles, entities, and categories.
 
 ### Version
 
@@ -96,45 +137,86 @@ async def add_response_headers(request: Request, call_next):
         # do not allow caching of `/version` response
         response.headers["Cache-Control"] = "no-store"
     else:
-        # return 304 Not Modified if If-None-Match request header matches
-        # current version tag
-        if_none_match = request.headers.get("If-None-Match")
-        current_version = await get_current_version(AwardType.oscar)
-        if if_none_match and current_version and if_none_match == current_version.tag:
-            request_tag = request.query_params.get("v")
-            if request_tag and request_tag == current_version.tag:
-                cache_control = "public, max-age=31536000, immutable"
-            else:
-                cache_control = "public, max-age=86400, stale-while-revalidate=60"
+        # versions already looked up by the serverless entry point, if any
+        # (see `api.serverless`)
+        fetched = getattr(request.state, "versions", None)
+        if fetched is not None:
+            current_version = Version(**fetched[0])
+            set_latest_version(AwardType.oscar, current_version)
+        else:
+            current_version = await get_current_version(AwardType.oscar)
+        if not current_version:
+            return await call_next(request)
+
+        # redirect to canonical versioned URL, if enabled
+        location = canonical_redirect(request, current_version.tag)
+        if location:
+            return RedirectResponse(location, headers={"Cache-Control": REDIRECT})
+
+        cache_version = (
+            fetched[1]
+            if fetched is not None
+            else await get_cache_version(
+                current_version,
+                request.url.path,
+                request.query_params.get("include"),
+            )
+        )
+        key = cache_key(
+            request.url.path,
+            request.url.query,
+            request.headers.get("Accept-Encoding", ""),
+        )
+
+        # answer conditional requests for responses too large to cache
+        # without computing them
+        if request.headers.get("If-None-Match") == version_etag(cache_version):
             return Response(
                 status_code=304,
                 headers={
-                    "Cache-Control": cache_control,
-                    "ETag": current_version.tag,
+                    "Cache-Control": cache_control(
+                        request.query_params.get("v"), current_version.tag
+                    ),
+                    "ETag": version_etag(cache_version),
                 },
             )
 
-        response = await call_next(request)
-
-        if current_version:
-            request_tag = request.query_params.get("v")
-            if request_tag and request_tag == current_version.tag:
-                # for versioned requests (with `v` query param) whose version
-                # matches the current version, client/CDN cache can keep data
-                # indefinitely
-                response.headers["Cache-Control"] = (
-                    "public, max-age=31536000, immutable"
-                )
-            else:
-                # default behavior of non-versioned (or incorrectly versioned)
-                # requests: client/CDN cache keeps for 1 day and serves stale
-                # response for up to 1 minute while revalidating ETag in
-                # background
-                response.headers["Cache-Control"] = (
-                    "public, max-age=86400, stale-while-revalidate=60"
+        # serve cached response for the resource's current version, or
+        # pre-rendered response if a complete snapshot exists for the current
+        # version; cache small successful responses along with their ETag
+        cached = get_response(cache_version, key) if request.method == "GET" else None
+        if cached is None:
+            response = snapshot_response(
+                current_version.tag, request
+            ) or await call_next(request)
+            if (
+                request.method == "GET"
+                and response.status_code == 200
+                and is_cacheable(response.headers)
+            ):
+                body = getattr(response, "body", None)
+                if body is None:
+                    body = b"".join([chunk async for chunk in response.body_iterator])
+                cached = cache_response(
+                    cache_version, key, body, dict(response.headers)
                 )
 
-            response.headers["ETag"] = current_version.tag
+        # return 304 Not Modified if If-None-Match request header matches the
+        # response's content hash
+        headers = {
+            "Cache-Control": cache_control(
+                request.query_params.get("v"), current_version.tag
+            )
+        }
+        if cached is None:
+            if request.method == "GET" and response.status_code == 200:  # type: ignore
+                headers["ETag"] = version_etag(cache_version)
+            response.headers.update(headers)  # type: ignore
+        else:
+            headers["ETag"] = cached.etag
+            if request.headers.get("If-None-Match") == cached.etag:
+                return Response(status_code=304, headers=headers)
+            response = Response(cached.body, headers=cached.headers | headers)
 
     return response
 
@@ -147,5 +229,7 @@ app.include_router(nominations.router)
 app.include_router(categories.router)
 app.include_router(entities_titles.router)
 app.include_router(ceremonies.router)
+app.include_router(leaderboards.router)
+app.include_router(superlatives.router)
 app.include_router(search.router)
 app.include_router(version.router)
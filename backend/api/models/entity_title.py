@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from .nominations import Edition
+from ..enums import EntityOrTitleSection
+from .nominations import Edition, EditionRow
 
 
 class CategoryRankings(BaseModel):
@@ -42,8 +43,8 @@ class EntityOrTitle(BaseModel):  # could be title, person, company, country
     aliases: list[str | None]
     total_noms: int
     total_wins: int
-    nominations: list[Edition]
-    rankings: Rankings
+    nominations: list[Edition] | None  # None if not included
+    rankings: Rankings | None
     # rankings: total noms (all and among same type), total wins (all and among same type), wins by cat, noms by cat
 
 
@@ -68,3 +69,98 @@ class RankingsRow(BaseModel):  # used for both entities and titles
     category_wins: int
     category_noms_rank: int
     category_wins_rank: int
+
+
+class EntityOrTitleRow(BaseModel):  # used when nominations or rankings are skipped
+    id: int
+    imdb_id: str
+    type: str
+    name: str
+    aliases: list[str | None]
+    total_noms: int
+    total_wins: int
+
+
+class Collaborator(BaseModel):  # entity or title connected in co-nomination graph
+    id: int
+    imdb_id: str
+    type: str
+    name: str
+    shared: int  # titles/nominations (entities) or entities (titles) in common
+
+
+class PathStep(BaseModel):
+    id: int
+    imdb_id: str
+    type: str
+    name: str
+    shared: int | None  # in common with previous step; None for first step
+
+
+class BatchEditionRow(EditionRow):
+    requested_id: int  # id of the entity or title this row was fetched for
+
+
+# for batch endpoints
+MAX_BATCH_SIZE = 200
+
+
+class BatchRequest(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+    include: list[EntityOrTitleSection] | None = None  # defaults to all sections
+
+
+class ImdbBatchRequest(BaseModel):
+    ids: list[str] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+    include: list[EntityOrTitleSection] | None = None
+
+
+class EntityOrTitleBatch(BaseModel):
+    results: dict[str, EntityOrTitle]  # keyed by requested id
+    errors: dict[str, str]  # requested id -> reason it could not be returned
+
+
+# for compare endpoint
+MAX_COMPARE_SIZE = 10
+
+
+class CompareSubject(BaseModel):
+    id: int
+    imdb_id: str
+    type: str
+    name: str
+    total_noms: int
+    total_wins: int
+
+
+class CompareEdition(BaseModel):
+    id: int
+    iteration: int
+    official_year: str
+    noms: list[int]  # aligned with `Comparison.subjects`
+    wins: list[int]
+
+
+class CompareCategory(BaseModel):
+    category_id: int
+    category: str
+    category_group: str | None
+    noms: list[int]  # aligned with `Comparison.subjects`
+    wins: list[int]
+
+
+class SharedNomination(BaseModel):
+    edition_id: int
+    iteration: int
+    category_id: int
+    official_name: str
+    winner: bool
+    subjects: list[int]  # indexes into `Comparison.subjects`
+
+
+class Comparison(BaseModel):
+    subjects: list[CompareSubject]
+    editions: list[CompareEdition]  # editions with a nomination for any subject
+    categories: list[CompareCategory]
+    shared_editions: list[int]  # iterations in which every subject was nominated
+    shared_nominations: list[SharedNomination]  # credit two or more subjects
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int  # tied entries share the same rank
+    id: int
+    imdb_id: str
+    type: str
+    name: str
+    noms: int
+    wins: int
+    win_rate: float | None  # None if no nominations
@@ -65,8 +65,9 @@ class EntityStats(BaseModel):  # unique by combination of id, cat id
 
 
 class AggStats(BaseModel):
-    title_stats: list[TitleStats]
-    entity_stats: list[EntityStats]
+    title_stats: list[TitleStats] | None  # None if not included
+    entity_stats: list[EntityStats] | None
+    next_cursor: str | None = None  # only set when paginating with `stats_limit`
 
 
 class Edition(BaseModel):
@@ -80,8 +81,8 @@ class Edition(BaseModel):
 
 
 class Nominations(BaseModel):
-    editions: list[Edition]
-    stats: AggStats
+    editions: list[Edition] | None  # None if not included
+    stats: AggStats | None
 
 
 class EditionRow(BaseModel):
@@ -90,3 +90,36 @@ class SearchResults(BaseModel):
     entities: EntitySearchGroup
     categories: CategorySearchGroup
     ceremonies: CeremonySearchGroup
+
+
+# for /search/suggest
+class TitleSuggestion(BaseModel):
+    id: int
+    imdb_id: str
+    title: str
+    noms: int
+    wins: int
+
+
+class EntitySuggestion(BaseModel):
+    id: int
+    imdb_id: str
+    type: str
+    name: str
+    aliases: list[str]
+    noms: int
+    wins: int
+
+
+class CategorySuggestion(BaseModel):
+    id: int
+    category: str
+    category_group_id: int | None
+    category_group: str | None
+    noms: int
+
+
+class SuggestResults(BaseModel):
+    titles: list[TitleSuggestion]
+    entities: list[EntitySuggestion]
+    categories: list[CategorySuggestion]
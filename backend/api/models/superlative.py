@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+
+
+class StreakEntry(BaseModel):
+    rank: int  # tied entries share the same rank
+    id: int
+    imdb_id: str
+    type: str
+    name: str
+    streak: int  # consecutive editions with at least one nomination
+    start_edition: int
+    end_edition: int
+
+
+class FirstWinEntry(BaseModel):
+    rank: int
+    id: int
+    imdb_id: str
+    type: str
+    name: str
+    noms_before_first_win: int
+    first_win_edition: int
@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 from psycopg.rows import class_row
 
-from ..dependencies import connect
+from ..dependencies import EMBEDDED, connect
 from ..models.category import (
     CategoryCategory,
     CategoryGroup,
@@ -11,6 +11,8 @@ from ..models.category import (
     CategoryNameInfo,
     CategoryRow,
 )
+from ..services import embedded
+from ..services.dataset import get_dataset
 from .nominations import get_nominations
 
 router = APIRouter(prefix="/categories", tags=["categories"])
@@ -35,125 +37,134 @@ async def get_category_hierarchy() -> list[CategoryGroup]:
     This hierarchy allows oscy to compute aggregate stats at each level, and
     reconstruct a category's name history.
     """
-    async with connect() as con:
-        async with con.cursor(row_factory=class_row(CategoryRow)) as cur:  # type: ignore
-            await cur.execute(
-                """
-                WITH cni AS (
+    rows: list[CategoryRow]
+    if EMBEDDED:
+        rows = embedded.category_rows(await get_dataset())
+    else:
+        async with connect() as con:
+            async with con.cursor(row_factory=class_row(CategoryRow)) as cur:  # type: ignore
+                await cur.execute(
+                    """
+                    WITH cni AS (
+                        SELECT
+                            cn.id,
+                            cn.official_name,
+                            cn.common_name,
+                            json_agg(e.iteration ORDER BY e.iteration) AS iterations, 
+                            cn.category_id -- for the join
+                        FROM category_names cn
+                        JOIN editions_category_names ecn ON ecn.category_name_id = cn.id
+                        JOIN editions e ON e.id = ecn.edition_id
+                        GROUP BY cn.id, cn.official_name, cn.common_name, cn.category_id
+                    )
                     SELECT
-                        cn.id,
-                        cn.official_name,
-                        cn.common_name,
-                        json_agg(e.iteration ORDER BY e.iteration) AS iterations, 
-                        cn.category_id -- for the join
-                    FROM category_names cn
-                    JOIN editions_category_names ecn ON ecn.category_name_id = cn.id
-                    JOIN editions e ON e.id = ecn.edition_id
-                    GROUP BY cn.id, cn.official_name, cn.common_name, cn.category_id
+                        cg.id AS category_group_id,
+                        cg.name AS category_group,
+                        c.id AS category_id,
+                        c.name AS category,
+                        cni.id AS category_name_id,
+                        cni.official_name AS official_name,
+                        cni.common_name AS common_name,
+                        cni.iterations AS iterations -- array of all iterations using this category name
+                    FROM category_groups cg
+                    JOIN categories c ON cg.id = c.category_group_id
+                    JOIN cni ON c.id = cni.category_id
+                    ORDER BY category_group_id, category_id, category_name_id
+                    """
                 )
-                SELECT
-                    cg.id AS category_group_id,
-                    cg.name AS category_group,
-                    c.id AS category_id,
-                    c.name AS category,
-                    cni.id AS category_name_id,
-                    cni.official_name AS official_name,
-                    cni.common_name AS common_name,
-                    cni.iterations AS iterations -- array of all iterations using this category name
-                FROM category_groups cg
-                JOIN categories c ON cg.id = c.category_group_id
-                JOIN cni ON c.id = cni.category_id
-                ORDER BY category_group_id, category_id, category_name_id
-                """
-            )
 
-            rows: list[CategoryRow] = await cur.fetchall()  # type: ignore
-            res: list[CategoryGroup] = []
-
-            seen_cg_ids = set()
-            seen_c_ids = set()
-            seen_cn_ids = set()
-
-            for row in rows:
-                if row.category_group_id not in seen_cg_ids:
-                    res.append(
-                        CategoryGroup(
-                            category_group_id=row.category_group_id,
-                            category_group=row.category_group,
-                            categories=[],
-                        )
-                    )
-                    seen_cg_ids.add(row.category_group_id)
-
-                if row.category_id not in seen_c_ids:
-                    res[-1].categories.append(
-                        CategoryCategory(
-                            category_id=row.category_id,
-                            category=row.category,
-                            category_names=[],
-                        )
-                    )
-                    seen_c_ids.add(row.category_id)
-
-                if row.category_name_id not in seen_cn_ids:
-                    c = CategoryName(
-                        category_name_id=row.category_name_id,
-                        official_name=row.official_name,
-                        common_name=row.common_name,
-                        ranges=[],
-                    )
-                    iterations = row.iterations
-                    start = iterations[0]
-                    for ind in range(1, len(iterations)):
-                        if iterations[ind] != iterations[ind - 1] + 1:
-                            c.ranges.append((start, iterations[ind - 1]))
-                            start = iterations[ind]
-                    c.ranges.append((start, iterations[-1]))
+                rows = await cur.fetchall()  # type: ignore
+
+    res: list[CategoryGroup] = []
 
-                    res[-1].categories[-1].category_names.append(c)
-                    seen_cn_ids.add(row.category_name_id)
+    seen_cg_ids = set()
+    seen_c_ids = set()
+    seen_cn_ids = set()
+
+    for row in rows:
+        if row.category_group_id not in seen_cg_ids:
+            res.append(
+                CategoryGroup(
+                    category_group_id=row.category_group_id,
+                    category_group=row.category_group,
+                    categories=[],
+                )
+            )
+            seen_cg_ids.add(row.category_group_id)
+
+        if row.category_id not in seen_c_ids:
+            res[-1].categories.append(
+                CategoryCategory(
+                    category_id=row.category_id,
+                    category=row.category,
+                    category_names=[],
+                )
+            )
+            seen_c_ids.add(row.category_id)
+
+        if row.category_name_id not in seen_cn_ids:
+            c = CategoryName(
+                category_name_id=row.category_name_id,
+                official_name=row.official_name,
+                common_name=row.common_name,
+                ranges=[],
+            )
+            iterations = row.iterations
+            start = iterations[0]
+            for ind in range(1, len(iterations)):
+                if iterations[ind] != iterations[ind - 1] + 1:
+                    c.ranges.append((start, iterations[ind - 1]))
+                    start = iterations[ind]
+            c.ranges.append((start, iterations[-1]))
+
+            res[-1].categories[-1].category_names.append(c)
+            seen_cn_ids.add(row.category_name_id)
 
     return res
 
 
 @router.get("/{id}", summary="Get category by id")
 async def get_category_by_id(id: int) -> CategoryInfo | None:
-    async with connect() as con:
-        async with con.cursor(row_factory=class_row(CategoryInfoRow)) as cur:  # type: ignore
-            await cur.execute(
-                """
-                SELECT
-                    cg.id AS category_group_id,
-                    cg.name AS category_group,
-                    c.id AS category_id,
-                    c.name AS category,
-                    json_agg(cni.category_name_id ORDER BY cni.category_name_id) AS category_name_ids,
-                    json_agg(cni.official_name ORDER BY cni.category_name_id) AS official_names,
-                    json_agg(cni.common_name ORDER BY cni.category_name_id) AS common_names,
-                    json_agg(cni.iterations ORDER BY cni.category_name_id) AS ranges
-                FROM (
+    row: CategoryInfoRow | None
+    if EMBEDDED:
+        row = embedded.category_info_row(await get_dataset(), id)
+    else:
+        async with connect() as con:
+            async with con.cursor(row_factory=class_row(CategoryInfoRow)) as cur:  # type: ignore
+                await cur.execute(
+                    """
                     SELECT
-                        cn.id AS category_name_id,
-                        cn.official_name AS official_name,
-                        cn.common_name AS common_name,
-                        json_agg(e.iteration ORDER BY e.iteration) AS iterations,
-                        cn.category_id AS category_id -- for the join
-                    FROM category_names cn
-                    JOIN editions_category_names ecn ON ecn.category_name_id = cn.id
-                    JOIN editions e ON e.id = ecn.edition_id
-                    GROUP BY cn.id, cn.official_name, cn.common_name, cn.category_id
-                ) cni
-                JOIN categories c ON c.id = cni.category_id
-                JOIN category_groups cg ON cg.id = c.category_group_id
-                WHERE category_id = %s
-                GROUP BY c.id, c.name, cg.id, cg.name
-                """,
-                (id,),
-            )
-            rows: list[CategoryInfoRow] = await cur.fetchall()  # type: ignore
-            if not rows:
-                return None
-            row: CategoryInfoRow = rows[0]
+                        cg.id AS category_group_id,
+                        cg.name AS category_group,
+                        c.id AS category_id,
+                        c.name AS category,
+                        json_agg(cni.category_name_id ORDER BY cni.category_name_id) AS category_name_ids,
+                        json_agg(cni.official_name ORDER BY cni.category_name_id) AS official_names,
+                        json_agg(cni.common_name ORDER BY cni.category_name_id) AS common_names,
+                        json_agg(cni.iterations ORDER BY cni.category_name_id) AS ranges
+                    FROM (
+                        SELECT
+                            cn.id AS category_name_id,
+                            cn.official_name AS official_name,
+                            cn.common_name AS common_name,
+                            json_agg(e.iteration ORDER BY e.iteration) AS iterations,
+                            cn.category_id AS category_id -- for the join
+                        FROM category_names cn
+                        JOIN editions_category_names ecn ON ecn.category_name_id = cn.id
+                        JOIN editions e ON e.id = ecn.edition_id
+                        GROUP BY cn.id, cn.official_name, cn.common_name, cn.category_id
+                    ) cni
+                    JOIN categories c ON c.id = cni.category_id
+                    JOIN category_groups cg ON cg.id = c.category_group_id
+                    WHERE category_id = %s
+                    GROUP BY c.id, c.name, cg.id, cg.name
+                    """,
+                    (id,),
+                )
+                rows: list[CategoryInfoRow] = await cur.fetchall()  # type: ignore
+                row = rows[0] if rows else None
+    if row is None:
+        return None
 
     nominations = await get_nominations(categories=row.category)
 
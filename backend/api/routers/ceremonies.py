@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 from psycopg.rows import class_row, dict_row
 
-from ..dependencies import connect
+from ..dependencies import EMBEDDED, connect
 from ..models.ceremony import CeremonyInfo
 from ..models.nominations import Nominations
+from ..services import embedded
+from ..services.dataset import get_dataset
 from .nominations import get_nominations
 
 router = APIRouter(prefix="/ceremonies", tags=["ceremonies"])
@@ -11,6 +13,9 @@ router = APIRouter(prefix="/ceremonies", tags=["ceremonies"])
 
 @router.get("", summary="Get all ceremonies")
 async def list_ceremonies() -> list[CeremonyInfo]:
+    if EMBEDDED:
+        return embedded.ceremony_infos(await get_dataset())
+
     async with connect() as con:
         async with con.cursor(row_factory=class_row(CeremonyInfo)) as cur:  # type: ignore
             await cur.execute(
@@ -26,6 +31,16 @@ async def list_ceremonies() -> list[CeremonyInfo]:
 
 @router.get("/{id}", summary="Get ceremony by id")
 async def get_ceremony_by_id(id: int) -> Nominations | None:
+    if EMBEDDED:
+        edition = (await get_dataset()).editions.get(id)
+        if edition is None:
+            return None
+        return await get_nominations(
+            award=edition.award,  # type: ignore
+            start_edition=edition.iteration,
+            end_edition=edition.iteration,
+        )
+
     async with connect() as con:
         async with con.cursor(row_factory=dict_row) as cur:  # type: ignore
             await cur.execute(
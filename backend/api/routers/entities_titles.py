@@ -1,24 +1,338 @@
-from fastapi import APIRouter
+from collections import defaultdict
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query
+from psycopg import AsyncConnection
 from psycopg.rows import class_row
 
-from ..dependencies import connect
+from ..dependencies import COLUMNAR, EMBEDDED, connect
+from ..enums import EntityOrTitleSection, LeaderboardType
 from ..models.entity_title import (
+    BatchEditionRow,
+    BatchRequest,
     CategoryGroupRankings,
     CategoryRankings,
+    Collaborator,
+    Comparison,
     EntityOrTitle,
+    EntityOrTitleBatch,
+    EntityOrTitleRow,
+    ImdbBatchRequest,
+    MAX_COMPARE_SIZE,
     OverallRankings,
+    PathStep,
     Rankings,
     RankingsRow,
 )
-from ..models.nominations import EditionRow
-from .nominations import edition_rows_to_editions
+from ..services import embedded
+from ..services.columnar import ColumnarStore
+from ..services.compare import compare
+from ..services.dataset import get_dataset, get_index
+from ..services.directory import Directory
+from ..services.graph import CoNominationGraphs
+from ..services.imdb_ids import get_imdb_id_map
+from ..services.leaderboards import subject_info
+from .nominations import edition_rows_to_editions, include_pattern, parse_include
 
 router = APIRouter(tags=["entities and titles"])
 
 
+IncludeQuery = Annotated[
+    str | None,
+    Query(
+        pattern=include_pattern(EntityOrTitleSection),
+        description=(
+            """Comma-separated list of sections to compute: `rankings`,
+            `nominations`. Sections not listed are skipped and returned as null.
+            Defaults to all sections."""
+        ),
+    ),
+]
+
+
 @router.get("/entities/{id}", summary="Get entity by id")
-async def get_entity_by_id(id: int) -> EntityOrTitle | None:
+async def get_entity_by_id(
+    id: int, include: IncludeQuery = None
+) -> EntityOrTitle | None:
+    """
+    Example use cases:
+    - How does an entity rank within each category, without fetching its full
+    list of nominations?
+    > /entities/{id}?include=rankings
+    """
+    res = await fetch_entities_or_titles(
+        [id], parse_include(include, EntityOrTitleSection), False
+    )
+    return res.get(id)
+
+
+@router.get("/titles/{id}", summary="Get title by id")
+async def get_title_by_id(
+    id: int, include: IncludeQuery = None
+) -> EntityOrTitle | None:
+    res = await fetch_entities_or_titles(
+        [id], parse_include(include, EntityOrTitleSection), True
+    )
+    return res.get(id)
+
+
+@router.get("/imdb/{imdb_id}", summary="Get entity or title by IMDb id")
+async def get_entity_or_title_by_imdb_id(
+    imdb_id: str, include: IncludeQuery = None
+) -> EntityOrTitle | None:
+    id = (await lookup_imdb_ids([imdb_id])).get(imdb_id)
+    if id is None:
+        return None
+
+    return (
+        await get_title_by_id(id, include)
+        if imdb_id.startswith("tt")
+        else await get_entity_by_id(id, include)
+    )
+
+
+@router.get("/entities/{id}/collaborators", summary="Get entity collaborators")
+async def get_entity_collaborators(
+    id: int, limit: Annotated[int, Query(ge=1, le=100)] = 10
+) -> list[Collaborator] | None:
+    """
+    Returns the entities most often nominated for the same titles as this entity
+    (or credited in the same nomination, for nominations without a title),
+    sorted by `shared`.
+
+    Example use cases:
+    - Who has this person most often shared nominated films with?
+    > /entities/{id}/collaborators
+    """
+    graphs = await get_index("graph", CoNominationGraphs)
+    if id not in graphs.directory.entities:
+        return None
+    return [
+        to_collaborator(graphs.directory, LeaderboardType.entity, neighbor_id, shared)
+        for neighbor_id, shared in graphs.entities.top_neighbors(id, limit)
+    ]
+
+
+@router.get("/titles/{id}/related", summary="Get related titles")
+async def get_related_titles(
+    id: int, limit: Annotated[int, Query(ge=1, le=100)] = 10
+) -> list[Collaborator] | None:
+    """
+    Returns the titles sharing the most nominated entities with this title,
+    sorted by `shared`.
+
+    Example use cases:
+    - Which films share the most nominees with this film?
+    > /titles/{id}/related
+    """
+    graphs = await get_index("graph", CoNominationGraphs)
+    if id not in graphs.directory.titles:
+        return None
+    return [
+        to_collaborator(graphs.directory, LeaderboardType.title_, neighbor_id, shared)
+        for neighbor_id, shared in graphs.titles.top_neighbors(id, limit)
+    ]
+
+
+@router.get("/entities/{id}/path/{target_id}", summary="Get collaboration path")
+async def get_collaboration_path(
+    id: int,
+    target_id: int,
+    max_hops: Annotated[int, Query(ge=1, le=20)] = 10,
+) -> list[PathStep] | None:
+    """
+    Returns a shortest chain of entities from `id` to `target_id` in which each
+    consecutive pair was nominated for the same title (or credited in the same
+    nomination). Returns null if either entity does not exist or no chain of at
+    most `max_hops` links exists.
+
+    Example use cases:
+    - How many steps separate two people through shared nominated films?
+    > /entities/{id}/path/{target_id}
+    """
+    graphs = await get_index("graph", CoNominationGraphs)
+    entities = graphs.directory.entities
+    if id not in entities or target_id not in entities:
+        return None
+    path = graphs.entities.shortest_path(id, target_id, max_hops)
+    if path is None:
+        return None
+    res = []
+    for step_id, shared in path:
+        imdb_id, type, name = subject_info(
+            graphs.directory, LeaderboardType.entity, step_id
+        )
+        res.append(
+            PathStep(id=step_id, imdb_id=imdb_id, type=type, name=name, shared=shared)
+        )
+    return res
+
+
+@router.get("/compare", summary="Compare entities and titles")
+async def compare_entities_and_titles(
+    entities: Annotated[
+        str | None,
+        Query(
+            pattern=r"^\d+(,\d+)*$",
+            description="Comma-separated list of entity ids, ex. `1,2`.",
+        ),
+    ] = None,
+    titles: Annotated[
+        str | None,
+        Query(
+            pattern=r"^\d+(,\d+)*$",
+            description="Comma-separated list of title ids, ex. `1,2`.",
+        ),
+    ] = None,
+) -> Comparison | None:
+    """
+    Compares up to 10 entities and/or titles side by side. `subjects` lists the
+    entities, then the titles, in the order given; every `noms`/`wins` list in
+    the response is aligned with it.
+
+    `shared_editions` lists the ceremonies in which every subject was nominated,
+    and `shared_nominations` lists the nominations crediting two or more of the
+    subjects. Returns null if any id does not exist.
+
+    Example use cases:
+    - How do two actors' careers line up ceremony by ceremony?
+    > /compare?entities=1,2
+    - Was this person nominated for this film?
+    > /compare?entities=1&titles=1
+    """
+    subjects = [
+        *[
+            (LeaderboardType.entity, int(id))
+            for id in dict.fromkeys(entities.split(",") if entities else [])
+        ],
+        *[
+            (LeaderboardType.title_, int(id))
+            for id in dict.fromkeys(titles.split(",") if titles else [])
+        ],
+    ]
+    if not subjects or len(subjects) > MAX_COMPARE_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Provide between 1 and {MAX_COMPARE_SIZE} entity and title ids",
+        )
+
+    dataset = await get_dataset()
+    if any(
+        id
+        not in (dataset.titles if type == LeaderboardType.title_ else dataset.entities)
+        for type, id in subjects
+    ):
+        return None
+    return compare(dataset, subjects)
+
+
+@router.post("/entities:batch", summary="Get entities by ids")
+async def get_entities_batch(body: BatchRequest) -> EntityOrTitleBatch:
+    """
+    Returns the same data as `/entities/{id}` for up to 200 entities in a single
+    request. `results` is keyed by id; ids with no matching entity are listed in
+    `errors` instead.
+    """
+    ids = list(dict.fromkeys(body.ids))
+    res = await fetch_entities_or_titles(ids, batch_include(body.include), False)
+    return to_batch(ids, res)
+
+
+@router.post("/titles:batch", summary="Get titles by ids")
+async def get_titles_batch(body: BatchRequest) -> EntityOrTitleBatch:
+    """
+    Returns the same data as `/titles/{id}` for up to 200 titles in a single
+    request. `results` is keyed by id; ids with no matching title are listed in
+    `errors` instead.
+    """
+    ids = list(dict.fromkeys(body.ids))
+    res = await fetch_entities_or_titles(ids, batch_include(body.include), True)
+    return to_batch(ids, res)
+
+
+@router.post("/imdb:batch", summary="Get entities or titles by IMDb ids")
+async def get_entities_or_titles_batch(body: ImdbBatchRequest) -> EntityOrTitleBatch:
+    """
+    Returns the same data as `/imdb/{imdb_id}` for up to 200 entities and/or
+    titles in a single request. `results` is keyed by IMDb id; IMDb ids with no
+    matching entity or title are listed in `errors` instead.
+    """
+    imdb_ids = list(dict.fromkeys(body.ids))
+    ids = await lookup_imdb_ids(imdb_ids)
+    title_ids = {k: v for k, v in ids.items() if k.startswith("tt")}
+    entity_ids = {k: v for k, v in ids.items() if not k.startswith("tt")}
+
+    include = batch_include(body.include)
+    titles = await fetch_entities_or_titles(list(title_ids.values()), include, True)
+    entities = await fetch_entities_or_titles(list(entity_ids.values()), include, False)
+
+    res: dict[str, EntityOrTitle] = {}
+    for imdb_id in imdb_ids:
+        if imdb_id in title_ids and title_ids[imdb_id] in titles:
+            res[imdb_id] = titles[title_ids[imdb_id]]
+        elif imdb_id in entity_ids and entity_ids[imdb_id] in entities:
+            res[imdb_id] = entities[entity_ids[imdb_id]]
+    return to_batch(imdb_ids, res)
+
+
+async def lookup_imdb_ids(imdb_ids: list[str]) -> dict[str, int]:
+    """Returns the oscy title (for `tt` ids) or entity id of each of `imdb_ids`
+    that exists, using the in-memory IMDb id map, so that unknown ids don't
+    reach the db either."""
+    imdb_id_map = await get_imdb_id_map()
+    ids = {imdb_id: imdb_id_map.lookup(imdb_id) for imdb_id in imdb_ids}
+    return {k: v for k, v in ids.items() if v is not None}
+
+
+async def fetch_entities_or_titles(
+    ids: list[int], include: set[EntityOrTitleSection], is_title: bool
+) -> dict[int, EntityOrTitle]:
+    """Fetches titles or entities from the configured data backend."""
+    if COLUMNAR and EntityOrTitleSection.rankings in include:
+        store = await get_index("columnar", ColumnarStore)
+        rankings_rows = store.rankings_rows(ids, is_title)
+        res = await fetch_entities_or_titles(
+            ids, include - {EntityOrTitleSection.rankings}, is_title
+        )
+        id_to_rankings_rows: dict[int, list[RankingsRow]] = defaultdict(list)
+        for row in rankings_rows:
+            id_to_rankings_rows[row.id].append(row)
+        # like the rankings query, ids without rankings are not returned
+        for id in [id for id in res if id not in id_to_rankings_rows]:
+            del res[id]
+        for id, entity_or_title in res.items():
+            entity_or_title.rankings = rankings_rows_to_rankings(
+                id_to_rankings_rows[id]
+            )
+        return res
+
+    if EMBEDDED:
+        dataset = await get_dataset()
+        return rows_to_entities_or_titles(
+            *embedded.subject_rows(dataset, ids, include, is_title), is_title
+        )
     async with connect() as con:
+        if is_title:
+            return await get_titles_by_ids(con, ids, include)
+        return await get_entities_by_ids(con, ids, include)
+
+
+async def get_entities_by_ids(
+    con: AsyncConnection,
+    ids: list[int],
+    include: set[EntityOrTitleSection] | None = None,
+) -> dict[int, EntityOrTitle]:
+    """Fetches the sections in `include` (defaults to all) for each of `ids`."""
+    if not ids:
+        return {}
+    if include is None:
+        include = set(EntityOrTitleSection)
+
+    rankings_rows: list[RankingsRow] | None = None
+    rows: list[BatchEditionRow] | None = None
+    summary_rows: list[EntityOrTitleRow] | None = None
+
+    if EntityOrTitleSection.rankings in include:
         async with con.cursor(row_factory=class_row(RankingsRow)) as cur:  # type: ignore
             await cur.execute(
                 """
@@ -32,20 +346,17 @@ async def get_entity_by_id(id: int) -> EntityOrTitle | None:
                         cg.name AS category_group,
                         c.id AS category_id,
                         c.name AS category,
-                        SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) AS category_noms,
-                        SUM(CASE WHEN n.winner = TRUE THEN 1 ELSE 0 END) AS category_wins,
-                        SUM(SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id, cg.id) AS category_group_noms,
-                        SUM(SUM(CASE WHEN n.winner = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id, cg.id) AS category_group_wins,
-                        SUM(SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id) AS overall_noms,
-                        SUM(SUM(CASE WHEN n.winner = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id) AS overall_wins
-                    FROM category_names cn
-                    JOIN categories c ON c.id = cn.category_id
-                    JOIN category_groups cg ON cg.id = c.category_group_id
-                    JOIN editions_category_names ecn ON cn.id = ecn.category_name_id
-                    JOIN editions e ON e.id = ecn.edition_id
-                    JOIN nominees n ON n.edition_id = e.id AND n.category_name_id = cn.id
-                    JOIN nominees_entities ne ON ne.nominee_id = n.id
-                    JOIN entities en ON ne.entity_id = en.id
+                        SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END) AS category_noms,
+                        SUM(CASE WHEN f.winner = TRUE THEN 1 ELSE 0 END) AS category_wins,
+                        SUM(SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id, cg.id) AS category_group_noms,
+                        SUM(SUM(CASE WHEN f.winner = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id, cg.id) AS category_group_wins,
+                        SUM(SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id) AS overall_noms,
+                        SUM(SUM(CASE WHEN f.winner = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id) AS overall_wins
+                    FROM nomination_facts f
+                    JOIN categories c ON c.id = f.category_id
+                    JOIN category_groups cg ON cg.id = f.category_group_id
+                    JOIN entities en ON en.id = f.entity_id
+                    WHERE f.title_ord = 1
                     GROUP BY en.id, en.imdb_id, en.type, en.name, cg.id, cg.name, c.id, c.name
                 ), b AS (
                     SELECT id, category_group_id, category_group_noms, category_group_wins		
@@ -81,102 +392,107 @@ async def get_entity_by_id(id: int) -> EntityOrTitle | None:
                 )
                 SELECT *
                 FROM f
-                WHERE id = %s
-                ORDER BY category_id;
+                WHERE id = ANY(%s)
+                ORDER BY id, category_id;
                 """,
-                (id,),
+                (ids,),
             )
-            rankings_rows: list[RankingsRow] = await cur.fetchall()  # type: ignore
+            rankings_rows = await cur.fetchall()  # type: ignore
 
-            if not rankings_rows:
-                return None
-
-            imdb_id = rankings_rows[0].imdb_id
-            type = rankings_rows[0].type
-            name = rankings_rows[0].name
-            rankings = rankings_rows_to_rankings(rankings_rows)
-
-        async with con.cursor(row_factory=class_row(EditionRow)) as cur:  # type: ignore
+    if EntityOrTitleSection.nominations in include:
+        async with con.cursor(row_factory=class_row(BatchEditionRow)) as cur:  # type: ignore
             await cur.execute(
                 """
                 SELECT
-                    e.id AS edition_id,
-                    e.iteration,
+                    r.entity_id AS requested_id,
+                    f.edition_id,
+                    f.iteration,
                     e.official_year,
                     e.ceremony_date,
-                    c.id AS category_id,
-                    cn.id AS category_name_id,
+                    f.category_id,
+                    f.category_name_id,
                     cg.name AS category_group,
                     cn.official_name,
                     cn.common_name,
                     c.name AS short_name,
-                    n.id AS nominee_id,
-                    n.winner,
-                    t.id AS title_id,
+                    f.nominee_id,
+                    f.winner,
+                    f.title_id,
                     t.title,
                     t.imdb_id AS title_imdb_id,
                     nt.detail,
-                    nt.winner AS title_winner,
-                    en.id AS person_id,
+                    f.title_winner,
+                    f.entity_id AS person_id,
                     ne.name,
                     en.imdb_id AS person_imdb_id,
                     ne.statement_ind,
                     n.statement,
-                    n.is_person,
+                    f.is_person,
                     n.note,
-                    n.official,
-                    n.stat,
-                    n.pending
-                FROM category_names cn
-                JOIN categories c ON c.id = cn.category_id
-                JOIN category_groups cg ON cg.id = c.category_group_id
-                JOIN editions_category_names ecn ON cn.id = ecn.category_name_id
-                JOIN editions e ON e.id = ecn.edition_id
-                JOIN nominees n ON n.edition_id = e.id AND n.category_name_id = cn.id
-                JOIN nominees_entities ne ON ne.nominee_id = n.id
-                JOIN entities en ON en.id = ne.entity_id
-                LEFT JOIN nominees_titles nt ON nt.nominee_id = n.id -- some nominations have no associated title
-                LEFT JOIN titles t ON nt.title_id = t.id
-                WHERE n.id IN (
-                    SELECT nominee_id
-                    FROM nominees_entities
-                    WHERE nominees_entities.entity_id = %s
-                )
-                ORDER BY e.iteration ASC, cn.official_name ASC, n.winner DESC, n.id ASC, ne.statement_ind ASC, nt.winner DESC;
+                    f.official,
+                    f.stat,
+                    f.pending
+                FROM nomination_facts r
+                JOIN nomination_facts f ON f.nominee_id = r.nominee_id AND f.award = r.award
+                JOIN editions e ON e.id = f.edition_id
+                JOIN category_names cn ON cn.id = f.category_name_id
+                JOIN categories c ON c.id = f.category_id
+                JOIN category_groups cg ON cg.id = f.category_group_id
+                JOIN nominees n ON n.id = f.nominee_id AND n.award = f.award
+                JOIN nominees_entities ne ON ne.nominee_id = f.nominee_id AND ne.entity_id = f.entity_id AND ne.award = f.award
+                JOIN entities en ON en.id = f.entity_id
+                LEFT JOIN nominees_titles nt ON nt.nominee_id = f.nominee_id AND nt.title_id = f.title_id AND nt.award = f.award -- some nominations have no associated title
+                LEFT JOIN titles t ON t.id = f.title_id
+                WHERE r.entity_id = ANY(%s) AND r.title_ord = 1
+                ORDER BY r.entity_id, f.iteration ASC, cn.official_name ASC, f.winner DESC, f.nominee_id ASC, ne.statement_ind ASC, f.title_winner DESC;
                 """,
-                (id,),
+                (ids,),
             )
-            rows: list[EditionRow] = await cur.fetchall()  # type: ignore
-            editions = edition_rows_to_editions(rows, "")
+            rows = await cur.fetchall()  # type: ignore
 
-            if not editions:
-                return None
+    # totals and aliases are otherwise derived from the skipped sections
+    if include != set(EntityOrTitleSection):
+        async with con.cursor(row_factory=class_row(EntityOrTitleRow)) as cur:  # type: ignore
+            await cur.execute(
+                """
+                SELECT
+                    en.id,
+                    en.imdb_id,
+                    en.type,
+                    en.name,
+                    array_agg(DISTINCT ne.name) AS aliases,
+                    SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END) AS total_noms,
+                    SUM(CASE WHEN f.winner = TRUE THEN 1 ELSE 0 END) AS total_wins
+                FROM nomination_facts f
+                JOIN nominees_entities ne ON ne.nominee_id = f.nominee_id AND ne.entity_id = f.entity_id AND ne.award = f.award
+                JOIN entities en ON en.id = f.entity_id
+                WHERE en.id = ANY(%s) AND f.title_ord = 1 AND f.category_group_id IS NOT NULL
+                GROUP BY en.id, en.imdb_id, en.type, en.name
+                ORDER BY en.id;
+                """,
+                (ids,),
+            )
+            summary_rows = await cur.fetchall()  # type: ignore
 
-            aliases = [
-                p.name
-                for e in editions
-                for c in e.categories
-                for n in c.nominees
-                for p in n.people
-                if p.imdb_id == imdb_id
-            ]
+    return rows_to_entities_or_titles(summary_rows, rankings_rows, rows, False)
 
-        return EntityOrTitle(
-            id=id,
-            imdb_id=imdb_id,
-            type=type,
-            name=name,
-            aliases=list(set(aliases)),
-            total_noms=sum(e.edition_noms for e in editions),
-            total_wins=sum(e.edition_wins for e in editions),
-            nominations=editions,
-            rankings=rankings,
-        )
 
+async def get_titles_by_ids(
+    con: AsyncConnection,
+    ids: list[int],
+    include: set[EntityOrTitleSection] | None = None,
+) -> dict[int, EntityOrTitle]:
+    """Fetches the sections in `include` (defaults to all) for each of `ids`."""
+    if not ids:
+        return {}
+    if include is None:
+        include = set(EntityOrTitleSection)
 
-@router.get("/titles/{id}", summary="Get title by id")
-async def get_title_by_id(id: int) -> EntityOrTitle | None:
-    async with connect() as con:
+    rankings_rows: list[RankingsRow] | None = None
+    rows: list[BatchEditionRow] | None = None
+    summary_rows: list[EntityOrTitleRow] | None = None
+
+    if EntityOrTitleSection.rankings in include:
         async with con.cursor(row_factory=class_row(RankingsRow)) as cur:  # type: ignore
             await cur.execute(
                 """
@@ -190,20 +506,17 @@ async def get_title_by_id(id: int) -> EntityOrTitle | None:
                         cg.name AS category_group,
                         c.id AS category_id,
                         c.name AS category,
-                        SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) AS category_noms,
-                        SUM(CASE WHEN nt.winner = TRUE THEN 1 ELSE 0 END) AS category_wins,
-                        SUM(SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY t.id, cg.id) AS category_group_noms,
-                        SUM(SUM(CASE WHEN nt.winner = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY t.id, cg.id) AS category_group_wins,
-                        SUM(SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY t.id) AS overall_noms,
-                        SUM(SUM(CASE WHEN nt.winner = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY t.id) AS overall_wins
-                    FROM category_names cn
-                    JOIN categories c ON c.id = cn.category_id
-                    JOIN category_groups cg ON cg.id = c.category_group_id
-                    JOIN editions_category_names ecn ON cn.id = ecn.category_name_id
-                    JOIN editions e ON e.id = ecn.edition_id
-                    JOIN nominees n ON n.edition_id = e.id AND n.category_name_id = cn.id
-                    JOIN nominees_titles nt ON nt.nominee_id = n.id
-                    JOIN titles t ON nt.title_id = t.id
+                        SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END) AS category_noms,
+                        SUM(CASE WHEN f.title_winner = TRUE THEN 1 ELSE 0 END) AS category_wins,
+                        SUM(SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY t.id, cg.id) AS category_group_noms,
+                        SUM(SUM(CASE WHEN f.title_winner = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY t.id, cg.id) AS category_group_wins,
+                        SUM(SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY t.id) AS overall_noms,
+                        SUM(SUM(CASE WHEN f.title_winner = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY t.id) AS overall_wins
+                    FROM nomination_facts f
+                    JOIN categories c ON c.id = f.category_id
+                    JOIN category_groups cg ON cg.id = f.category_group_id
+                    JOIN titles t ON t.id = f.title_id
+                    WHERE f.entity_ord = 1
                     GROUP BY t.id, t.imdb_id, type, t.title, cg.id, cg.name, c.id, c.name
                 ), b AS (
                     SELECT id, category_group_id, category_group_noms, category_group_wins		
@@ -239,88 +552,159 @@ async def get_title_by_id(id: int) -> EntityOrTitle | None:
                 )
                 SELECT *
                 FROM f
-                WHERE id = %s
-                ORDER BY category_id;
+                WHERE id = ANY(%s)
+                ORDER BY id, category_id;
                 """,
-                (id,),
+                (ids,),
             )
-            rankings_rows: list[RankingsRow] = await cur.fetchall()  # type: ignore
-
-            if not rankings_rows:
-                return None
+            rankings_rows = await cur.fetchall()  # type: ignore
 
-            imdb_id = rankings_rows[0].imdb_id
-            type = rankings_rows[0].type
-            name = rankings_rows[0].name
-            rankings = rankings_rows_to_rankings(rankings_rows)
-
-        async with con.cursor(row_factory=class_row(EditionRow)) as cur:  # type: ignore
+    if EntityOrTitleSection.nominations in include:
+        async with con.cursor(row_factory=class_row(BatchEditionRow)) as cur:  # type: ignore
             await cur.execute(
                 """
                 SELECT
-                    e.id AS edition_id,
-                    e.iteration,
+                    r.title_id AS requested_id,
+                    f.edition_id,
+                    f.iteration,
                     e.official_year,
                     e.ceremony_date,
-                    c.id AS category_id,
-                    cn.id AS category_name_id,
+                    f.category_id,
+                    f.category_name_id,
                     cg.name AS category_group,
                     cn.official_name,
                     cn.common_name,
                     c.name AS short_name,
-                    n.id AS nominee_id,
-                    n.winner,
-                    t.id AS title_id,
+                    f.nominee_id,
+                    f.winner,
+                    f.title_id,
                     t.title,
                     t.imdb_id AS title_imdb_id,
                     nt.detail,
-                    nt.winner AS title_winner,
-                    en.id AS person_id,
+                    f.title_winner,
+                    f.entity_id AS person_id,
                     ne.name,
                     en.imdb_id AS person_imdb_id,
                     ne.statement_ind,
                     n.statement,
-                    n.is_person,
+                    f.is_person,
                     n.note,
-                    n.official,
-                    n.stat,
-                    n.pending
-                FROM category_names cn
-                JOIN categories c ON c.id = cn.category_id
-                JOIN category_groups cg ON cg.id = c.category_group_id
-                JOIN editions_category_names ecn ON cn.id = ecn.category_name_id
-                JOIN editions e ON e.id = ecn.edition_id
-                JOIN nominees n ON n.edition_id = e.id AND n.category_name_id = cn.id
-                JOIN nominees_titles nt ON nt.nominee_id = n.id
-                JOIN titles t ON nt.title_id = t.id
-                LEFT JOIN nominees_entities ne ON ne.nominee_id = n.id
-                LEFT JOIN entities en ON en.id = ne.entity_id
-                WHERE n.id IN (
-                    SELECT nominee_id
-                    FROM nominees_titles
-                    WHERE nominees_titles.title_id = %s
-                )
-                ORDER BY e.iteration ASC, cn.official_name ASC, n.winner DESC, n.id ASC, ne.statement_ind ASC, nt.winner DESC;
+                    f.official,
+                    f.stat,
+                    f.pending
+                FROM nomination_facts r
+                JOIN nomination_facts f ON f.nominee_id = r.nominee_id AND f.award = r.award
+                JOIN editions e ON e.id = f.edition_id
+                JOIN category_names cn ON cn.id = f.category_name_id
+                JOIN categories c ON c.id = f.category_id
+                JOIN category_groups cg ON cg.id = f.category_group_id
+                JOIN nominees n ON n.id = f.nominee_id AND n.award = f.award
+                JOIN nominees_titles nt ON nt.nominee_id = f.nominee_id AND nt.title_id = f.title_id AND nt.award = f.award
+                JOIN titles t ON t.id = f.title_id
+                LEFT JOIN nominees_entities ne ON ne.nominee_id = f.nominee_id AND ne.entity_id = f.entity_id AND ne.award = f.award
+                LEFT JOIN entities en ON en.id = f.entity_id
+                WHERE r.title_id = ANY(%s) AND r.entity_ord = 1
+                ORDER BY r.title_id, f.iteration ASC, cn.official_name ASC, f.winner DESC, f.nominee_id ASC, ne.statement_ind ASC, f.title_winner DESC;
                 """,
-                (id,),
+                (ids,),
             )
-            rows: list[EditionRow] = await cur.fetchall()  # type: ignore
-            editions = edition_rows_to_editions(rows, imdb_id)
+            rows = await cur.fetchall()  # type: ignore
+
+    # totals and aliases are otherwise derived from the skipped sections
+    if include != set(EntityOrTitleSection):
+        async with con.cursor(row_factory=class_row(EntityOrTitleRow)) as cur:  # type: ignore
+            await cur.execute(
+                """
+                SELECT
+                    t.id,
+                    t.imdb_id,
+                    'title' AS type,
+                    t.title AS name,
+                    ARRAY[t.title] AS aliases,
+                    SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END) AS total_noms,
+                    SUM(CASE WHEN f.title_winner = TRUE THEN 1 ELSE 0 END) AS total_wins
+                FROM nomination_facts f
+                JOIN titles t ON t.id = f.title_id
+                WHERE t.id = ANY(%s) AND f.entity_ord = 1 AND f.category_group_id IS NOT NULL
+                GROUP BY t.id, t.imdb_id, t.title
+                ORDER BY t.id;
+                """,
+                (ids,),
+            )
+            summary_rows = await cur.fetchall()  # type: ignore
+
+    return rows_to_entities_or_titles(summary_rows, rankings_rows, rows, True)
 
+
+def rows_to_entities_or_titles(
+    summary_rows: list[EntityOrTitleRow] | None,
+    rankings_rows: list[RankingsRow] | None,
+    rows: list[BatchEditionRow] | None,
+    is_title: bool,
+) -> dict[int, EntityOrTitle]:
+    """Assembles entities or titles from the rows of each fetched section;
+    sections that were skipped are passed as None."""
+    id_to_summary_row = {r.id: r for r in summary_rows or []}
+
+    id_to_rankings_rows: dict[int, list[RankingsRow]] = defaultdict(list)
+    for rankings_row in rankings_rows or []:
+        id_to_rankings_rows[rankings_row.id].append(rankings_row)
+
+    id_to_rows: dict[int, list[BatchEditionRow]] = defaultdict(list)
+    for row in rows or []:
+        id_to_rows[row.requested_id].append(row)
+
+    res: dict[int, EntityOrTitle] = {}
+    for id in id_to_summary_row if summary_rows is not None else id_to_rankings_rows:
+        if rankings_rows is not None and id not in id_to_rankings_rows:
+            continue
+        summary_row = id_to_summary_row.get(id)
+        imdb_id = (
+            summary_row.imdb_id if summary_row else id_to_rankings_rows[id][0].imdb_id
+        )
+
+        editions = None
+        if rows is not None:
+            editions = edition_rows_to_editions(
+                id_to_rows[id], imdb_id if is_title else ""  # type: ignore
+            )
             if not editions:
-                return None
+                continue
 
+        rankings = (
+            rankings_rows_to_rankings(id_to_rankings_rows[id])
+            if rankings_rows is not None
+            else None
+        )
+
+        if summary_row:
+            res[id] = EntityOrTitle(
+                **summary_row.model_dump(), nominations=editions, rankings=rankings
+            )
+            continue
+
+        assert editions is not None
+        if is_title:
             aliases = [
                 t.title
                 for t in editions[0].categories[0].nominees[0].titles
                 if t.imdb_id == imdb_id
             ]
+        else:
+            aliases = [
+                p.name
+                for e in editions
+                for c in e.categories
+                for n in c.nominees
+                for p in n.people
+                if p.imdb_id == imdb_id
+            ]
 
-        return EntityOrTitle(
+        res[id] = EntityOrTitle(
             id=id,
             imdb_id=imdb_id,
-            type=type,
-            name=name,
+            type=id_to_rankings_rows[id][0].type,
+            name=id_to_rankings_rows[id][0].name,
             aliases=list(set(aliases)),
             total_noms=sum(e.edition_noms for e in editions),
             total_wins=sum(e.edition_wins for e in editions),
@@ -328,38 +712,28 @@ async def get_title_by_id(id: int) -> EntityOrTitle | None:
             rankings=rankings,
         )
 
+    return res
 
-@router.get("/imdb/{imdb_id}", summary="Get entity or title by IMDb id")
-async def get_entity_or_title_by_imdb_id(imdb_id: str) -> EntityOrTitle | None:
-    async with connect() as con:
-        async with con.cursor() as cur:
-            if imdb_id.startswith("tt"):
-                await cur.execute(
-                    """
-                    SELECT id
-                    FROM titles
-                    WHERE imdb_id = %s
-                    """,
-                    (imdb_id,),
-                )
-            else:
-                await cur.execute(
-                    """
-                    SELECT id
-                    FROM entities
-                    WHERE imdb_id = %s
-                    """,
-                    (imdb_id,),
-                )
-            res = await cur.fetchall()
-            if not res:
-                return None
-            id: int = res[0][0]
 
-    return (
-        await get_title_by_id(id)
-        if imdb_id.startswith("tt")
-        else await get_entity_by_id(id)
+def to_collaborator(
+    directory: Directory, type: LeaderboardType, id: int, shared: int
+) -> Collaborator:
+    imdb_id, entry_type, name = subject_info(directory, type, id)
+    return Collaborator(
+        id=id, imdb_id=imdb_id, type=entry_type, name=name, shared=shared
+    )
+
+
+def batch_include(
+    include: list[EntityOrTitleSection] | None,
+) -> set[EntityOrTitleSection]:
+    return set(include) if include else set(EntityOrTitleSection)
+
+
+def to_batch(ids: list, res: dict) -> EntityOrTitleBatch:
+    return EntityOrTitleBatch(
+        results={str(id): res[id] for id in ids if id in res},
+        errors={str(id): "not found" for id in ids if id not in res},
     )
 
 
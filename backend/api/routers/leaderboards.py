@@ -0,0 +1,96 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from ..enums import LeaderboardMetric, LeaderboardType
+from ..models.leaderboard import LeaderboardEntry
+from ..services.dataset import get_index
+from ..services.leaderboards import Leaderboards
+
+router = APIRouter(prefix="/leaderboards", tags=["leaderboards"])
+
+
+@router.get("", summary="Get leaderboard")
+async def get_leaderboard(
+    metric: LeaderboardMetric = LeaderboardMetric.noms,
+    type: Annotated[
+        LeaderboardType,
+        Query(
+            description=(
+                """Type of title or entity to rank. `entity` ranks people,
+                companies, and countries together."""
+            )
+        ),
+    ] = LeaderboardType.person,
+    category_group: Annotated[
+        str | None,
+        Query(
+            description=(
+                """Only count nominations in this category group (must match
+                `/categories`), ex. `Acting`. Defaults to all category
+                groups."""
+            )
+        ),
+    ] = None,
+    category: Annotated[
+        str | None,
+        Query(
+            description=(
+                """Only count nominations in this category (must match
+                `/categories`), ex. `Director`. Takes precedence over
+                `category_group`. Defaults to all categories."""
+            )
+        ),
+    ] = None,
+    start_edition: Annotated[int, Query(ge=1, description="(inclusive)")] = 1,
+    end_edition: Annotated[
+        int | None,
+        Query(
+            description=(
+                """(inclusive) if null, ends at current edition. Defaults to
+                null."""
+            )
+        ),
+    ] = None,
+    min_noms: Annotated[
+        int,
+        Query(
+            ge=1,
+            description=(
+                """Only rank titles or entities with at least this many
+                nominations; mostly useful with `win_rate`."""
+            ),
+        ),
+    ] = 1,
+    limit: Annotated[int, Query(ge=1, le=100)] = 10,
+    offset: Annotated[int, Query(ge=0)] = 0,
+) -> list[LeaderboardEntry]:
+    """
+    Leaderboards are sorted by `metric`, then by nominations (or wins, when
+    sorting by nominations). Entries tied on `metric` share the same rank.
+    `win_rate` is wins divided by nominations.
+
+    Counts follow `/entities/{id}` and `/titles/{id}`: a title's wins only
+    include nominations in which the title itself won.
+
+    Example use cases:
+    - Which people have won the most Oscars?
+    > /leaderboards?metric=wins
+    - Which films received the most nominations in the 2010s?
+    > /leaderboards?type=title&start_edition=83&end_edition=92
+    - Which directors have the best win rate, among those with at least 3
+    nominations?
+    > /leaderboards?metric=win_rate&category=Director&min_noms=3
+    """
+    leaderboards = await get_index("leaderboards", Leaderboards)
+    return leaderboards.top(
+        type,
+        metric,
+        category_group,
+        category,
+        start_edition,
+        end_edition,
+        min_noms,
+        limit,
+        offset,
+    )
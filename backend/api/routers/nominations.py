@@ -1,12 +1,16 @@
+import base64
+import binascii
+import json
 from collections import defaultdict
-from typing import Annotated
+from enum import Enum
+from typing import Annotated, TypeVar
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query
 from psycopg import sql
 from psycopg.rows import class_row
 
-from ..dependencies import connect
-from ..enums import FilterAwardType, SortType
+from ..dependencies import COLUMNAR, EMBEDDED, connect
+from ..enums import FilterAwardType, NominationsSection, SortType
 from ..models.nominations import (
     AggStats,
     Category,
@@ -19,9 +23,60 @@ from ..models.nominations import (
     NomineeTitle,
     TitleStats,
 )
+from ..services import embedded
+from ..services.columnar import ColumnarStore
+from ..services.dataset import get_dataset, get_index
+from ..services.nominee_filter import NomineeFilter
+from ..services.nominee_sql import Conditions, NomineeQuery
 
 router = APIRouter(tags=["nominations"])
 
+S = TypeVar("S", bound=Enum)
+
+
+def include_pattern(sections: type[Enum]) -> str:
+    names = "|".join(s.value for s in sections)
+    return rf"^\s*({names})\s*(,\s*({names})\s*)*$"
+
+
+def parse_include(include: str | None, sections: type[S]) -> set[S]:
+    """Parses a comma-separated `include` param, defaulting to all sections."""
+    if not include:
+        return set(sections)
+    return {sections(s.strip()) for s in include.split(",")}
+
+
+# position of the last row returned for each stats section, or None once a
+# section has been fully returned; sections missing from a cursor start from the
+# top
+StatsCursor = dict[str, list[int] | None]
+
+
+def encode_stats_cursor(cursor: StatsCursor) -> str:
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+def decode_stats_cursor(cursor: str | None) -> StatsCursor:
+    if not cursor:
+        return {}
+    try:
+        res = json.loads(base64.urlsafe_b64decode(cursor))
+        lengths = {"title_stats": 3, "entity_stats": 4}
+        if isinstance(res, dict) and all(
+            k in lengths
+            and (
+                v is None
+                or isinstance(v, list)
+                and len(v) == lengths[k]
+                and all(isinstance(x, int) for x in v)
+            )
+            for k, v in res.items()
+        ):
+            return res
+    except (binascii.Error, ValueError):
+        pass
+    raise HTTPException(status_code=422, detail="Invalid stats_cursor")
+
 
 @router.get("/", summary="Get nominations")
 async def get_nominations(
@@ -80,16 +135,52 @@ async def get_nominations(
             )
         ),
     ] = SortType.ASC,
+    stats_limit: Annotated[
+        int | None,
+        Query(
+            ge=1,
+            description=(
+                """Max number of rows to return in each of `stats.title_stats`
+                and `stats.entity_stats`. Defaults to no limit."""
+            ),
+        ),
+    ] = None,
+    stats_cursor: Annotated[
+        str | None,
+        Query(
+            description=(
+                """`stats.next_cursor` from the previous page, used to fetch the
+                next `stats_limit` rows of each stats section."""
+            )
+        ),
+    ] = None,
+    include: Annotated[
+        str | None,
+        Query(
+            pattern=include_pattern(NominationsSection),
+            description=(
+                """Comma-separated list of sections to compute: `editions`,
+                `title_stats`, `entity_stats`, or `stats` (both stats). Sections
+                not listed are skipped and returned as null. Defaults to all
+                sections."""
+            ),
+        ),
+    ] = None,
 ) -> Nominations:
     """
-    Returned stats include all titles and entities matching the filtering
-    criteria (no limit/pagination).
-
     `stats.title_stats` contains one element per title and is sorted by `noms`,
-    then `wins`.
+    then `wins`, then id.
 
     `stats.entity_stats` contains one element per unique entity/category
-    combination and is sorted by `total_noms`, then `total_wins`.
+    combination and is sorted by `total_noms`, then `total_wins`, then entity and
+    category id.
+
+    By default, `stats_limit` is unset and stats include all titles and
+    entities matching the filtering criteria. With `stats_limit`, each stats
+    section returns at most that many rows, and `stats.next_cursor` is a keyset
+    cursor holding the sort key of the last row of each section: pass it as
+    `stats_cursor` to fetch the rows that follow. `stats.next_cursor` is null
+    once both sections have been fully returned.
 
     Example use cases:
     - Who's won the most Oscars for Acting since 2000?
@@ -98,257 +189,291 @@ async def get_nominations(
     > /?award=oscar
     - Get winners from the 96th Academy Awards.
     > /?award=oscar&start_edition=96&end_edition=96&winners_only=true
+    - Which films have received the most nominations all-time (without the full
+    list of nominations)?
+    > /?award=oscar&include=title_stats
+    - Who are the 10 most nominated people of the 1990s?
+    > /?award=oscar&start_edition=63&end_edition=72&include=entity_stats&stats_limit=10
     """
-    async with connect() as con:
-        async with con.cursor(row_factory=class_row(EditionRow)) as cur:  # type: ignore
-            filter_c_bool = True if categories else False
-            filter_c = (
-                [c.strip() for c in categories.split(",")] if categories else None
+    sections = parse_include(include, NominationsSection)
+    if NominationsSection.stats in sections:
+        sections |= {NominationsSection.title_stats, NominationsSection.entity_stats}
+
+    editions: list[Edition] | None = None
+    entity_stats: list[EntityStats] | None = None
+    title_stats: list[TitleStats] | None = None
+
+    cursor = decode_stats_cursor(stats_cursor)
+    title_after = cursor.get("title_stats", [None] * 3)
+    entity_after = cursor.get("entity_stats", [None] * 4)
+    # sections fully returned by previous pages are empty
+    if title_after is None and NominationsSection.title_stats in sections:
+        sections.discard(NominationsSection.title_stats)
+        title_stats = []
+    if entity_after is None and NominationsSection.entity_stats in sections:
+        sections.discard(NominationsSection.entity_stats)
+        entity_stats = []
+
+    filter_c = [c.strip() for c in categories.split(",")] if categories else None
+    filter_cg = (
+        [cg.strip() for cg in category_groups.split(",")] if category_groups else None
+    )
+
+    f = NomineeFilter(
+        award=award,
+        start_edition=start_edition,
+        end_edition=end_edition,
+        winners_only=winners_only,
+        pending=pending,
+        categories=filter_c,
+        category_groups=filter_cg,
+    )
+    if COLUMNAR and sections & {
+        NominationsSection.title_stats,
+        NominationsSection.entity_stats,
+    }:
+        store = await get_index("columnar", ColumnarStore)
+        if NominationsSection.entity_stats in sections:
+            sections.discard(NominationsSection.entity_stats)
+            entity_stats = store.entity_stats(f, entity_after, stats_limit)  # type: ignore
+        if NominationsSection.title_stats in sections:
+            sections.discard(NominationsSection.title_stats)
+            title_stats = store.title_stats(f, title_after, stats_limit)  # type: ignore
+
+    if EMBEDDED:
+        dataset = await get_dataset()
+        if NominationsSection.editions in sections:
+            editions = edition_rows_to_editions(
+                embedded.edition_rows(dataset, f, sort_editions, sort_categories), ""
             )
-            filter_cg_bool = True if category_groups else False
-            filter_cg = (
-                [cg.strip() for cg in category_groups.split(",")]
-                if category_groups
-                else None
+        if NominationsSection.entity_stats in sections:
+            entity_stats = embedded.entity_stats(
+                dataset, f, entity_after, stats_limit  # type: ignore
             )
-
-            order_clause = sql.SQL(
-                "ORDER BY {}, n.winner DESC, n.id ASC, ne.statement_ind ASC, nt.winner DESC"
-            ).format(
-                sql.SQL(", ").join(
-                    [
-                        sql.SQL(" ").join(
-                            [
-                                sql.Identifier("e", "iteration"),
-                                sql.SQL(sort_editions.name),
-                            ]
-                        ),
-                        sql.SQL(" ").join(
+        if NominationsSection.title_stats in sections:
+            title_stats = embedded.title_stats(
+                dataset, f, title_after, stats_limit  # type: ignore
+            )
+    else:
+        async with connect() as con:
+            if NominationsSection.editions in sections:
+                async with con.cursor(row_factory=class_row(EditionRow)) as cur:  # type: ignore
+                    order_clause = sql.SQL(
+                        "ORDER BY {}, f.winner DESC, f.nominee_id ASC, ne.statement_ind ASC, f.title_winner DESC"
+                    ).format(
+                        sql.SQL(", ").join(
                             [
-                                sql.Identifier("cn", "official_name"),
-                                sql.SQL(sort_categories.name),
+                                sql.SQL(" ").join(
+                                    [
+                                        sql.Identifier("f", "iteration"),
+                                        sql.SQL(sort_editions.name),
+                                    ]
+                                ),
+                                sql.SQL(" ").join(
+                                    [
+                                        sql.Identifier("cn", "official_name"),
+                                        sql.SQL(sort_categories.name),
+                                    ]
+                                ),
                             ]
+                        )
+                    )
+
+                    q = NomineeQuery("n", "e", "cn", "c", "cg")
+                    q.filter(f)
+                    await cur.execute(
+                        sql.SQL(
+                            """
+                            SELECT
+                                f.edition_id,
+                                f.iteration,
+                                e.official_year,
+                                e.ceremony_date,
+                                f.category_id,
+                                f.category_name_id,
+                                cg.name AS category_group,
+                                cn.official_name,
+                                cn.common_name,
+                                c.name AS short_name,
+                                f.nominee_id,
+                                f.winner,
+                                f.title_id,
+                                t.title,
+                                t.imdb_id AS title_imdb_id,
+                                nt.detail,
+                                f.title_winner,
+                                f.entity_id AS person_id,
+                                ne.name,
+                                en.imdb_id AS person_imdb_id,
+                                ne.statement_ind,
+                                n.statement,
+                                f.is_person,
+                                n.note,
+                                f.official,
+                                f.stat,
+                                f.pending
+                            {}
+                            {}
+                            {}
+                            """
+                        ).format(
+                            q.from_clause(
+                                "LEFT JOIN nominees_entities ne ON ne.nominee_id = f.nominee_id AND ne.entity_id = f.entity_id AND ne.award = f.award",
+                                "LEFT JOIN entities en ON en.id = f.entity_id",
+                                # some nominations have no associated title
+                                "LEFT JOIN nominees_titles nt ON nt.nominee_id = f.nominee_id AND nt.title_id = f.title_id AND nt.award = f.award",
+                                "LEFT JOIN titles t ON t.id = f.title_id",
+                            ),
+                            q.where.clause("WHERE"),
+                            order_clause,
                         ),
-                    ]
-                )
-            )
+                        q.params,
+                    )
+                    rows: list[EditionRow] = await cur.fetchall()  # type: ignore
+                    editions = edition_rows_to_editions(rows, "")
 
-            await cur.execute(
-                sql.SQL(
-                    """
-                    SELECT
-                        e.id AS edition_id,
-                        e.iteration,
-                        e.official_year,
-                        e.ceremony_date,
-                        c.id AS category_id,
-                        cn.id AS category_name_id,
-                        cg.name AS category_group,
-                        cn.official_name,
-                        cn.common_name,
-                        c.name AS short_name,
-                        n.id AS nominee_id,
-                        n.winner,
-                        t.id AS title_id,
-                        t.title,
-                        t.imdb_id AS title_imdb_id,
-                        nt.detail,
-                        nt.winner AS title_winner,
-                        en.id AS person_id,
-                        ne.name,
-                        en.imdb_id AS person_imdb_id,
-                        ne.statement_ind,
-                        n.statement,
-                        n.is_person,
-                        n.note,
-                        n.official,
-                        n.stat,
-                        n.pending
-                    FROM category_names cn
-                    JOIN categories c ON c.id = cn.category_id
-                    JOIN category_groups cg ON cg.id = c.category_group_id
-                    JOIN editions_category_names ecn ON cn.id = ecn.category_name_id
-                    JOIN editions e ON e.id = ecn.edition_id
-                    JOIN nominees n ON n.edition_id = e.id AND n.category_name_id = cn.id
-                    LEFT JOIN nominees_entities ne ON ne.nominee_id = n.id
-                    LEFT JOIN entities en ON en.id = ne.entity_id
-                    LEFT JOIN nominees_titles nt ON nt.nominee_id = n.id -- some nominations have no associated title
-                    LEFT JOIN titles t ON nt.title_id = t.id
-                    WHERE
-                        (%(award)s::award_type IS NULL OR n.award = %(award)s) AND
-                        e.iteration >= %(start_edition)s AND
-                        (%(end_edition)s::integer IS NULL OR e.iteration <= %(end_edition)s) AND
-                        (%(winners_only)s = FALSE OR n.winner = TRUE) AND
-                        (%(filter_c_bool)s = FALSE OR c.name = ANY(%(filter_c)s)) AND
-                        (%(filter_cg_bool)s = FALSE OR cg.name = ANY(%(filter_cg)s)) AND
-                        (%(pending)s::boolean IS NULL OR (%(pending)s = FALSE AND n.pending = FALSE) OR (%(pending)s = TRUE AND n.pending = TRUE))
-                    {}
-                    """
-                ).format(order_clause),
-                {
-                    "award": award if award != FilterAwardType.all else None,
-                    "start_edition": start_edition,
-                    "end_edition": end_edition,
-                    "winners_only": winners_only,
-                    "filter_c_bool": filter_c_bool,
-                    "filter_c": filter_c,
-                    "filter_cg_bool": filter_cg_bool,
-                    "filter_cg": filter_cg,
-                    "pending": pending,
-                },
-            )
-            rows: list[EditionRow] = await cur.fetchall()  # type: ignore
-            editions: list[Edition] = edition_rows_to_editions(rows, "")
-
-        async with con.cursor(row_factory=class_row(EntityStats)) as cur:  # type: ignore
-            await cur.execute(
-                """
-                SELECT id, imdb_id, aliases, category_id, category_noms, category_wins, total_noms, total_wins, career_category_noms, career_category_wins, career_total_noms, career_total_wins
-                FROM (
-                    SELECT
-                        en.id,
-                        en.imdb_id,
-                        array_agg(DISTINCT ne.name) AS aliases,
-                        cg.id AS category_group_id,
-                        cg.name AS category_group,
-                        c.id AS category_id,
-                        c.name AS category,
-                        SUM(
-                            CASE
-                                WHEN
-                                    n.stat = TRUE AND
-                                    e.iteration >= %(start_edition)s AND
-                                    (%(end_edition)s::integer IS NULL OR e.iteration <= %(end_edition)s)
-                                    THEN 1
-                                ELSE 0
-                            END
-                        ) AS category_noms,
-                        SUM(
-                            CASE
-                                WHEN
-                                    n.winner = TRUE AND
-                                    e.iteration >= %(start_edition)s AND
-                                    (%(end_edition)s::integer IS NULL OR e.iteration <= %(end_edition)s)
-                                    THEN 1
-                                ELSE 0
-                            END
-                        ) AS category_wins,
-                        SUM(
-                            SUM(
-                                CASE
-                                    WHEN
-                                        n.stat = TRUE AND
-                                        e.iteration >= %(start_edition)s AND
-                                        (%(end_edition)s::integer IS NULL OR e.iteration <= %(end_edition)s)
-                                        THEN 1
-                                    ELSE 0
-                                END
-                            )
-                        ) OVER (PARTITION BY en.id) AS total_noms,
-                        SUM(
-                            SUM(
-                                CASE
-                                    WHEN
-                                        n.winner = TRUE AND
-                                        e.iteration >= %(start_edition)s AND
-                                        (%(end_edition)s::integer IS NULL OR e.iteration <= %(end_edition)s)
-                                        THEN 1
-                                    ELSE 0
-                                END
+            if NominationsSection.entity_stats in sections:
+                async with con.cursor(row_factory=class_row(EntityStats)) as cur:  # type: ignore
+                    # career columns count every edition, so the edition range
+                    # and category filters are applied outside the inner WHERE
+                    q = NomineeQuery("c", "cg", grain="entity")
+                    q.filter(f, edition_range=False, categories=False)
+                    in_range = q.edition_range(f)
+                    outer = Conditions(q.params)
+                    if in_range:
+                        outer.add("valid = TRUE")
+                    if f.categories:
+                        outer.add("category = ANY(%(filter_c)s)", filter_c=f.categories)
+                    if f.category_groups:
+                        outer.add(
+                            "category_group = ANY(%(filter_cg)s)",
+                            filter_cg=f.category_groups,
+                        )
+                    if entity_after[0] is not None:
+                        outer.add(
+                            "(total_noms, total_wins, -id, -category_id) < (%(after_noms)s, %(after_wins)s, -%(after_id)s::integer, -%(after_category_id)s::integer)",
+                            after_noms=entity_after[0],
+                            after_wins=entity_after[1],
+                            after_id=entity_after[2],
+                            after_category_id=entity_after[3],
+                        )
+                    q.params["stats_limit"] = stats_limit
+
+                    await cur.execute(
+                        sql.SQL(
+                            """
+                            SELECT id, imdb_id, aliases, category_id, category_noms, category_wins, total_noms, total_wins, career_category_noms, career_category_wins, career_total_noms, career_total_wins
+                            FROM (
+                                SELECT
+                                    en.id,
+                                    en.imdb_id,
+                                    array_agg(DISTINCT ne.name) AS aliases,
+                                    cg.id AS category_group_id,
+                                    cg.name AS category_group,
+                                    c.id AS category_id,
+                                    c.name AS category,
+                                    SUM(CASE WHEN f.stat = TRUE AND {in_range} THEN 1 ELSE 0 END) AS category_noms,
+                                    SUM(CASE WHEN f.winner = TRUE AND {in_range} THEN 1 ELSE 0 END) AS category_wins,
+                                    SUM(SUM(CASE WHEN f.stat = TRUE AND {in_range} THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id) AS total_noms,
+                                    SUM(SUM(CASE WHEN f.winner = TRUE AND {in_range} THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id) AS total_wins,
+                                    SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END) AS career_category_noms,
+                                    SUM(CASE WHEN f.winner = TRUE THEN 1 ELSE 0 END) AS career_category_wins,
+                                    SUM(SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id) AS career_total_noms,
+                                    SUM(SUM(CASE WHEN f.winner = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id) AS career_total_wins,
+                                    bool_or({in_range}) AS valid
+                                {from_clause}
+                                {where}
+                                GROUP BY en.id, en.imdb_id, cg.id, cg.name, c.id, c.name
                             )
-                        ) OVER (PARTITION BY en.id) AS total_wins,
-                        SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) AS career_category_noms,
-                        SUM(CASE WHEN n.winner = TRUE THEN 1 ELSE 0 END) AS career_category_wins,
-                        SUM(SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id) AS career_total_noms,
-                        SUM(SUM(CASE WHEN n.winner = TRUE THEN 1 ELSE 0 END)) OVER (PARTITION BY en.id) AS career_total_wins,
-                        SUM(
-                            CASE
-                                WHEN
-                                    e.iteration >= %(start_edition)s AND
-                                    (%(end_edition)s::integer IS NULL OR e.iteration <= %(end_edition)s)
-                                    THEN 1
-                                ELSE 0
-                            END
-                        ) > 0 AS valid
-                    FROM category_names cn
-                    JOIN categories c ON c.id = cn.category_id
-                    JOIN category_groups cg ON cg.id = c.category_group_id
-                    JOIN editions_category_names ecn ON cn.id = ecn.category_name_id
-                    JOIN editions e ON e.id = ecn.edition_id
-                    JOIN nominees n ON n.edition_id = e.id AND n.category_name_id = cn.id
-                    JOIN nominees_entities ne ON ne.nominee_id = n.id
-                    JOIN entities en ON ne.entity_id = en.id
-                    WHERE
-                        (%(award)s::award_type IS NULL OR n.award = %(award)s) AND
-                        (%(winners_only)s = FALSE OR n.winner = TRUE) AND
-                        (%(pending)s::boolean IS NULL OR (%(pending)s = FALSE AND n.pending = FALSE) OR (%(pending)s = TRUE AND n.pending = TRUE))
-                    GROUP BY en.id, en.imdb_id, cg.id, cg.name, c.id, c.name
-                )
-                WHERE
-                    valid = TRUE AND
-                    (%(filter_c_bool)s = FALSE OR category = ANY(%(filter_c)s)) AND
-                    (%(filter_cg_bool)s = FALSE OR category_group = ANY(%(filter_cg)s))
-                ORDER BY total_noms DESC, total_wins DESC, aliases[0] ASC;
-                """,
-                {
-                    "award": award if award != FilterAwardType.all else None,
-                    "start_edition": start_edition,
-                    "end_edition": end_edition,
-                    "winners_only": winners_only,
-                    "filter_c_bool": filter_c_bool,
-                    "filter_c": filter_c,
-                    "filter_cg_bool": filter_cg_bool,
-                    "filter_cg": filter_cg,
-                    "pending": pending,
-                },
+                            {outer}
+                            ORDER BY total_noms DESC, total_wins DESC, id ASC, category_id ASC
+                            LIMIT %(stats_limit)s;
+                            """
+                        ).format(
+                            in_range=sql.SQL(in_range or "TRUE"),
+                            from_clause=q.from_clause(
+                                "JOIN nominees_entities ne ON ne.nominee_id = f.nominee_id AND ne.entity_id = f.entity_id AND ne.award = f.award",
+                                "JOIN entities en ON en.id = f.entity_id",
+                            ),
+                            where=q.where.clause("WHERE"),
+                            outer=outer.clause("WHERE"),
+                        ),
+                        q.params,
+                    )
+                    entity_stats = await cur.fetchall()  # type: ignore
+
+            if NominationsSection.title_stats in sections:
+                async with con.cursor(row_factory=class_row(TitleStats)) as cur:  # type: ignore
+                    q = NomineeQuery(grain="title")
+                    q.filter(f)
+                    if title_after[0] is not None:
+                        q.having.add(
+                            "(SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END), SUM(CASE WHEN f.title_winner = TRUE THEN 1 ELSE 0 END), -t.id) < (%(after_noms)s, %(after_wins)s, -%(after_id)s::integer)",
+                            after_noms=title_after[0],
+                            after_wins=title_after[1],
+                            after_id=title_after[2],
+                        )
+                    q.params["stats_limit"] = stats_limit
+
+                    await cur.execute(
+                        sql.SQL(
+                            """
+                            SELECT
+                                t.id,
+                                t.imdb_id,
+                                t.title,
+                                SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END) AS noms,
+                                SUM(CASE WHEN f.title_winner = TRUE THEN 1 ELSE 0 END) AS wins
+                            {}
+                            {}
+                            GROUP BY t.id, t.imdb_id, t.title
+                            {}
+                            ORDER BY noms DESC, wins DESC, t.id ASC
+                            LIMIT %(stats_limit)s
+                            """
+                        ).format(
+                            q.from_clause("JOIN titles t ON t.id = f.title_id"),
+                            q.where.clause("WHERE"),
+                            q.having.clause("HAVING"),
+                        ),
+                        q.params,
+                    )
+                    title_stats = await cur.fetchall()  # type: ignore
+
+    next_cursor = None
+    if stats_limit is not None:
+        positions = dict(cursor)
+        if title_stats is not None and title_after is not None:
+            positions["title_stats"] = (
+                [title_stats[-1].noms, title_stats[-1].wins, title_stats[-1].id]
+                if len(title_stats) == stats_limit
+                else None
             )
-            entity_stats: list[EntityStats] = await cur.fetchall()  # type: ignore
-
-        async with con.cursor(row_factory=class_row(TitleStats)) as cur:  # type: ignore
-            await cur.execute(
-                """
-                SELECT
-                    t.id,
-                    t.imdb_id,
-                    t.title,
-                    SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) AS noms,
-                    SUM(CASE WHEN nt.winner = TRUE THEN 1 ELSE 0 END) AS wins
-                FROM category_names cn
-                JOIN categories c ON c.id = cn.category_id
-                JOIN category_groups cg ON cg.id = c.category_group_id
-                JOIN editions_category_names ecn ON cn.id = ecn.category_name_id
-                JOIN editions e ON e.id = ecn.edition_id
-                JOIN nominees n ON n.edition_id = e.id AND n.category_name_id = cn.id
-                JOIN nominees_titles nt ON nt.nominee_id = n.id
-                JOIN titles t ON nt.title_id = t.id
-                WHERE
-                    (%(award)s::award_type IS NULL OR n.award = %(award)s) AND
-                    e.iteration >= %(start_edition)s AND
-                    (%(end_edition)s::integer IS NULL OR e.iteration <= %(end_edition)s) AND
-                    (%(winners_only)s = FALSE OR n.winner = TRUE) AND
-                    (%(filter_c_bool)s = FALSE OR c.name = ANY(%(filter_c)s)) AND
-                    (%(filter_cg_bool)s = FALSE OR cg.name = ANY(%(filter_cg)s)) AND
-                    (%(pending)s::boolean IS NULL OR (%(pending)s = FALSE AND n.pending = FALSE) OR (%(pending)s = TRUE AND n.pending = TRUE))
-                GROUP BY t.id, t.imdb_id, t.title
-                ORDER BY noms DESC, wins DESC
-                """,
-                {
-                    "award": award if award != FilterAwardType.all else None,
-                    "start_edition": start_edition,
-                    "end_edition": end_edition,
-                    "winners_only": winners_only,
-                    "filter_c_bool": filter_c_bool,
-                    "filter_c": filter_c,
-                    "filter_cg_bool": filter_cg_bool,
-                    "filter_cg": filter_cg,
-                    "pending": pending,
-                },
+        if entity_stats is not None and entity_after is not None:
+            positions["entity_stats"] = (
+                [
+                    entity_stats[-1].total_noms,
+                    entity_stats[-1].total_wins,
+                    entity_stats[-1].id,
+                    entity_stats[-1].category_id,
+                ]
+                if len(entity_stats) == stats_limit
+                else None
             )
-            title_stats: list[TitleStats] = await cur.fetchall()  # type: ignore
+        if any(v is not None for v in positions.values()):
+            next_cursor = encode_stats_cursor(positions)
 
     res = Nominations(
         editions=editions,
-        stats=AggStats(title_stats=title_stats, entity_stats=entity_stats),
+        stats=(
+            AggStats(
+                title_stats=title_stats,
+                entity_stats=entity_stats,
+                next_cursor=next_cursor,
+            )
+            if title_stats is not None or entity_stats is not None
+            else None
+        ),
     )
 
     return res
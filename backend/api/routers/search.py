@@ -1,9 +1,10 @@
 from typing import Annotated, Type
 
 from fastapi import APIRouter, Query
+from psycopg import sql
 from psycopg.rows import class_row
 
-from ..dependencies import connect
+from ..dependencies import EMBEDDED, connect
 from ..enums import FilterAwardType, FilterEntityType, FilterType
 from ..models.search import (
     CategoryResult,
@@ -15,9 +16,16 @@ from ..models.search import (
     EntitySearchGroup,
     SearchGroup,
     SearchResults,
+    SuggestResults,
     TitleResult,
     TitleSearchGroup,
 )
+from ..services import embedded
+from ..services.category_bits import CategoryBitsets, IdFilter
+from ..services.dataset import get_dataset, get_index
+from ..services.nominee_filter import NomineeFilter
+from ..services.nominee_sql import NomineeQuery
+from ..services.suggest import MAX_SUGGESTIONS, SuggestIndex
 
 router = APIRouter(prefix="/search", tags=["search"])
 
@@ -157,333 +165,441 @@ async def search_all(
     - Get films nominated for Best Picture but not Best Director since 2000.
     > /search?award=oscar&type=title&noms_in_categories=Picture&no_noms_in_categories=Director&start_edition=72
     """
-    async with connect() as con:
-        PAGE_SIZE = 10
+    PAGE_SIZE = 10
 
-        filter_c = (
-            list({c.strip() for c in categories.split(",")}) if categories else None
-        )
-        filter_cg = (
-            list({cg.strip() for cg in category_groups.split(",")})
-            if category_groups
-            else None
-        )
-        filter_nic = (
-            list({c.strip() for c in noms_in_categories.split(",")})
-            if noms_in_categories
-            else None
-        )
-        filter_nnic = (
-            list({c.strip() for c in no_noms_in_categories.split(",")})
-            if no_noms_in_categories
-            else None
-        )
-        filter_wic = (
-            list({c.strip() for c in wins_in_categories.split(",")})
-            if wins_in_categories
-            else None
+    filter_c = list({c.strip() for c in categories.split(",")}) if categories else None
+    filter_cg = (
+        list({cg.strip() for cg in category_groups.split(",")})
+        if category_groups
+        else None
+    )
+    filter_nic = (
+        list({c.strip() for c in noms_in_categories.split(",")})
+        if noms_in_categories
+        else None
+    )
+    filter_nnic = (
+        list({c.strip() for c in no_noms_in_categories.split(",")})
+        if no_noms_in_categories
+        else None
+    )
+    filter_wic = (
+        list({c.strip() for c in wins_in_categories.split(",")})
+        if wins_in_categories
+        else None
+    )
+    filter_nwic = (
+        list({c.strip() for c in no_wins_in_categories.split(",")})
+        if no_wins_in_categories
+        else None
+    )
+
+    # category set filters are evaluated against precomputed bitsets, and
+    # the resulting ids (or their complement, if shorter) are passed to the
+    # queries as a prefilter
+    title_ids: IdFilter | None = None
+    entity_ids: IdFilter | None = None
+    if filter_nic or filter_nnic or filter_wic or filter_nwic:
+        bitsets = await get_index("category_bits", CategoryBitsets)
+        category_filter = bitsets.build_filter(
+            filter_c, filter_cg, filter_nic, filter_nnic, filter_wic, filter_nwic
         )
-        filter_nwic = (
-            list({c.strip() for c in no_wins_in_categories.split(",")})
-            if no_wins_in_categories
-            else None
+        award_filter = award if award != FilterAwardType.all else None
+        title_ids = bitsets.matching_ids(
+            bitsets.titles,
+            category_filter,
+            award_filter,
+            start_edition,
+            end_edition,
         )
+        if single_ceremony:
+            entity_ids = bitsets.matching_id_editions(
+                bitsets.entities,
+                category_filter,
+                award_filter,
+                start_edition,
+                end_edition,
+            )
+        else:
+            entity_ids = bitsets.matching_ids(
+                bitsets.entities,
+                category_filter,
+                award_filter,
+                start_edition,
+                end_edition,
+            )
+
+    f = NomineeFilter(
+        award=award,
+        start_edition=start_edition,
+        end_edition=end_edition,
+        winners_only=False,
+        pending=None,
+        categories=filter_c,
+        category_groups=filter_cg,
+    )
+
+    counts = embedded.CountFilter(min_noms, max_noms, min_wins, max_wins, noms_eq_wins)
+    limit, offset = PAGE_SIZE + 1, (page - 1) * PAGE_SIZE
 
-        async with con.cursor(row_factory=class_row(TitleResult)) as cur:  # type: ignore
-            titles_res: list[TitleResult] = []
-            if type == FilterType.all or type == FilterType.title_:
-                await cur.execute(
-                    """
-                    SELECT
-                        t.id,
-                        t.imdb_id,
-                        'title' AS type,
-                        t.title,
-                        array_agg(DISTINCT e.iteration) AS iterations,
-                        SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) AS noms,
-                        SUM(CASE WHEN nt.winner = TRUE THEN 1 ELSE 0 END) AS wins,
-                        (CASE WHEN %(query)s::text IS NULL THEN 0+0 ELSE (%(query)s <<-> t.title) END) AS word_dist,
-                        (CASE WHEN %(query)s::text IS NULL THEN 0+0 ELSE (%(query)s <-> t.title) END) AS dist
-                    FROM category_names cn
-                    JOIN categories c ON c.id = cn.category_id
-                    JOIN category_groups cg ON cg.id = c.category_group_id
-                    JOIN editions_category_names ecn ON cn.id = ecn.category_name_id
-                    JOIN editions e ON e.id = ecn.edition_id
-                    JOIN nominees n ON n.edition_id = e.id AND n.category_name_id = cn.id
-                    JOIN nominees_titles nt ON nt.nominee_id = n.id
-                    JOIN titles t ON nt.title_id = t.id
-                    WHERE
-                        (%(award)s::award_type IS NULL OR n.award = %(award)s) AND
-                        (%(query)s::text IS NULL OR %(query)s <%% t.title) AND
-                        e.iteration >= %(start_edition)s AND
-                        (%(end_edition)s::integer IS NULL OR e.iteration <= %(end_edition)s) AND
-                        (%(filter_c)s::text[] IS NULL OR c.name = ANY(%(filter_c)s)) AND
-                        (%(filter_cg)s::text[] IS NULL OR cg.name = ANY(%(filter_cg)s))
-                    GROUP BY t.id, t.imdb_id, t.title
-                    HAVING
-                        SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) >= %(min_noms)s AND
-                        (%(max_noms)s::integer IS NULL OR SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) <= %(max_noms)s) AND
-                        SUM(CASE WHEN nt.winner = TRUE THEN 1 ELSE 0 END) >= %(min_wins)s AND
-                        (%(max_wins)s::integer IS NULL OR SUM(CASE WHEN nt.winner = TRUE THEN 1 ELSE 0 END) <= %(max_wins)s) AND
-                        (%(noms_eq_wins)s::boolean IS NULL OR
-                        (%(noms_eq_wins)s = TRUE AND SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) = SUM(CASE WHEN nt.winner = TRUE THEN 1 ELSE 0 END)) OR
-                        (%(noms_eq_wins)s = FALSE AND SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) != SUM(CASE WHEN nt.winner = TRUE THEN 1 ELSE 0 END))
-                        ) AND
-                        (%(noms_in_categories)s::text[] IS NULL OR array_agg(c.name) FILTER (WHERE n.stat = TRUE) @> %(noms_in_categories)s) AND
-                        (%(no_noms_in_categories)s::text[] IS NULL OR array_agg(c.name) FILTER (WHERE n.stat = TRUE) && %(no_noms_in_categories)s = FALSE) AND
-                        (%(wins_in_categories)s::text[] IS NULL OR array_agg(c.name) FILTER (WHERE nt.winner = TRUE) @> %(wins_in_categories)s) AND
-                        (%(no_wins_in_categories)s::text[] IS NULL OR array_agg(c.name) FILTER (WHERE nt.winner = TRUE) && %(no_wins_in_categories)s = FALSE)
-                    ORDER BY
-                        word_dist,
-                        dist,
-                        noms DESC,
-                        wins DESC
-                    LIMIT %(limit)s
-                    OFFSET %(offset)s;
-                    """,
-                    {
-                        "award": award if award != FilterAwardType.all else None,
-                        "query": query,
-                        "min_noms": min_noms,
-                        "max_noms": max_noms,
-                        "min_wins": min_wins,
-                        "max_wins": max_wins,
-                        "noms_eq_wins": noms_eq_wins,
-                        "noms_in_categories": filter_nic,
-                        "no_noms_in_categories": filter_nnic,
-                        "wins_in_categories": filter_wic,
-                        "no_wins_in_categories": filter_nwic,
-                        "start_edition": start_edition,
-                        "end_edition": end_edition,
-                        "filter_c": filter_c,
-                        "filter_cg": filter_cg,
-                        "limit": PAGE_SIZE + 1,
-                        "offset": (page - 1) * PAGE_SIZE,
-                    },
-                )
-                titles_res = await cur.fetchall()  # type: ignore
+    titles_res: list[TitleResult] = []
+    entities_res: list[EntityResult] = []
+    categories_res: list[CategoryResult] = []
+    ceremonies_res: list[CeremonyResult] = []
+    if EMBEDDED:
+        dataset = await get_dataset()
+        if type == FilterType.all or type == FilterType.title_:
+            titles_res = embedded.title_results(
+                dataset, f, counts, query, title_ids, limit, offset
+            )
+        if type == FilterType.all or type == FilterType.entity:
+            entities_res = embedded.entity_results(
+                dataset,
+                f,
+                counts,
+                query,
+                entity_type if entity_type != FilterEntityType.all else None,
+                entity_ids,
+                single_ceremony,
+                limit,
+                offset,
+            )
+        if (
+            type == FilterType.all or type == FilterType.category
+        ) and query is not None:
+            categories_res = embedded.category_results(dataset, query, limit, offset)
+        if (
+            type == FilterType.all or type == FilterType.ceremony
+        ) and query is not None:
+            ceremonies_res = embedded.ceremony_results(dataset, query, limit, offset)
+    else:
+        async with connect() as con:
+            page_params = {"limit": limit, "offset": offset}
 
-        async with con.cursor(row_factory=class_row(EntityResultRow)) as cur:  # type: ignore
-            entities_res: list[EntityResult] = []
-            if type == FilterType.all or type == FilterType.entity:
-                await cur.execute(
-                    """
-                    WITH a AS (
-                        SELECT en.id, ARRAY_AGG(DISTINCT ne.name) AS aliases
-                        FROM nominees_entities ne
-                        JOIN entities en ON ne.entity_id = en.id
-                        GROUP BY en.id
+            async with con.cursor(row_factory=class_row(TitleResult)) as cur:  # type: ignore
+                if type == FilterType.all or type == FilterType.title_:
+                    q = NomineeQuery(grain="title")
+                    q.filter(f)
+                    if query is not None:
+                        q.where.add("%(query)s <%% t.title", query=query)
+                    if title_ids is not None:
+                        q.where.add(
+                            (
+                                "t.id <> ALL(%(ids)s)"
+                                if title_ids.negated
+                                else "t.id = ANY(%(ids)s)"
+                            ),
+                            ids=title_ids.ids,
+                        )
+                    q.count_filters(
+                        "SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END)",
+                        "SUM(CASE WHEN f.title_winner = TRUE THEN 1 ELSE 0 END)",
+                        min_noms,
+                        max_noms,
+                        min_wins,
+                        max_wins,
+                        noms_eq_wins,
                     )
-                    SELECT
-                        en.id,
-                        en.imdb_id,
-                        en.type,
-                        en.name,
-                        a.aliases,
-	                    cardinality(array_agg(array_agg(DISTINCT e.iteration)) OVER w) AS occurrences,
-                        array_agg(array_agg(DISTINCT e.iteration)) OVER w AS iterations,
-                        SUM(SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END)) OVER w AS noms,
-	                    SUM(SUM(CASE WHEN n.winner = TRUE THEN 1 ELSE 0 END)) OVER w AS wins,
-                        (CASE WHEN %(query)s::text IS NULL THEN 0+0 ELSE (%(query)s <<-> en.name) END) AS word_dist,
-                        (CASE WHEN %(query)s::text IS NULL THEN 0+0 ELSE (%(query)s <-> en.name) END) AS dist
-                    FROM category_names cn
-                    JOIN categories c ON c.id = cn.category_id
-                    JOIN category_groups cg ON cg.id = c.category_group_id
-                    JOIN editions_category_names ecn ON cn.id = ecn.category_name_id
-                    JOIN editions e ON e.id = ecn.edition_id
-                    JOIN nominees n ON n.edition_id = e.id AND n.category_name_id = cn.id
-                    JOIN nominees_entities ne ON ne.nominee_id = n.id
-                    JOIN entities en ON ne.entity_id = en.id
-                    JOIN a ON a.id = en.id
-                    WHERE
-                        (%(award)s::award_type IS NULL OR n.award = %(award)s) AND
-                        (%(entity_type)s::entity_type IS NULL OR en.type = %(entity_type)s) AND
-                        (%(query)s::text IS NULL OR %(query)s <%% ANY(a.aliases)) AND
-                        e.iteration >= %(start_edition)s AND
-                        (%(end_edition)s::integer IS NULL OR e.iteration <= %(end_edition)s) AND
-                        (%(filter_c)s::text[] IS NULL OR c.name = ANY(%(filter_c)s)) AND
-                        (%(filter_cg)s::text[] IS NULL OR cg.name = ANY(%(filter_cg)s))
-                    GROUP BY
-                        (CASE WHEN %(single_ceremony)s = TRUE THEN e.id ELSE 0+0 END),
-                        en.id,
-                        en.imdb_id,
-                        en.type,
-                        en.name,
-                        a.aliases
-                    HAVING
-                        SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) >= %(min_noms)s AND
-                        (%(max_noms)s::integer IS NULL OR SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) <= %(max_noms)s) AND
-                        SUM(CASE WHEN n.winner = TRUE THEN 1 ELSE 0 END) >= %(min_wins)s AND
-                        (%(max_wins)s::integer IS NULL OR SUM(CASE WHEN n.winner = TRUE THEN 1 ELSE 0 END) <= %(max_wins)s) AND
-                        (%(noms_eq_wins)s::boolean IS NULL OR
-                        (%(noms_eq_wins)s = TRUE AND SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) = SUM(CASE WHEN n.winner = TRUE THEN 1 ELSE 0 END)) OR
-                        (%(noms_eq_wins)s = FALSE AND SUM(CASE WHEN n.stat = TRUE THEN 1 ELSE 0 END) != SUM(CASE WHEN n.winner = TRUE THEN 1 ELSE 0 END))
-                        ) AND
-                        (%(noms_in_categories)s::text[] IS NULL OR array_agg(c.name) FILTER (WHERE n.stat = TRUE) @> %(noms_in_categories)s) AND
-                        (%(no_noms_in_categories)s::text[] IS NULL OR array_agg(c.name) FILTER (WHERE n.stat = TRUE) && %(no_noms_in_categories)s = FALSE) AND
-                        (%(wins_in_categories)s::text[] IS NULL OR array_agg(c.name) FILTER (WHERE n.winner = TRUE) @> %(wins_in_categories)s) AND
-                        (%(no_wins_in_categories)s::text[] IS NULL OR array_agg(c.name) FILTER (WHERE n.winner = TRUE) && %(no_wins_in_categories)s = FALSE)
-                    WINDOW w AS (PARTITION BY en.id)
-                    ORDER BY
-                        word_dist,
-                        dist,
-                        occurrences DESC,
-                        noms DESC,
-                        wins DESC
-                    LIMIT %(limit)s
-                    OFFSET %(offset)s;
-                    """,
-                    {
-                        "award": award if award != FilterAwardType.all else None,
-                        "entity_type": (
-                            entity_type if entity_type != FilterEntityType.all else None
+                    q.params.update(page_params)
+
+                    await cur.execute(
+                        sql.SQL(
+                            """
+                            SELECT
+                                t.id,
+                                t.imdb_id,
+                                'title' AS type,
+                                t.title,
+                                array_agg(DISTINCT f.iteration) AS iterations,
+                                SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END) AS noms,
+                                SUM(CASE WHEN f.title_winner = TRUE THEN 1 ELSE 0 END) AS wins,
+                                {word_dist} AS word_dist,
+                                {dist} AS dist
+                            {from_clause}
+                            {where}
+                            GROUP BY t.id, t.imdb_id, t.title
+                            {having}
+                            ORDER BY
+                                word_dist,
+                                dist,
+                                noms DESC,
+                                wins DESC
+                            LIMIT %(limit)s
+                            OFFSET %(offset)s;
+                            """
+                        ).format(
+                            word_dist=sql.SQL(
+                                "%(query)s <<-> t.title" if query is not None else "0"
+                            ),
+                            dist=sql.SQL(
+                                "%(query)s <-> t.title" if query is not None else "0"
+                            ),
+                            from_clause=q.from_clause(
+                                "JOIN titles t ON t.id = f.title_id"
+                            ),
+                            where=q.where.clause("WHERE"),
+                            having=q.having.clause("HAVING"),
                         ),
-                        "query": query,
-                        "min_noms": min_noms,
-                        "max_noms": max_noms,
-                        "min_wins": min_wins,
-                        "max_wins": max_wins,
-                        "noms_eq_wins": noms_eq_wins,
-                        "noms_in_categories": filter_nic,
-                        "no_noms_in_categories": filter_nnic,
-                        "wins_in_categories": filter_wic,
-                        "no_wins_in_categories": filter_nwic,
-                        "single_ceremony": single_ceremony,
-                        "start_edition": start_edition,
-                        "end_edition": end_edition,
-                        "filter_c": filter_c,
-                        "filter_cg": filter_cg,
-                        "limit": PAGE_SIZE + 1,
-                        "offset": (page - 1) * PAGE_SIZE,
-                    },
-                )
-                temp: list[EntityResultRow] = await cur.fetchall()  # type: ignore
-                entities_res: list[EntityResult] = [
-                    EntityResult(
-                        id=t.id,
-                        imdb_id=t.imdb_id,
-                        type=t.type,
-                        name=t.name,
-                        aliases=t.aliases,
-                        occurrences=t.occurrences,
-                        iterations=[i for sub in t.iterations for i in sub],
-                        noms=t.noms,
-                        wins=t.wins,
-                        word_dist=t.word_dist,
-                        dist=t.dist,
+                        q.params,
                     )
-                    for t in temp
-                ]
+                    titles_res = await cur.fetchall()  # type: ignore
 
-        async with con.cursor(row_factory=class_row(CategoryResult)) as cur:  # type: ignore
-            categories_res: list[CategoryResult] = []
-            if (
-                type == FilterType.all or type == FilterType.category
-            ) and query is not None:
-                await cur.execute(
-                    """
-                    WITH a AS (
-                        SELECT
-                            c.id,
-                            c.name,
-                            c.category_group_id,
-                            array_agg(cn.official_name) AS official_names,
-                            array_agg(cn.common_name) AS common_names
-                        FROM categories c
-                        JOIN category_names cn ON c.id = cn.category_id
-                        GROUP BY c.id, c.name, c.category_group_id
+            async with con.cursor(row_factory=class_row(EntityResultRow)) as cur:  # type: ignore
+                if type == FilterType.all or type == FilterType.entity:
+                    q = NomineeQuery(grain="entity")
+                    q.filter(f)
+                    if entity_type != FilterEntityType.all:
+                        q.where.add(
+                            "en.type = %(entity_type)s", entity_type=entity_type
+                        )
+                    if query is not None:
+                        q.where.add("%(query)s <%% ANY(a.aliases)", query=query)
+                    if entity_ids is not None and entity_ids.edition_ids is not None:
+                        if not entity_ids.negated:
+                            q.where.add("en.id = ANY(%(ids)s)")
+                        q.where.add(
+                            "(en.id, f.edition_id) {} (SELECT * FROM unnest(%(ids)s::integer[], %(edition_ids)s::integer[]))".format(
+                                "NOT IN" if entity_ids.negated else "IN"
+                            ),
+                            ids=entity_ids.ids,
+                            edition_ids=entity_ids.edition_ids,
+                        )
+                    elif entity_ids is not None:
+                        q.where.add(
+                            (
+                                "en.id <> ALL(%(ids)s)"
+                                if entity_ids.negated
+                                else "en.id = ANY(%(ids)s)"
+                            ),
+                            ids=entity_ids.ids,
+                        )
+                    q.count_filters(
+                        "SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END)",
+                        "SUM(CASE WHEN f.winner = TRUE THEN 1 ELSE 0 END)",
+                        min_noms,
+                        max_noms,
+                        min_wins,
+                        max_wins,
+                        noms_eq_wins,
                     )
-                    SELECT
-                        a.id AS id,
-                        a.name AS category,
-                        cg.id AS category_group_id,
-                        cg.name AS category_group,
-                        %(query)s <<-> (cg.name || ' ' || a.name || ' ' || array_to_string(a.official_names, ' ') || ' ' || array_to_string(a.common_names, ' ')) AS word_dist,
-                        %(query)s <-> (cg.name || ' ' || a.name || ' ' || array_to_string(a.official_names, ' ') || ' ' || array_to_string(a.common_names, ' ')) AS dist
-                    FROM category_groups cg
-                    JOIN a ON a.category_group_id = cg.id
-                    WHERE %(query)s <%% (cg.name || ' ' || a.name || ' ' || array_to_string(a.official_names, ' ') || ' ' || array_to_string(a.common_names, ' '))
-                    ORDER BY word_dist, a.id
-                    LIMIT %(limit)s
-                    OFFSET %(offset)s;
-                    """,
-                    {
-                        "query": query,
-                        "limit": PAGE_SIZE + 1,
-                        "offset": (page - 1) * PAGE_SIZE,
-                    },
-                )
-                categories_res = await cur.fetchall()  # type: ignore
+                    q.params.update(page_params)
 
-        async with con.cursor(row_factory=class_row(CeremonyResult)) as cur:  # type: ignore
-            ceremonies_res: list[CeremonyResult] = []
-            if (
-                type == FilterType.all or type == FilterType.ceremony
-            ) and query is not None:
-                await cur.execute(
-                    """
-                    SELECT
-                        id,
-                        iteration,
-                        official_year,
-                        ceremony_date,
-                        %(query)s <<-> (integer_to_ordinal(iteration) || to_char(ceremony_date, ' YYYY ') || official_year || ' Academy Awards') AS word_dist,
-                        %(query)s <-> (integer_to_ordinal(iteration) || to_char(ceremony_date, ' YYYY ') || official_year || ' Academy Awards') AS dist
-                    FROM editions
-                    WHERE word_similarity(%(query)s, (integer_to_ordinal(iteration) || to_char(ceremony_date, ' YYYY ') || official_year || ' Academy Awards')) > 0.4
-                    ORDER BY word_dist, dist
-                    LIMIT %(limit)s
-                    OFFSET %(offset)s;
-                    """,
-                    {
-                        "query": query,
-                        "limit": PAGE_SIZE + 1,
-                        "offset": (page - 1) * PAGE_SIZE,
-                    },
-                )
-                ceremonies_res = await cur.fetchall()  # type: ignore
+                    await cur.execute(
+                        sql.SQL(
+                            """
+                            WITH a AS (
+                                SELECT en.id, ARRAY_AGG(DISTINCT ne.name) AS aliases
+                                FROM nominees_entities ne
+                                JOIN entities en ON ne.entity_id = en.id
+                                GROUP BY en.id
+                            )
+                            SELECT
+                                en.id,
+                                en.imdb_id,
+                                en.type,
+                                en.name,
+                                a.aliases,
+                                cardinality(array_agg(array_agg(DISTINCT f.iteration)) OVER w) AS occurrences,
+                                array_agg(array_agg(DISTINCT f.iteration)) OVER w AS iterations,
+                                SUM(SUM(CASE WHEN f.stat = TRUE THEN 1 ELSE 0 END)) OVER w AS noms,
+                                SUM(SUM(CASE WHEN f.winner = TRUE THEN 1 ELSE 0 END)) OVER w AS wins,
+                                {word_dist} AS word_dist,
+                                {dist} AS dist
+                            {from_clause}
+                            {where}
+                            GROUP BY
+                                {single_ceremony}
+                                en.id,
+                                en.imdb_id,
+                                en.type,
+                                en.name,
+                                a.aliases
+                            {having}
+                            WINDOW w AS (PARTITION BY en.id)
+                            ORDER BY
+                                word_dist,
+                                dist,
+                                occurrences DESC,
+                                noms DESC,
+                                wins DESC
+                            LIMIT %(limit)s
+                            OFFSET %(offset)s;
+                            """
+                        ).format(
+                            word_dist=sql.SQL(
+                                "%(query)s <<-> en.name" if query is not None else "0"
+                            ),
+                            dist=sql.SQL(
+                                "%(query)s <-> en.name" if query is not None else "0"
+                            ),
+                            from_clause=q.from_clause(
+                                "JOIN entities en ON en.id = f.entity_id",
+                                "JOIN a ON a.id = en.id",
+                            ),
+                            where=q.where.clause("WHERE"),
+                            # with `single_ceremony`, counts are per ceremony
+                            single_ceremony=sql.SQL(
+                                "f.edition_id," if single_ceremony else ""
+                            ),
+                            having=q.having.clause("HAVING"),
+                        ),
+                        q.params,
+                    )
+                    temp: list[EntityResultRow] = await cur.fetchall()  # type: ignore
+                    entities_res = [
+                        EntityResult(
+                            id=t.id,
+                            imdb_id=t.imdb_id,
+                            type=t.type,
+                            name=t.name,
+                            aliases=t.aliases,
+                            occurrences=t.occurrences,
+                            iterations=[i for sub in t.iterations for i in sub],
+                            noms=t.noms,
+                            wins=t.wins,
+                            word_dist=t.word_dist,
+                            dist=t.dist,
+                        )
+                        for t in temp
+                    ]
 
-        def res_to_search_group(search_group: Type[SearchGroup], res: list):
-            return search_group(
-                page=page,
-                next_page=page + 1 if len(res) == PAGE_SIZE + 1 else None,
-                page_size=PAGE_SIZE,
-                length=(PAGE_SIZE if len(res) == PAGE_SIZE + 1 else len(res)),
-                results=(res[:-1] if len(res) == PAGE_SIZE + 1 else res),
-            )
+            async with con.cursor(row_factory=class_row(CategoryResult)) as cur:  # type: ignore
+                if (
+                    type == FilterType.all or type == FilterType.category
+                ) and query is not None:
+                    await cur.execute(
+                        """
+                        WITH a AS (
+                            SELECT
+                                c.id,
+                                c.name,
+                                c.category_group_id,
+                                array_agg(cn.official_name) AS official_names,
+                                array_agg(cn.common_name) AS common_names
+                            FROM categories c
+                            JOIN category_names cn ON c.id = cn.category_id
+                            GROUP BY c.id, c.name, c.category_group_id
+                        )
+                        SELECT
+                            a.id AS id,
+                            a.name AS category,
+                            cg.id AS category_group_id,
+                            cg.name AS category_group,
+                            %(query)s <<-> (cg.name || ' ' || a.name || ' ' || array_to_string(a.official_names, ' ') || ' ' || array_to_string(a.common_names, ' ')) AS word_dist,
+                            %(query)s <-> (cg.name || ' ' || a.name || ' ' || array_to_string(a.official_names, ' ') || ' ' || array_to_string(a.common_names, ' ')) AS dist
+                        FROM category_groups cg
+                        JOIN a ON a.category_group_id = cg.id
+                        WHERE %(query)s <%% (cg.name || ' ' || a.name || ' ' || array_to_string(a.official_names, ' ') || ' ' || array_to_string(a.common_names, ' '))
+                        ORDER BY word_dist, a.id
+                        LIMIT %(limit)s
+                        OFFSET %(offset)s;
+                        """,
+                        {
+                            "query": query,
+                            "limit": PAGE_SIZE + 1,
+                            "offset": (page - 1) * PAGE_SIZE,
+                        },
+                    )
+                    categories_res = await cur.fetchall()  # type: ignore
 
-        titles_obj: TitleSearchGroup = res_to_search_group(  # type: ignore
-            TitleSearchGroup,
-            titles_res if type == FilterType.all or type == FilterType.title_ else [],
-        )
-        entities_obj: EntitySearchGroup = res_to_search_group(  # type: ignore
-            EntitySearchGroup,
-            entities_res if type == FilterType.all or type == FilterType.entity else [],
-        )
-        categories_obj: CategorySearchGroup = res_to_search_group(  # type: ignore
-            CategorySearchGroup,
-            (
-                categories_res
-                if (type == FilterType.all or type == FilterType.category)
-                and query is not None
-                else []
-            ),
-        )
-        ceremonies_obj: CeremonySearchGroup = res_to_search_group(  # type: ignore
-            CeremonySearchGroup,
-            (
-                ceremonies_res
-                if (type == FilterType.all or type == FilterType.ceremony)
-                and query is not None
-                else []
-            ),
-        )
+            async with con.cursor(row_factory=class_row(CeremonyResult)) as cur:  # type: ignore
+                if (
+                    type == FilterType.all or type == FilterType.ceremony
+                ) and query is not None:
+                    await cur.execute(
+                        """
+                        SELECT
+                            id,
+                            iteration,
+                            official_year,
+                            ceremony_date,
+                            %(query)s <<-> (integer_to_ordinal(iteration) || to_char(ceremony_date, ' YYYY ') || official_year || ' Academy Awards') AS word_dist,
+                            %(query)s <-> (integer_to_ordinal(iteration) || to_char(ceremony_date, ' YYYY ') || official_year || ' Academy Awards') AS dist
+                        FROM editions
+                        WHERE word_similarity(%(query)s, (integer_to_ordinal(iteration) || to_char(ceremony_date, ' YYYY ') || official_year || ' Academy Awards')) > 0.4
+                        ORDER BY word_dist, dist
+                        LIMIT %(limit)s
+                        OFFSET %(offset)s;
+                        """,
+                        {
+                            "query": query,
+                            "limit": PAGE_SIZE + 1,
+                            "offset": (page - 1) * PAGE_SIZE,
+                        },
+                    )
+                    ceremonies_res = await cur.fetchall()  # type: ignore
 
-        res = SearchResults(
-            titles=titles_obj,
-            entities=entities_obj,
-            categories=categories_obj,
-            ceremonies=ceremonies_obj,
+    def res_to_search_group(search_group: Type[SearchGroup], res: list):
+        return search_group(
+            page=page,
+            next_page=page + 1 if len(res) == PAGE_SIZE + 1 else None,
+            page_size=PAGE_SIZE,
+            length=(PAGE_SIZE if len(res) == PAGE_SIZE + 1 else len(res)),
+            results=(res[:-1] if len(res) == PAGE_SIZE + 1 else res),
         )
 
+    titles_obj: TitleSearchGroup = res_to_search_group(  # type: ignore
+        TitleSearchGroup,
+        titles_res if type == FilterType.all or type == FilterType.title_ else [],
+    )
+    entities_obj: EntitySearchGroup = res_to_search_group(  # type: ignore
+        EntitySearchGroup,
+        entities_res if type == FilterType.all or type == FilterType.entity else [],
+    )
+    categories_obj: CategorySearchGroup = res_to_search_group(  # type: ignore
+        CategorySearchGroup,
+        (
+            categories_res
+            if (type == FilterType.all or type == FilterType.category)
+            and query is not None
+            else []
+        ),
+    )
+    ceremonies_obj: CeremonySearchGroup = res_to_search_group(  # type: ignore
+        CeremonySearchGroup,
+        (
+            ceremonies_res
+            if (type == FilterType.all or type == FilterType.ceremony)
+            and query is not None
+            else []
+        ),
+    )
+
+    res = SearchResults(
+        titles=titles_obj,
+        entities=entities_obj,
+        categories=categories_obj,
+        ceremonies=ceremonies_obj,
+    )
+
     return res
+
+
+@router.get("/suggest", summary="Suggest titles, entities, and categories by prefix")
+async def suggest(
+    query: Annotated[str, Query(min_length=1)],
+    type: Annotated[
+        FilterType, Query(description="Only include results from specified type.")
+    ] = FilterType.all,
+    limit: Annotated[
+        int,
+        Query(
+            ge=1,
+            le=MAX_SUGGESTIONS,
+            description="Maximum number of results per type.",
+        ),
+    ] = 5,
+) -> SuggestResults:
+    """
+    Lightweight alternative to `/search` for typeahead. Matches the start of any
+    word in a title, entity alias, or category name, ignoring case and accents.
+    Ceremonies are not included.
+
+    Results within each type are sorted by number of nominations, then wins.
+
+    Example use cases:
+    - Suggest people and films as the user types 'amel'.
+    > /search/suggest?query=amel
+    """
+    index = await get_index("suggest", SuggestIndex)
+    return index.suggest(query, type, limit)
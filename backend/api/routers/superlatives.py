@@ -0,0 +1,57 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+
+from ..enums import LeaderboardType
+from ..models.superlative import FirstWinEntry, StreakEntry
+from ..services.dataset import get_index
+from ..services.superlatives import Superlatives
+
+router = APIRouter(prefix="/superlatives", tags=["superlatives"])
+
+TypeQuery = Annotated[
+    LeaderboardType,
+    Query(
+        description=(
+            """Type of title or entity to rank. `entity` ranks people,
+            companies, and countries together."""
+        )
+    ),
+]
+
+
+@router.get("/streaks", summary="Get longest nomination streaks")
+async def get_streaks(
+    type: TypeQuery = LeaderboardType.person,
+    limit: Annotated[int, Query(ge=1, le=100)] = 10,
+    offset: Annotated[int, Query(ge=0)] = 0,
+) -> list[StreakEntry]:
+    """
+    A streak is a run of consecutive ceremonies with at least one nomination.
+    Each title or entity is listed once, with its longest streak (the earliest
+    one, if tied).
+
+    Example use cases:
+    - Who has been nominated in the most consecutive ceremonies?
+    > /superlatives/streaks
+    """
+    superlatives = await get_index("superlatives", Superlatives)
+    return superlatives.streaks(type, limit, offset)
+
+
+@router.get("/noms_before_first_win", summary="Get most nominations before first win")
+async def get_noms_before_first_win(
+    type: TypeQuery = LeaderboardType.person,
+    limit: Annotated[int, Query(ge=1, le=100)] = 10,
+    offset: Annotated[int, Query(ge=0)] = 0,
+) -> list[FirstWinEntry]:
+    """
+    Only counts nominations from ceremonies before the one with the first win;
+    titles and entities that have never won are not included.
+
+    Example use cases:
+    - Who was nominated the most times before finally winning?
+    > /superlatives/noms_before_first_win
+    """
+    superlatives = await get_index("superlatives", Superlatives)
+    return superlatives.first_wins(type, limit, offset)
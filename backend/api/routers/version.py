@@ -11,7 +11,8 @@ router = APIRouter(tags=["version"])
 async def get_version(award: AwardType = AwardType.oscar) -> Version | None:
     """
     The returned tag identifies the current version of the award's data, which
-    is useful for caching. This tag is updated alongside any data update, and is
-    included by the API as an `ETag` response header in all other routes.
+    is useful for caching. This tag is updated alongside any data update, and
+    all other routes return an `ETag` response header that hashes the response,
+    which only changes when the response does.
     """
     return await get_current_version(award)
@@ -0,0 +1,184 @@
+"""
+Entry point for serverless (Vercel) deployments.
+
+A cold start of `api.main` imports FastAPI, pydantic, every router and model,
+and the in-memory services before it can answer anything. This ASGI app only
+imports `api.dependencies` (psycopg and dotenv) and answers the two requests
+that dominate traffic after a data update without loading the full app:
+
+* `GET /version`, read directly from `current_versions`.
+* Conditional `GET`s whose `If-None-Match` matches the ETag of a response this
+  instance already cached for the current version of the resource, or the
+  version ETag of a response too large to cache (see
+  `api.services.response_cache`), answered with 304 Not Modified.
+
+The current version and the data version of the requested resource are read in
+a single query. If the conditional request can't be answered here, both are
+passed on to the full app in `scope["state"]`.
+
+Every other request (and every request with `DATA_BACKEND=csv`) is delegated to
+`api.main.app`, which is imported on first use. The lifespan of the full app is
+not run: serverless functions connect to the db per request (see `connect`) and
+build in-memory indexes on demand. Long-running deployments should keep using
+`api/main.py`.
+"""
+
+import json
+import re
+from urllib.parse import parse_qs
+
+from .dependencies import ALLOWED_ORIGIN_REGEX, EMBEDDED, connect
+from .enums import AwardType
+from .services.cache_headers import cache_control, resource_scope, resource_tag
+from .services.response_cache import cache_key, get_response, version_etag
+
+_app = None
+
+
+def full_app():
+    global _app
+    if _app is None:
+        from .main import app
+
+        _app = app
+    return _app
+
+
+async def fetch_versions(
+    award: str, resource: tuple[str, int] | None
+) -> tuple[dict | None, int | None]:
+    """Returns the current version of `award` (as a `current_versions` row) and
+    the data version of `resource` (see `resource_scope`), if any, in one
+    query."""
+    async with connect() as con:
+        async with con.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT cv.award, cv.iteration, cv.update_stage, cv.updated_at,
+                    cv.tag, dv.version
+                FROM current_versions cv
+                LEFT JOIN data_versions dv
+                    ON dv.scope = %s AND dv.scope_id = %s
+                WHERE cv.award = %s
+                """,
+                (*(resource or (None, None)), award),
+            )
+            row = await cur.fetchone()
+    if row is None:
+        return None, None
+    award, iteration, update_stage, updated_at, tag, data_version = row
+    return {
+        "award": award,
+        "iteration": iteration,
+        "update_stage": update_stage,
+        "updated_at": updated_at,
+        "tag": tag,
+    }, data_version
+
+
+def serialize_version(version: dict | None) -> bytes:
+    """Serializes `version` like `/version`."""
+    if version is not None:
+        version = version | {
+            "updated_at": version["updated_at"].isoformat().replace("+00:00", "Z")
+        }
+    return json.dumps(version, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def send_response(
+    send, scope, status: int, headers: dict[str, str], body: bytes = b""
+):
+    request_headers = dict(scope["headers"])
+    origin = request_headers.get(b"origin", b"").decode("latin-1")
+    if origin and re.fullmatch(ALLOWED_ORIGIN_REGEX, origin):
+        headers = headers | {"access-control-allow-origin": origin, "vary": "Origin"}
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.encode(), v.encode()) for k, v in headers.items()],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def fast_path(scope, send) -> bool:
+    """Answers the request if it is `/version` or a 304; returns whether it
+    was answered."""
+    if scope["method"] != "GET":
+        return False
+    params = parse_qs(scope["query_string"].decode("latin-1"))
+
+    if scope["path"] == "/version":
+        award = params.get("award", [AwardType.oscar.value])[-1]
+        if award not in AwardType._value2member_map_:
+            return False  # let the full app return its validation error
+        version, _ = await fetch_versions(award, None)
+        body = serialize_version(version)
+        await send_response(
+            send,
+            scope,
+            200,
+            {
+                "content-type": "application/json",
+                "content-length": str(len(body)),
+                # do not allow caching of `/version` response
+                "cache-control": "no-store",
+            },
+            body,
+        )
+        return True
+
+    request_headers = dict(scope["headers"])
+    if_none_match = request_headers.get(b"if-none-match")
+    if not if_none_match:
+        return False
+    resource = resource_scope(scope["path"], params.get("include", [None])[-1])
+    version, data_version = await fetch_versions(AwardType.oscar.value, resource)
+    if not version:
+        return False
+    cache_version = (
+        resource_tag(*resource, data_version)
+        if resource is not None and data_version is not None
+        else version["tag"]
+    )
+    # passed to the full app if the request isn't answered here, so that it
+    # doesn't look the versions up again (see `api.main`)
+    scope.setdefault("state", {})["versions"] = (version, cache_version)
+    cached = get_response(
+        cache_version,
+        cache_key(
+            scope["path"],
+            scope["query_string"].decode("latin-1"),
+            request_headers.get(b"accept-encoding", b"").decode("latin-1"),
+        ),
+    )
+    etag = cached.etag if cached else version_etag(cache_version)
+    if if_none_match.decode("latin-1") != etag:
+        return False
+    request_tag = params.get("v", [None])[-1]
+    await send_response(
+        send,
+        scope,
+        304,
+        {
+            "cache-control": cache_control(request_tag, version["tag"]),
+            "etag": etag,
+        },
+    )
+    return True
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] == "http" and not EMBEDDED and await fast_path(scope, send):
+        return
+    await full_app()(scope, receive, send)
@@ -0,0 +1,60 @@
+"""
+Cache-Control values and response versions for versioned API responses, shared
+by the full app's middleware and the serverless fast path (api/serverless.py).
+
+Most responses are cached under the current version tag (see
+api/services/response_cache.py), so any data update recomputes them. Resources
+whose response only shows the data of one edition, entity, or title (see
+`resource_scope`) are cached under that resource's version from the db's
+`data_versions` table instead, which the update pipeline only bumps when that
+data changes, so they stay cached across updates of other editions.
+"""
+
+import re
+
+# for versioned requests (with `v` query param) whose version matches the
+# current version, client/CDN cache can keep data indefinitely
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# default behavior of non-versioned (or incorrectly versioned) requests:
+# client/CDN cache keeps for 1 day and serves stale response for up to 1 minute
+# while revalidating ETag in background
+REVALIDATE = "public, max-age=86400, stale-while-revalidate=60"
+
+# redirects to canonical versioned URLs (see api/services/canonical.py) point at
+# the current version, so they are only kept briefly after an update
+REDIRECT = "public, max-age=60"
+
+
+def cache_control(request_tag: str | None, current_tag: str) -> str:
+    """Returns the Cache-Control value for a request whose `v` query param is
+    `request_tag`."""
+    if request_tag and request_tag == current_tag:
+        return IMMUTABLE
+    return REVALIDATE
+
+
+# `/ceremonies/<id>`, and `/entities/<id>` or `/titles/<id>` without rankings,
+# which are computed across all entities or titles
+_SCOPED_PATH = re.compile(r"^/(ceremonies|entities|titles)/(\d+)$")
+_SCOPES = {"ceremonies": "edition", "entities": "entity", "titles": "title"}
+
+
+def resource_scope(path: str, include: str | None) -> tuple[str, int] | None:
+    """Returns the `data_versions` scope and id of the resource at `path`
+    (with `include` query param), or None if it depends on all of the data."""
+    m = _SCOPED_PATH.match(path)
+    if m is None:
+        return None
+    resource, id = m.group(1), int(m.group(2))
+    if resource != "ceremonies" and (
+        not include or "rankings" in {s.strip() for s in include.split(",")}
+    ):
+        return None
+    return _SCOPES[resource], id
+
+
+def resource_tag(scope: str, id: int, version: int) -> str:
+    """Returns the response version of a resource with `data_versions` entry
+    `version`."""
+    return f"{scope}{id}v{version}"
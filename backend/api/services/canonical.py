@@ -0,0 +1,88 @@
+"""
+Canonical versioned URLs, used when `CANONICAL_REDIRECTS=1`.
+
+Requests that differ only in param order, in the order of comma-separated lists
+(`Actor,Actress` vs `Actress,Actor`), or in params set to their defaults would
+otherwise be separate CDN entries, and only requests versioned with the current
+tag are cached as immutable. In this mode, the middleware redirects every other
+GET request to its canonical URL: params sorted by name, lists sorted and
+deduplicated, defaults and unknown params dropped, and `v=<tag>` appended.
+"""
+
+import os
+from enum import Enum
+from urllib.parse import urlencode
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from starlette.routing import Match
+
+CANONICAL_REDIRECTS = os.getenv("CANONICAL_REDIRECTS") == "1"
+
+# comma-separated params whose order and duplicates don't affect the response
+_SET_PARAMS = {
+    "include",
+    "categories",
+    "category_groups",
+    "noms_in_categories",
+    "no_noms_in_categories",
+    "wins_in_categories",
+    "no_wins_in_categories",
+}
+
+
+def param_str(value) -> str:
+    """Returns `value` as it appears in a query string."""
+    if isinstance(value, Enum):
+        return str(value.value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def route_defaults(request: Request) -> dict[str, str | None] | None:
+    """Returns the query params of the GET route matching `request`, with their
+    non-null defaults (else None), or None if no route matches."""
+    for route in request.app.router.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods:
+            continue
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return {
+                field.alias: (
+                    None
+                    if field.field_info.is_required() or field.default is None
+                    else param_str(field.default)
+                )
+                for field in route.dependant.query_params
+            }
+    return None
+
+
+def canonical_query(request: Request, tag: str) -> str | None:
+    """Returns the canonical query string of `request` with version `tag`, or
+    None if it is not a versioned route."""
+    defaults = route_defaults(request)
+    if defaults is None:
+        return None
+
+    params = {}
+    for name, value in request.query_params.items():
+        if name not in defaults:
+            continue
+        if name in _SET_PARAMS:
+            value = ",".join(sorted({s.strip() for s in value.split(",")}))
+        if value != defaults[name]:
+            params[name] = value
+    return urlencode(sorted(params.items()) + [("v", tag)])
+
+
+def canonical_redirect(request: Request, tag: str) -> str | None:
+    """Returns the canonical URL of `request` with version `tag` if `request`
+    is not already for it."""
+    if not CANONICAL_REDIRECTS or request.method != "GET":
+        return None
+    query = canonical_query(request, tag)
+    if query is None or query == request.url.query:
+        return None
+    return f"{request.url.path}?{query}"
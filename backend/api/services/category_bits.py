@@ -0,0 +1,448 @@
+"""
+Per-edition, per-category bitsets of titles and entities used by `/search`
+category filters.
+
+Every title (and entity) is assigned one bit, in order of first nomination. For
+each edition and category, the index stores the set of titles nominated and the
+set that won as integers, so that `noms_in_categories` and related filters
+reduce to a few integer AND/OR operations over all titles at once instead of a
+loop per title, and category name arrays don't need to be aggregated in SQL.
+
+Filters that exclude categories match most titles, so the matching ids are
+returned as a complement when it is shorter (see `IdFilter`).
+
+Bitsets are stored as byte arrays (see `Bitsets`) and only the ones a filter
+uses are decoded.
+"""
+
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+
+from .dataset import Dataset
+from .shared import Arrays
+
+
+def to_bitset(positions) -> int:
+    """Returns the integer with the bits at `positions` set."""
+    positions = list(positions)
+    if not positions:
+        return 0
+    buf = bytearray(max(positions) // 8 + 1)
+    for i in positions:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def set_bits(bitset: int) -> list[int]:
+    """Returns the positions of the set bits of `bitset`, in ascending order."""
+    digits = bin(bitset)[:1:-1]
+    res = []
+    i = digits.find("1")
+    while i != -1:
+        res.append(i)
+        i = digits.find("1", i + 1)
+    return res
+
+
+class Bitsets(Sequence[int]):
+    """Bitsets stored as little-endian bytes without their leading zero bytes,
+    so that they can be shared as arrays. Bitsets are decoded on access."""
+
+    def __init__(self, data: Any, offsets: Sequence[int], shifts: Sequence[int]):
+        self._data = data
+        self._offsets = offsets  # offsets[i + 1] is the end of bitset i
+        self._shifts = shifts  # number of leading zero bytes
+
+    @classmethod
+    def build(cls, bitsets: list[int]) -> "Bitsets":
+        data = bytearray()
+        offsets = array("q", [0])
+        shifts = array("q")
+        for bitset in bitsets:
+            b = bitset.to_bytes(-(-bitset.bit_length() // 8), "little")
+            shift = len(b) - len(b.lstrip(b"\0"))
+            data += b[shift:]
+            offsets.append(len(data))
+            shifts.append(shift)
+        return cls(bytes(data), offsets, shifts)
+
+    def __len__(self) -> int:
+        return len(self._shifts)
+
+    def __getitem__(self, i):  # type: ignore
+        b = self._data[self._offsets[i] : self._offsets[i + 1]]
+        return int.from_bytes(b, "little") << 8 * self._shifts[i]
+
+    def to_arrays(self, prefix: str) -> Arrays:
+        return {
+            f"{prefix}.data": self._data,
+            f"{prefix}.offsets": self._offsets,
+            f"{prefix}.shifts": self._shifts,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, prefix: str) -> "Bitsets":
+        return cls(
+            arrays[f"{prefix}.data"],
+            arrays[f"{prefix}.offsets"],
+            arrays[f"{prefix}.shifts"],
+        )
+
+
+@dataclass(slots=True)
+class EditionBits:
+    edition_id: int
+    award: str
+    iteration: int
+    # indexes into `SubjectBits.bitsets`
+    present: int  # subjects with a nominee in the edition
+    # category index -> subjects with a nomination counting toward stats
+    noms: dict[int, int]
+    wins: dict[int, int]
+
+
+class SubjectBits:
+    """Bitsets of the titles (or entities) nominated in each edition and
+    category."""
+
+    def __init__(
+        self,
+        ids: list[int],
+        facts: list[tuple[int, str, int, int, int, bool, bool]],
+    ):
+        """
+        Args:
+            ids: subject ids by bit position
+            facts: (edition id, award, iteration, category index, bit position,
+                stat, winner) tuples, ordered by iteration
+        """
+        self.ids: Sequence[int] = array("q", ids)
+        present: dict[int, set[int]] = defaultdict(set)
+        noms: dict[int, dict[int, set[int]]] = defaultdict(lambda: defaultdict(set))
+        wins: dict[int, dict[int, set[int]]] = defaultdict(lambda: defaultdict(set))
+        info: dict[int, tuple[str, int]] = {}
+        for edition_id, award, iteration, category, i, stat, winner in facts:
+            info[edition_id] = (award, iteration)
+            present[edition_id].add(i)
+            if stat:
+                noms[edition_id][category].add(i)
+            if winner:
+                wins[edition_id][category].add(i)
+
+        bitsets: list[int] = []
+
+        def add(positions: set[int]) -> int:
+            bitsets.append(to_bitset(positions))
+            return len(bitsets) - 1
+
+        self.editions = [
+            EditionBits(
+                edition_id,
+                award,
+                iteration,
+                add(present[edition_id]),
+                {c: add(s) for c, s in noms[edition_id].items()},
+                {c: add(s) for c, s in wins[edition_id].items()},
+            )
+            for edition_id, (award, iteration) in info.items()
+        ]
+        self.bitsets = Bitsets.build(bitsets)
+
+    def to_arrays(self, prefix: str) -> tuple[Arrays, list]:
+        return {
+            f"{prefix}.ids": self.ids,
+            **self.bitsets.to_arrays(f"{prefix}.bitsets"),
+        }, [
+            [
+                e.edition_id,
+                e.award,
+                e.iteration,
+                e.present,
+                list(e.noms.items()),
+                list(e.wins.items()),
+            ]
+            for e in self.editions
+        ]
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, meta: list, prefix: str) -> "SubjectBits":
+        res = cls.__new__(cls)
+        res.ids = arrays[f"{prefix}.ids"]
+        res.bitsets = Bitsets.from_arrays(arrays, f"{prefix}.bitsets")
+        res.editions = [
+            EditionBits(edition_id, award, iteration, present, dict(noms), dict(wins))
+            for edition_id, award, iteration, present, noms, wins in meta
+        ]
+        return res
+
+    def decode(self, refs: dict[int, int], categories: set[int]) -> dict[int, int]:
+        """Returns the bitsets of `categories` among `refs`, by category
+        index."""
+        return {c: self.bitsets[refs[c]] for c in categories if c in refs}
+
+
+@dataclass
+class CategoryFilter:
+    # category indexes of each required category name, within the allowed
+    # categories
+    noms_required: list[list[int]]
+    noms_excluded: list[int]
+    wins_required: list[list[int]]
+    wins_excluded: list[int]
+
+    @property
+    def nom_categories(self) -> set[int]:
+        return {i for c in self.noms_required for i in c} | set(self.noms_excluded)
+
+    @property
+    def win_categories(self) -> set[int]:
+        return {i for c in self.wins_required for i in c} | set(self.wins_excluded)
+
+    def matches(self, subjects: int, noms: dict[int, int], wins: dict[int, int]) -> int:
+        """Returns the subset of `subjects` whose nominations `noms` and wins
+        `wins`, by category index, satisfy the filter."""
+        for categories in self.noms_required:
+            subjects &= _union(noms, categories)
+        subjects &= ~_union(noms, self.noms_excluded)
+        for categories in self.wins_required:
+            subjects &= _union(wins, categories)
+        subjects &= ~_union(wins, self.wins_excluded)
+        return subjects
+
+
+def _union(bitsets: dict[int, int], keys: list[int]) -> int:
+    res = 0
+    for key in keys:
+        res |= bitsets.get(key, 0)
+    return res
+
+
+@dataclass
+class IdFilter:
+    """Ids, or (id, edition id) pairs if `edition_ids` is set, matching a
+    category filter or, if `negated`, not matching it. Ids without nominees in
+    the filtered editions may be in either."""
+
+    ids: list[int]
+    edition_ids: list[int] | None
+    negated: bool
+    _keys: set | None = field(default=None, repr=False)
+
+    def matches(self, id: int, edition_id: int) -> bool:
+        if self._keys is None:
+            self._keys = (
+                set(self.ids)
+                if self.edition_ids is None
+                else set(zip(self.ids, self.edition_ids))
+            )
+        key = id if self.edition_ids is None else (id, edition_id)
+        return (key in self._keys) != self.negated
+
+
+class CategoryBitsets:
+    def __init__(self, dataset: Dataset):
+        # category name (or group name) -> category indexes
+        self.indexes: dict[str, list[int]] = defaultdict(list)
+        self.group_indexes: dict[str, list[int]] = defaultdict(list)
+        self.num_categories = len(dataset.categories)
+        index_by_category_id = {}
+        for i, c in enumerate(dataset.categories.values()):
+            index_by_category_id[c.id] = i
+            self.indexes[c.name].append(i)
+            if c.category_group is not None:
+                self.group_indexes[c.category_group].append(i)
+
+        title_ids: list[int] = []
+        entity_ids: list[int] = []
+        title_bits: dict[int, int] = {}
+        entity_bits: dict[int, int] = {}
+        title_facts = []
+        entity_facts = []
+        for n in dataset.nominees:
+            c = index_by_category_id[n.category_id]
+            for title_id, title_winner in n.titles:
+                if title_id not in title_bits:
+                    title_bits[title_id] = len(title_ids)
+                    title_ids.append(title_id)
+                title_facts.append(
+                    (
+                        n.edition_id,
+                        n.award,
+                        n.iteration,
+                        c,
+                        title_bits[title_id],
+                        n.stat,
+                        title_winner,
+                    )
+                )
+            for entity_id, _ in n.entities:
+                if entity_id not in entity_bits:
+                    entity_bits[entity_id] = len(entity_ids)
+                    entity_ids.append(entity_id)
+                entity_facts.append(
+                    (
+                        n.edition_id,
+                        n.award,
+                        n.iteration,
+                        c,
+                        entity_bits[entity_id],
+                        n.stat,
+                        n.winner,
+                    )
+                )
+
+        self.titles = SubjectBits(title_ids, title_facts)
+        self.entities = SubjectBits(entity_ids, entity_facts)
+
+    def to_arrays(self) -> tuple[Arrays, dict[str, Any]]:
+        title_arrays, title_meta = self.titles.to_arrays("titles")
+        entity_arrays, entity_meta = self.entities.to_arrays("entities")
+        return title_arrays | entity_arrays, {
+            "indexes": self.indexes,
+            "group_indexes": self.group_indexes,
+            "num_categories": self.num_categories,
+            "titles": title_meta,
+            "entities": entity_meta,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, meta: dict[str, Any]) -> "CategoryBitsets":
+        res = cls.__new__(cls)
+        res.indexes = meta["indexes"]
+        res.group_indexes = meta["group_indexes"]
+        res.num_categories = meta["num_categories"]
+        res.titles = SubjectBits.from_arrays(arrays, meta["titles"], "titles")
+        res.entities = SubjectBits.from_arrays(arrays, meta["entities"], "entities")
+        return res
+
+    def build_filter(
+        self,
+        categories: list[str] | None,
+        category_groups: list[str] | None,
+        noms_in_categories: list[str] | None,
+        no_noms_in_categories: list[str] | None,
+        wins_in_categories: list[str] | None,
+        no_wins_in_categories: list[str] | None,
+    ) -> CategoryFilter | None:
+        """Converts category name filters to category indexes.
+
+        Returns None if a required category does not exist or is not allowed by
+        `categories` and `category_groups`, in which case nothing can match.
+        """
+        allowed = set(range(self.num_categories))
+        if categories:
+            allowed &= {i for name in categories for i in self.indexes.get(name, [])}
+        if category_groups:
+            allowed &= {
+                i for name in category_groups for i in self.group_indexes.get(name, [])
+            }
+
+        def required(names: list[str] | None) -> list[list[int]]:
+            return [
+                [i for i in self.indexes.get(name, []) if i in allowed]
+                for name in names or []
+            ]
+
+        def excluded(names: list[str] | None) -> list[int]:
+            return [
+                i
+                for name in names or []
+                for i in self.indexes.get(name, [])
+                if i in allowed
+            ]
+
+        f = CategoryFilter(
+            noms_required=required(noms_in_categories),
+            noms_excluded=excluded(no_noms_in_categories),
+            wins_required=required(wins_in_categories),
+            wins_excluded=excluded(no_wins_in_categories),
+        )
+        if not all(f.noms_required) or not all(f.wins_required):
+            return None
+        return f
+
+    @staticmethod
+    def _editions(
+        subjects: SubjectBits,
+        award: str | None,
+        start_edition: int,
+        end_edition: int | None,
+    ) -> list[EditionBits]:
+        return [
+            e
+            for e in subjects.editions
+            if (award is None or e.award == award)
+            and e.iteration >= start_edition
+            and (end_edition is None or e.iteration <= end_edition)
+        ]
+
+    def matching_ids(
+        self,
+        subjects: SubjectBits,
+        f: CategoryFilter | None,
+        award: str | None,
+        start_edition: int,
+        end_edition: int | None,
+    ) -> IdFilter:
+        """Returns the ids whose nominations within range satisfy `f`."""
+        if f is None:
+            return IdFilter([], None, False)
+        editions = self._editions(subjects, award, start_edition, end_edition)
+        nom_categories, win_categories = f.nom_categories, f.win_categories
+        present = 0
+        noms: dict[int, int] = defaultdict(int)
+        wins: dict[int, int] = defaultdict(int)
+        for e in editions:
+            present |= subjects.bitsets[e.present]
+            for c, bits in subjects.decode(e.noms, nom_categories).items():
+                noms[c] |= bits
+            for c, bits in subjects.decode(e.wins, win_categories).items():
+                wins[c] |= bits
+
+        matching = f.matches(present, noms, wins)
+        negated = matching.bit_count() * 2 > present.bit_count()
+        return IdFilter(
+            [
+                subjects.ids[i]
+                for i in set_bits(present & ~matching if negated else matching)
+            ],
+            None,
+            negated,
+        )
+
+    def matching_id_editions(
+        self,
+        subjects: SubjectBits,
+        f: CategoryFilter | None,
+        award: str | None,
+        start_edition: int,
+        end_edition: int | None,
+    ) -> IdFilter:
+        """Returns the (id, edition id) pairs whose single-edition nominations
+        satisfy `f`."""
+        if f is None:
+            return IdFilter([], [], False)
+        editions = self._editions(subjects, award, start_edition, end_edition)
+        nom_categories, win_categories = f.nom_categories, f.win_categories
+        present = [subjects.bitsets[e.present] for e in editions]
+        matching = [
+            f.matches(
+                p,
+                subjects.decode(e.noms, nom_categories),
+                subjects.decode(e.wins, win_categories),
+            )
+            for e, p in zip(editions, present)
+        ]
+        negated = sum(m.bit_count() for m in matching) * 2 > sum(
+            p.bit_count() for p in present
+        )
+
+        ids: list[int] = []
+        edition_ids: list[int] = []
+        for e, p, m in zip(editions, present, matching):
+            inds = set_bits(p & ~m if negated else m)
+            ids += [subjects.ids[i] for i in inds]
+            edition_ids += [e.edition_id] * len(inds)
+        return IdFilter(ids, edition_ids, negated)
@@ -0,0 +1,402 @@
+"""
+Columnar copy of the nomination facts, used to compute `/` stats and entity and
+title rankings with NumPy instead of SQL aggregation when the API runs with
+`COLUMNAR=1`.
+
+Each fact is one credited entity (or title) of one nominee, stored as parallel
+integer-coded arrays. Aggregates are computed by masking the facts that match a
+request's filters and counting them per entity/category or title with
+`np.bincount`. Like the db queries, facts in categories without a group are
+excluded.
+
+NumPy is only required when the columnar store is enabled.
+"""
+
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Any
+
+from ..enums import AwardType
+from ..models.entity_title import RankingsRow
+from ..models.nominations import EntityStats, TitleStats
+from .dataset import Dataset
+from .directory import Directory
+from .embedded import grouped
+from .nominee_filter import NomineeFilter
+from .shared import Arrays
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = None  # imported on first use to keep it out of cold starts
+
+AWARDS = list(AwardType)
+
+
+def import_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("COLUMNAR=1 requires numpy")
+        np = numpy
+
+
+@dataclass
+class Facts:
+    subject: "np.ndarray"  # entity or title id
+    category: "np.ndarray"
+    iteration: "np.ndarray"
+    award: "np.ndarray"  # index into AWARDS
+    stat: "np.ndarray"
+    winner: "np.ndarray"  # nominee winner for entities, title winner for titles
+    nominee_winner: "np.ndarray"
+    pending: "np.ndarray"
+    alias: "np.ndarray"  # index into `ColumnarStore.aliases`, entities only
+
+
+@dataclass
+class RankingsColumns:
+    """One element per (id, category id), sorted by id, then category id."""
+
+    id: "np.ndarray"
+    category: "np.ndarray"
+    noms: "np.ndarray"
+    wins: "np.ndarray"
+    noms_rank: "np.ndarray"
+    wins_rank: "np.ndarray"
+    group_noms: "np.ndarray"
+    group_wins: "np.ndarray"
+    group_noms_rank: "np.ndarray"
+    group_wins_rank: "np.ndarray"
+    overall_noms: "np.ndarray"
+    overall_wins: "np.ndarray"
+    overall_noms_rank: "np.ndarray"
+    overall_wins_rank: "np.ndarray"
+
+
+def sql_rank(partition: "np.ndarray", values: "np.ndarray") -> "np.ndarray":
+    """Ranks `values` in descending order within each partition, like SQL
+    `rank()`."""
+    n = len(values)
+    if not n:
+        return np.zeros(0, np.int64)
+    order = np.lexsort((-values, partition))
+    p, v = partition[order], values[order]
+    index = np.arange(n)
+    new_partition = np.r_[True, p[1:] != p[:-1]]
+    new_value = new_partition | np.r_[True, v[1:] != v[:-1]]
+    partition_start = np.maximum.accumulate(np.where(new_partition, index, 0))
+    value_start = np.maximum.accumulate(np.where(new_value, index, 0))
+    res = np.empty(n, np.int64)
+    res[order] = value_start - partition_start + 1
+    return res
+
+
+class ColumnarStore:
+    def __init__(self, dataset: Dataset):
+        import_numpy()
+        self.directory = Directory(dataset)
+
+        self.aliases: list[str] = []
+        alias_index: dict[str, int] = {}
+        entity_rows: list[tuple] = []
+        title_rows: list[tuple] = []
+        for n in dataset.nominees:
+            if not grouped(dataset, n):
+                continue
+            common = (
+                n.category_id,
+                n.iteration,
+                AWARDS.index(AwardType(n.award)),
+                n.stat,
+            )
+            for id, name in n.entities:
+                if name not in alias_index:
+                    alias_index[name] = len(self.aliases)
+                    self.aliases.append(name)
+                entity_rows.append(
+                    (id, *common, n.winner, n.winner, n.pending, alias_index[name])
+                )
+            for id, winner in n.titles:
+                title_rows.append((id, *common, winner, n.winner, n.pending, -1))
+
+        self.entities = self._facts(entity_rows)
+        self.titles = self._facts(title_rows)
+
+        self.n_categories = max(dataset.categories) + 1
+        self.category_group = np.full(self.n_categories, -1, np.int64)
+        for c in dataset.categories.values():
+            if c.category_group_id is not None:
+                self.category_group[c.id] = c.category_group_id
+
+        self.entity_rankings = self._rankings(self.entities)
+        self.title_rankings = self._rankings(self.titles)
+
+    @staticmethod
+    def _facts(rows: list[tuple]) -> Facts:
+        columns = list(zip(*rows)) or [()] * 9
+        return Facts(
+            subject=np.array(columns[0], np.int64),
+            category=np.array(columns[1], np.int64),
+            iteration=np.array(columns[2], np.int32),
+            award=np.array(columns[3], np.int8),
+            stat=np.array(columns[4], bool),
+            winner=np.array(columns[5], bool),
+            nominee_winner=np.array(columns[6], bool),
+            pending=np.array(columns[7], bool),
+            alias=np.array(columns[8], np.int32),
+        )
+
+    def to_arrays(self) -> tuple[Arrays, dict[str, Any]]:
+        directory_arrays, directory_meta = self.directory.to_arrays("directory")
+        arrays: Arrays = {"category_group": self.category_group, **directory_arrays}
+        for prefix, columns in [
+            ("entities", self.entities),
+            ("titles", self.titles),
+            ("entity_rankings", self.entity_rankings),
+            ("title_rankings", self.title_rankings),
+        ]:
+            for f in fields(columns):
+                arrays[f"{prefix}.{f.name}"] = getattr(columns, f.name)
+        return arrays, {
+            "aliases": self.aliases,
+            "n_categories": self.n_categories,
+            "directory": directory_meta,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, meta: dict[str, Any]) -> "ColumnarStore":
+        """Wraps `arrays` as read-only NumPy arrays without copying."""
+        import_numpy()
+
+        def columns(type: Any, prefix: str) -> Any:
+            return type(
+                **{
+                    f.name: np.asarray(arrays[f"{prefix}.{f.name}"])
+                    for f in fields(type)
+                }
+            )
+
+        res = cls.__new__(cls)
+        res.directory = Directory.from_arrays(arrays, meta["directory"], "directory")
+        res.aliases = meta["aliases"]
+        res.n_categories = meta["n_categories"]
+        res.category_group = np.asarray(arrays["category_group"])
+        res.entities = columns(Facts, "entities")
+        res.titles = columns(Facts, "titles")
+        res.entity_rankings = columns(RankingsColumns, "entity_rankings")
+        res.title_rankings = columns(RankingsColumns, "title_rankings")
+        return res
+
+    def _mask(self, facts: Facts, f: NomineeFilter) -> "np.ndarray":
+        """Facts matching the award, winner, and pending filters."""
+        mask = np.ones(len(facts.subject), bool)
+        if f.award != "all":
+            mask &= facts.award == AWARDS.index(AwardType(f.award))
+        if f.winners_only:
+            mask &= facts.nominee_winner
+        if f.pending is not None:
+            mask &= facts.pending == f.pending
+        return mask
+
+    def _range_mask(self, facts: Facts, f: NomineeFilter) -> "np.ndarray":
+        mask = facts.iteration >= f.start_edition
+        if f.end_edition is not None:
+            mask &= facts.iteration <= f.end_edition
+        return mask
+
+    def _category_mask(self, f: NomineeFilter) -> "np.ndarray":
+        """Indexed by category id."""
+        mask = np.zeros(self.n_categories, bool)
+        for c in self.directory.categories.values():
+            mask[c.id] = f.matches_category(c)
+        return mask
+
+    def entity_stats(
+        self, f: NomineeFilter, after: list[int] | list[None], limit: int | None
+    ) -> list[EntityStats]:
+        """Same as `embedded.entity_stats`."""
+        facts = self.entities
+        mask = self._mask(facts, f)
+        in_range = self._range_mask(facts, f)[mask]
+        key = facts.subject * self.n_categories + facts.category
+        keys, inverse = np.unique(key[mask], return_inverse=True)
+        stat, winner = facts.stat[mask], facts.winner[mask]
+
+        def count(weights: "np.ndarray") -> "np.ndarray":
+            return np.bincount(inverse, weights, len(keys)).astype(np.int64)
+
+        noms, wins = count(stat & in_range), count(winner & in_range)
+        career_noms, career_wins = count(stat), count(winner)
+        valid = count(in_range) > 0
+
+        ids, categories = keys // self.n_categories, keys % self.n_categories
+        n_ids = int(ids.max()) + 1 if len(ids) else 0
+
+        def total(values: "np.ndarray") -> "np.ndarray":
+            return np.bincount(ids, values, n_ids).astype(np.int64)[ids]
+
+        total_noms, total_wins = total(noms), total(wins)
+        selected = valid & self._category_mask(f)[categories]
+        if after[0] is not None:
+            a_noms, a_wins, a_id, a_category = after  # type: ignore
+            selected &= (total_noms < a_noms) | (total_noms == a_noms) & (
+                (total_wins < a_wins)
+                | (total_wins == a_wins)
+                & ((ids > a_id) | (ids == a_id) & (categories > a_category))
+            )
+        rows = np.flatnonzero(selected)
+        order = np.lexsort(
+            (categories[rows], ids[rows], -total_wins[rows], -total_noms[rows])
+        )
+        rows = rows[order][:limit]
+
+        # distinct aliases of the returned rows only
+        alias_mask = mask & np.isin(key, keys[rows])
+        pairs = np.unique(
+            np.stack([key[alias_mask], facts.alias[alias_mask].astype(np.int64)]),
+            axis=1,
+        )
+        aliases: dict[int, list[str]] = {}
+        for k, alias in pairs.T.tolist():
+            aliases.setdefault(k, []).append(self.aliases[alias])
+
+        total_career_noms, total_career_wins = total(career_noms), total(career_wins)
+        return [
+            EntityStats.model_construct(
+                id=int(ids[i]),
+                imdb_id=self.directory.entities[int(ids[i])].imdb_id,
+                aliases=sorted(aliases[int(keys[i])]),
+                category_id=int(categories[i]),
+                category_noms=int(noms[i]),
+                category_wins=int(wins[i]),
+                total_noms=int(total_noms[i]),
+                total_wins=int(total_wins[i]),
+                career_category_noms=int(career_noms[i]),
+                career_category_wins=int(career_wins[i]),
+                career_total_noms=int(total_career_noms[i]),
+                career_total_wins=int(total_career_wins[i]),
+            )
+            for i in rows.tolist()
+        ]
+
+    def title_stats(
+        self, f: NomineeFilter, after: list[int] | list[None], limit: int | None
+    ) -> list[TitleStats]:
+        """Same as `embedded.title_stats`."""
+        facts = self.titles
+        mask = (
+            self._mask(facts, f)
+            & self._range_mask(facts, f)
+            & self._category_mask(f)[facts.category]
+        )
+        subject = facts.subject[mask]
+        n_ids = int(facts.subject.max()) + 1 if len(facts.subject) else 0
+        present = np.bincount(subject, minlength=n_ids) > 0
+        noms = np.bincount(subject, facts.stat[mask], n_ids).astype(np.int64)
+        wins = np.bincount(subject, facts.winner[mask], n_ids).astype(np.int64)
+
+        if after[0] is not None:
+            a_noms, a_wins, a_id = after  # type: ignore
+            ids = np.arange(n_ids)
+            present &= (noms < a_noms) | (noms == a_noms) & (
+                (wins < a_wins) | (wins == a_wins) & (ids > a_id)
+            )
+        ids = np.flatnonzero(present)
+        ids = ids[np.lexsort((ids, -wins[ids], -noms[ids]))][:limit]
+
+        res = []
+        for id in ids.tolist():
+            t = self.directory.titles[id]
+            res.append(
+                TitleStats.model_construct(
+                    id=id,
+                    imdb_id=t.imdb_id,
+                    title=t.title,
+                    noms=int(noms[id]),
+                    wins=int(wins[id]),
+                )
+            )
+        return res
+
+    def _rankings(self, facts: Facts) -> RankingsColumns:
+        key = facts.subject * self.n_categories + facts.category
+        keys, inverse = np.unique(key, return_inverse=True)
+        noms = np.bincount(inverse, facts.stat, len(keys)).astype(np.int64)
+        wins = np.bincount(inverse, facts.winner, len(keys)).astype(np.int64)
+        ids, categories = keys // self.n_categories, keys % self.n_categories
+
+        groups = self.category_group[categories]
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+        group_keys, group_inverse = np.unique(
+            ids * n_groups + groups, return_inverse=True
+        )
+        group_noms = np.bincount(group_inverse, noms, len(group_keys)).astype(np.int64)
+        group_wins = np.bincount(group_inverse, wins, len(group_keys)).astype(np.int64)
+        group_partition = group_keys % n_groups if n_groups else group_keys
+
+        overall_ids, overall_inverse = np.unique(ids, return_inverse=True)
+        overall_noms = np.bincount(overall_inverse, noms).astype(np.int64)
+        overall_wins = np.bincount(overall_inverse, wins).astype(np.int64)
+        no_partition = np.zeros(len(overall_ids), np.int64)
+
+        return RankingsColumns(
+            id=ids,
+            category=categories,
+            noms=noms,
+            wins=wins,
+            noms_rank=sql_rank(categories, noms),
+            wins_rank=sql_rank(categories, wins),
+            group_noms=group_noms[group_inverse],
+            group_wins=group_wins[group_inverse],
+            group_noms_rank=sql_rank(group_partition, group_noms)[group_inverse],
+            group_wins_rank=sql_rank(group_partition, group_wins)[group_inverse],
+            overall_noms=overall_noms[overall_inverse],
+            overall_wins=overall_wins[overall_inverse],
+            overall_noms_rank=sql_rank(no_partition, overall_noms)[overall_inverse],
+            overall_wins_rank=sql_rank(no_partition, overall_wins)[overall_inverse],
+        )
+
+    def rankings_rows(self, ids: list[int], is_title: bool) -> list[RankingsRow]:
+        """Returns the rankings rows of `ids`, ordered by id, then category
+        id."""
+        r = self.title_rankings if is_title else self.entity_rankings
+        res = []
+        for id in sorted(set(ids)):
+            start, end = np.searchsorted(r.id, [id, id + 1])
+            if start == end:
+                continue
+            if is_title:
+                t = self.directory.titles[id]
+                imdb_id, type, name = t.imdb_id, "title", t.title
+            else:
+                en = self.directory.entities[id]
+                imdb_id, type, name = en.imdb_id, en.type, en.name
+            for i in range(start, end):
+                c = self.directory.categories[int(r.category[i])]
+                res.append(
+                    RankingsRow.model_construct(
+                        id=id,
+                        imdb_id=imdb_id,
+                        type=type,
+                        name=name,
+                        overall_noms=int(r.overall_noms[i]),
+                        overall_wins=int(r.overall_wins[i]),
+                        overall_noms_rank=int(r.overall_noms_rank[i]),
+                        overall_wins_rank=int(r.overall_wins_rank[i]),
+                        category_group_id=c.category_group_id,
+                        category_group=c.category_group,
+                        category_group_noms=int(r.group_noms[i]),
+                        category_group_wins=int(r.group_wins[i]),
+                        category_group_noms_rank=int(r.group_noms_rank[i]),
+                        category_group_wins_rank=int(r.group_wins_rank[i]),
+                        category_id=c.id,
+                        category=c.name,
+                        category_noms=int(r.noms[i]),
+                        category_wins=int(r.wins[i]),
+                        category_noms_rank=int(r.noms_rank[i]),
+                        category_wins_rank=int(r.wins_rank[i]),
+                    )
+                )
+        return res
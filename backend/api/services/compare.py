@@ -0,0 +1,101 @@
+"""
+Side-by-side comparison of titles and entities used by `/compare`, computed in
+a single pass over the in-memory nominees instead of fetching each title or
+entity separately.
+"""
+
+from ..enums import LeaderboardType
+from ..models.entity_title import (
+    CompareCategory,
+    CompareEdition,
+    CompareSubject,
+    Comparison,
+    SharedNomination,
+)
+from .dataset import Dataset
+from .leaderboards import subject_info
+
+
+def compare(
+    dataset: Dataset, subjects: list[tuple[LeaderboardType, int]]
+) -> Comparison:
+    """Compares `subjects`, given as (type, id) pairs where type is either
+    `title` or `entity`."""
+    k = len(subjects)
+    index = {subject: i for i, subject in enumerate(subjects)}
+
+    editions: dict[int, CompareEdition] = {}
+    categories: dict[int, CompareCategory] = {}
+    shared_nominations: list[SharedNomination] = []
+
+    for n in dataset.nominees:
+        credited: dict[int, bool] = {}  # subject index -> winner
+        for id, winner in n.titles:
+            if (LeaderboardType.title_, id) in index:
+                credited[index[(LeaderboardType.title_, id)]] = winner
+        for id, _ in n.entities:
+            if (LeaderboardType.entity, id) in index:
+                credited[index[(LeaderboardType.entity, id)]] = n.winner
+        if not credited:
+            continue
+
+        if n.edition_id not in editions:
+            e = dataset.editions[n.edition_id]
+            editions[n.edition_id] = CompareEdition(
+                id=e.id,
+                iteration=e.iteration,
+                official_year=e.official_year,
+                noms=[0] * k,
+                wins=[0] * k,
+            )
+        if n.category_id not in categories:
+            c = dataset.categories[n.category_id]
+            categories[n.category_id] = CompareCategory(
+                category_id=c.id,
+                category=c.name,
+                category_group=c.category_group,
+                noms=[0] * k,
+                wins=[0] * k,
+            )
+
+        for counts in [editions[n.edition_id], categories[n.category_id]]:
+            for i, winner in credited.items():
+                counts.noms[i] += n.stat
+                counts.wins[i] += winner
+
+        if len(credited) > 1:
+            shared_nominations.append(
+                SharedNomination(
+                    edition_id=n.edition_id,
+                    iteration=n.iteration,
+                    category_id=n.category_id,
+                    official_name=dataset.category_names[
+                        n.category_name_id
+                    ].official_name,
+                    winner=n.winner,
+                    subjects=sorted(credited),
+                )
+            )
+
+    compare_subjects = []
+    for i, (type, id) in enumerate(subjects):
+        imdb_id, subject_type, name = subject_info(dataset, type, id)
+        compare_subjects.append(
+            CompareSubject(
+                id=id,
+                imdb_id=imdb_id,
+                type=subject_type,
+                name=name,
+                total_noms=sum(e.noms[i] for e in editions.values()),
+                total_wins=sum(e.wins[i] for e in editions.values()),
+            )
+        )
+
+    # nominees are ordered by iteration, so editions are too
+    return Comparison(
+        subjects=compare_subjects,
+        editions=list(editions.values()),
+        categories=sorted(categories.values(), key=lambda c: c.category_id),
+        shared_editions=[e.iteration for e in editions.values() if all(e.noms)],
+        shared_nominations=shared_nominations,
+    )
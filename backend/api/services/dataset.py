@@ -0,0 +1,469 @@
+"""
+In-memory copy of the nomination data, used to serve precomputed indexes
+without querying the db.
+
+The dataset is loaded on first use and reloaded whenever the current version tag
+changes. Indexes built from it via `Dataset.derive` are discarded along with it.
+Indexes served through `get_index` are kept per version tag instead, so that
+workers can map them from shared files (see `shared.py`) without loading the
+dataset.
+"""
+
+import ast
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Awaitable, Callable, TypeVar
+
+from psycopg.rows import class_row
+
+from ..dependencies import EMBEDDED, connect
+from ..enums import AwardType
+from .oscars_csv import read_rows
+from .shared import map_arrays, shared_path, write_arrays
+from .version import get_latest_version
+
+T = TypeVar("T")
+
+# categories whose nominees are people rather than titles; the CSV has no
+# `is_person` column
+PERSON_CATEGORY_NAMES = {
+    "actor",
+    "actor in a leading role",
+    "actor in a supporting role",
+    "actress",
+    "actress in a leading role",
+    "actress in a supporting role",
+}
+
+
+@dataclass(slots=True)
+class EditionRecord:
+    id: int
+    award: str
+    iteration: int
+    official_year: str
+    ceremony_date: date
+
+
+@dataclass(slots=True)
+class CategoryRecord:
+    id: int
+    award: str
+    name: str
+    category_group_id: int | None
+    category_group: str | None
+
+
+@dataclass(slots=True)
+class CategoryNameRecord:
+    id: int
+    category_id: int
+    official_name: str
+    common_name: str
+
+
+@dataclass(slots=True)
+class TitleRecord:
+    id: int
+    imdb_id: str
+    title: str
+
+
+@dataclass(slots=True)
+class EntityRecord:
+    id: int
+    imdb_id: str
+    type: str
+    name: str
+
+
+@dataclass(slots=True)
+class NomineeRecord:
+    id: int
+    award: str
+    edition_id: int
+    iteration: int
+    category_id: int
+    category_name_id: int
+    winner: bool
+    official: bool
+    stat: bool
+    pending: bool
+    statement: str
+    is_person: bool
+    note: str
+    titles: list[tuple[int, bool]] = field(default_factory=list)  # id, winner
+    entities: list[tuple[int, str]] = field(default_factory=list)  # id, name
+    # aligned with `titles` and `entities`
+    title_details: list[list[str] | None] = field(default_factory=list)
+    entity_statement_inds: list[int] = field(default_factory=list)
+
+
+@dataclass
+class Dataset:
+    tag: str | None
+    editions: dict[int, EditionRecord]
+    categories: dict[int, CategoryRecord]
+    category_names: dict[int, CategoryNameRecord]
+    titles: dict[int, TitleRecord]
+    entities: dict[int, EntityRecord]
+    nominees: list[NomineeRecord]  # ordered by iteration, then nominee id
+    _derived: dict[str, Any] = field(default_factory=dict, repr=False)
+
+    def derive(self, key: str, build: Callable[["Dataset"], T]) -> T:
+        """Returns the index stored under `key`, building it on first use."""
+        if key not in self._derived:
+            self._derived[key] = build(self)
+        return self._derived[key]
+
+
+_dataset: Dataset | None = None
+_lock = asyncio.Lock()
+
+
+async def get_dataset() -> Dataset:
+    global _dataset
+
+    version = await get_latest_version(AwardType.oscar)
+    tag = version.tag if version else None
+    if _dataset is not None and _dataset.tag == tag:
+        return _dataset
+
+    async with _lock:
+        if _dataset is None or _dataset.tag != tag:
+            _dataset = await load_dataset(tag)
+    return _dataset
+
+
+_indexes: dict[str, Any] = {}
+_indexes_tag: str | None = None
+_index_lock = asyncio.Lock()
+
+
+async def get_index(
+    key: str, cls: type[T], load: Callable[[], Awaitable[T]] | None = None
+) -> T:
+    """Returns the index `key` of the current version, an instance of `cls`
+    built from the dataset on first use. Indexes are discarded and rebuilt on
+    first use whenever the version tag changes.
+
+    `cls` implements `to_arrays` and `from_arrays(arrays, meta)`. If
+    `SHARED_DIR` is set, the index is mapped from the file shared by all
+    workers for this version, without loading the dataset; the file is written
+    first if it does not exist. If the file is deleted before it is mapped, the
+    locally built index is used.
+
+    Building takes up to a second for the larger indexes, so it runs in a worker
+    thread to keep serving other requests meanwhile. If `load` is given, it is
+    used instead of loading the dataset when the dataset is not already loaded,
+    ex. to build the index from a smaller query.
+    """
+    global _indexes_tag
+
+    version = await get_latest_version(AwardType.oscar)
+    tag = version.tag if version else None
+    if _indexes_tag != tag:
+        _indexes.clear()
+        _indexes_tag = tag
+    if key in _indexes:
+        return _indexes[key]
+
+    async with _index_lock:
+        if _indexes_tag == tag and key in _indexes:
+            return _indexes[key]
+        index = map_index(tag, key, cls)
+        if index is None:
+            dataset = _dataset if _dataset is not None and _dataset.tag == tag else None
+            if dataset is None and load is not None:
+                index = await load()
+                index = await asyncio.to_thread(share_index, tag, key, cls, index)
+            else:
+                dataset = dataset or await get_dataset()
+                tag = dataset.tag
+                index = await asyncio.to_thread(build_index, dataset, key, cls)
+        if _indexes_tag == tag:
+            _indexes[key] = index
+    return index
+
+
+def build_index(dataset: Dataset, key: str, cls: type[T]) -> T:
+    """Builds index `key` from `dataset` and writes its shared file, if any."""
+    return share_index(dataset.tag, key, cls, cls(dataset))  # type: ignore
+
+
+def share_index(tag: str | None, key: str, cls: type[T], index: T) -> T:
+    """Writes the shared file of `index`, if any, and returns it mapped."""
+    path = tag and shared_path(tag, key)
+    if not path:
+        return index
+    try:
+        write_arrays(path, *index.to_arrays())  # type: ignore
+    except FileNotFoundError:
+        # deleted by workers that moved on to newer versions
+        return index
+    return map_index(tag, key, cls) or index
+
+
+def map_index(tag: str | None, key: str, cls: type[T]) -> T | None:
+    """Maps the shared file of index `key`, or returns None if there is none."""
+    path = tag and shared_path(tag, key)
+    if not path:
+        return None
+    try:
+        return cls.from_arrays(*map_arrays(path))  # type: ignore
+    except FileNotFoundError:
+        return None
+
+
+async def load_dataset(tag: str | None) -> Dataset:
+    if EMBEDDED:
+        return load_csv_dataset(tag)
+    return await load_db_dataset(tag)
+
+
+async def load_db_dataset(tag: str | None) -> Dataset:
+    async with connect() as con:
+        async with con.cursor(row_factory=class_row(EditionRecord)) as cur:  # type: ignore
+            await cur.execute(
+                """
+                SELECT id, award, iteration, official_year, ceremony_date
+                FROM editions
+                ORDER BY iteration
+                """
+            )
+            editions: list[EditionRecord] = await cur.fetchall()  # type: ignore
+
+        async with con.cursor(row_factory=class_row(CategoryRecord)) as cur:  # type: ignore
+            await cur.execute(
+                """
+                SELECT
+                    c.id,
+                    c.award,
+                    c.name,
+                    cg.id AS category_group_id,
+                    cg.name AS category_group
+                FROM categories c
+                LEFT JOIN category_groups cg ON cg.id = c.category_group_id
+                ORDER BY c.id
+                """
+            )
+            categories: list[CategoryRecord] = await cur.fetchall()  # type: ignore
+
+        async with con.cursor(row_factory=class_row(CategoryNameRecord)) as cur:  # type: ignore
+            await cur.execute(
+                """
+                SELECT id, category_id, official_name, common_name
+                FROM category_names
+                ORDER BY id
+                """
+            )
+            category_names: list[CategoryNameRecord] = await cur.fetchall()  # type: ignore
+
+        async with con.cursor(row_factory=class_row(TitleRecord)) as cur:  # type: ignore
+            await cur.execute(
+                """
+                SELECT id, imdb_id, title
+                FROM titles
+                ORDER BY id
+                """
+            )
+            titles: list[TitleRecord] = await cur.fetchall()  # type: ignore
+
+        async with con.cursor(row_factory=class_row(EntityRecord)) as cur:  # type: ignore
+            await cur.execute(
+                """
+                SELECT id, imdb_id, type, name
+                FROM entities
+                ORDER BY id
+                """
+            )
+            entities: list[EntityRecord] = await cur.fetchall()  # type: ignore
+
+        async with con.cursor(row_factory=class_row(NomineeRecord)) as cur:  # type: ignore
+            await cur.execute(
+                """
+                SELECT
+                    n.id,
+                    n.award,
+                    n.edition_id,
+                    e.iteration,
+                    cn.category_id,
+                    n.category_name_id,
+                    n.winner,
+                    n.official,
+                    n.stat,
+                    n.pending,
+                    n.statement,
+                    n.is_person,
+                    n.note
+                FROM nominees n
+                JOIN editions e ON e.id = n.edition_id
+                JOIN category_names cn ON cn.id = n.category_name_id
+                ORDER BY e.iteration, n.id
+                """
+            )
+            nominees: list[NomineeRecord] = await cur.fetchall()  # type: ignore
+
+        nominee_by_id = {n.id: n for n in nominees}
+
+        async with con.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT nominee_id, title_id, winner, detail
+                FROM nominees_titles
+                ORDER BY nominee_id, winner DESC, id
+                """
+            )
+            for nominee_id, title_id, winner, detail in await cur.fetchall():
+                nominee_by_id[nominee_id].titles.append((title_id, winner))
+                nominee_by_id[nominee_id].title_details.append(detail)
+
+            await cur.execute(
+                """
+                SELECT nominee_id, entity_id, name, statement_ind
+                FROM nominees_entities
+                ORDER BY nominee_id, statement_ind
+                """
+            )
+            for nominee_id, entity_id, name, statement_ind in await cur.fetchall():
+                nominee_by_id[nominee_id].entities.append((entity_id, name))
+                nominee_by_id[nominee_id].entity_statement_inds.append(statement_ind)
+
+    return Dataset(
+        tag=tag,
+        editions={e.id: e for e in editions},
+        categories={c.id: c for c in categories},
+        category_names={cn.id: cn for cn in category_names},
+        titles={t.id: t for t in titles},
+        entities={en.id: en for en in entities},
+        nominees=nominees,
+    )
+
+
+def load_csv_dataset(tag: str | None) -> Dataset:
+    """Builds the dataset from `data/oscars.csv`. Nominee ids are preserved;
+    all other ids are assigned in order of first appearance, so they do not
+    match the ids in the db."""
+    editions: dict[int, EditionRecord] = {}
+    categories: dict[int, CategoryRecord] = {}
+    category_names: dict[int, CategoryNameRecord] = {}
+    titles: dict[int, TitleRecord] = {}
+    entities: dict[int, EntityRecord] = {}
+    nominee_by_id: dict[int, NomineeRecord] = {}
+
+    # natural key -> synthesized id
+    edition_ids: dict[int, int] = {}
+    category_group_ids: dict[str, int] = {}
+    category_ids: dict[str, int] = {}
+    category_name_ids: dict[tuple[int, str], int] = {}
+    title_ids: dict[str, int] = {}
+    entity_ids: dict[str, int] = {}
+    # rows are a cross product of each nominee's entities and titles
+    seen_titles: set[tuple[int, int]] = set()
+    seen_entities: set[tuple[int, int]] = set()
+
+    for r in read_rows():
+        iteration = int(r["iteration"])
+        if iteration not in edition_ids:
+            edition_ids[iteration] = len(edition_ids) + 1
+            editions[edition_ids[iteration]] = EditionRecord(
+                id=edition_ids[iteration],
+                award=AwardType.oscar.value,
+                iteration=iteration,
+                official_year=r["official_year"],
+                ceremony_date=date.fromisoformat(r["ceremony_date"]),
+            )
+
+        if r["category"] not in category_ids:
+            category_ids[r["category"]] = len(category_ids) + 1
+            category_group_ids.setdefault(
+                r["category_group"], len(category_group_ids) + 1
+            )
+            categories[category_ids[r["category"]]] = CategoryRecord(
+                id=category_ids[r["category"]],
+                award=AwardType.oscar.value,
+                name=r["category"],
+                category_group_id=category_group_ids[r["category_group"]],
+                category_group=r["category_group"],
+            )
+        category_id = category_ids[r["category"]]
+
+        category_name_key = (category_id, r["official_name"])
+        if category_name_key not in category_name_ids:
+            category_name_ids[category_name_key] = len(category_name_ids) + 1
+            category_names[category_name_ids[category_name_key]] = CategoryNameRecord(
+                id=category_name_ids[category_name_key],
+                category_id=category_id,
+                official_name=r["official_name"],
+                common_name=r["common_name"],
+            )
+
+        nominee_id = int(r["nomination_id"])
+        if nominee_id not in nominee_by_id:
+            nominee_by_id[nominee_id] = NomineeRecord(
+                id=nominee_id,
+                award=AwardType.oscar.value,
+                edition_id=edition_ids[iteration],
+                iteration=iteration,
+                category_id=category_id,
+                category_name_id=category_name_ids[category_name_key],
+                winner=r["winner"] == "True",
+                official=r["official"] == "True",
+                stat=r["stat"] == "True",
+                pending=r["pending"] == "True",
+                statement=r["statement"],
+                is_person=r["official_name"].lower() in PERSON_CATEGORY_NAMES,
+                note=r["note"],
+            )
+        n = nominee_by_id[nominee_id]
+
+        if r["title_imdb_id"]:
+            if r["title_imdb_id"] not in title_ids:
+                title_ids[r["title_imdb_id"]] = len(title_ids) + 1
+                titles[title_ids[r["title_imdb_id"]]] = TitleRecord(
+                    id=title_ids[r["title_imdb_id"]],
+                    imdb_id=r["title_imdb_id"],
+                    title=r["title"],
+                )
+            title_id = title_ids[r["title_imdb_id"]]
+            if (nominee_id, title_id) not in seen_titles:
+                seen_titles.add((nominee_id, title_id))
+                n.titles.append((title_id, r["title_winner"] == "True"))
+                n.title_details.append(
+                    ast.literal_eval(r["detail"]) if r["detail"] else None
+                )
+
+        if r["entity_imdb_id"]:
+            if r["entity_imdb_id"] not in entity_ids:
+                entity_ids[r["entity_imdb_id"]] = len(entity_ids) + 1
+                entities[entity_ids[r["entity_imdb_id"]]] = EntityRecord(
+                    id=entity_ids[r["entity_imdb_id"]],
+                    imdb_id=r["entity_imdb_id"],
+                    type=r["entity_type"],
+                    name=r["name"],
+                )
+            entity_id = entity_ids[r["entity_imdb_id"]]
+            if (nominee_id, entity_id) not in seen_entities:
+                seen_entities.add((nominee_id, entity_id))
+                n.entities.append((entity_id, r["statement_name"]))
+                n.entity_statement_inds.append(int(r["statement_ind"]))
+
+    for n in nominee_by_id.values():
+        # same order as the db loader
+        order = sorted(range(len(n.titles)), key=lambda i: not n.titles[i][1])
+        n.titles = [n.titles[i] for i in order]
+        n.title_details = [n.title_details[i] for i in order]
+        order = sorted(range(len(n.entities)), key=lambda i: n.entity_statement_inds[i])
+        n.entities = [n.entities[i] for i in order]
+        n.entity_statement_inds = [n.entity_statement_inds[i] for i in order]
+
+    return Dataset(
+        tag=tag,
+        editions=editions,
+        categories=categories,
+        category_names=category_names,
+        titles=titles,
+        entities=entities,
+        nominees=sorted(nominee_by_id.values(), key=lambda n: (n.iteration, n.id)),
+    )
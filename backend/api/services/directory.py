@@ -0,0 +1,154 @@
+"""
+Names and IMDb ids of every title and entity, and the categories, stored as
+arrays so that shared indexes (see `get_index`) can describe their results
+without loading the dataset.
+
+`Directory.titles`, `.entities`, and `.categories` can be used in place of the
+matching `Dataset` dicts.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Any, Iterator, Mapping, Sequence
+
+from .dataset import CategoryRecord, Dataset, EntityRecord, TitleRecord
+from .shared import Arrays, Strings
+
+
+class Titles(Mapping[int, TitleRecord]):
+    def __init__(self, ids: Sequence[int], imdb_ids: Strings, titles: Strings):
+        self._ids = ids  # sorted
+        self._imdb_ids = imdb_ids
+        self._titles = titles
+
+    @classmethod
+    def build(cls, records: list[TitleRecord]) -> "Titles":
+        records = sorted(records, key=lambda r: r.id)
+        return cls(
+            array("q", [r.id for r in records]),
+            Strings.build(r.imdb_id for r in records),
+            Strings.build(r.title for r in records),
+        )
+
+    def to_arrays(self, prefix: str) -> Arrays:
+        return {
+            f"{prefix}.ids": self._ids,
+            **self._imdb_ids.to_arrays(f"{prefix}.imdb_ids"),
+            **self._titles.to_arrays(f"{prefix}.titles"),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, prefix: str) -> "Titles":
+        return cls(
+            arrays[f"{prefix}.ids"],
+            Strings.from_arrays(arrays, f"{prefix}.imdb_ids"),
+            Strings.from_arrays(arrays, f"{prefix}.titles"),
+        )
+
+    def __getitem__(self, id: int) -> TitleRecord:
+        i = _index(self._ids, id)
+        return TitleRecord(id, self._imdb_ids[i], self._titles[i])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class Entities(Mapping[int, EntityRecord]):
+    def __init__(
+        self,
+        ids: Sequence[int],
+        imdb_ids: Strings,
+        types: Sequence[int],
+        type_names: list[str],
+        names: Strings,
+    ):
+        self._ids = ids  # sorted
+        self._imdb_ids = imdb_ids
+        self._types = types  # index into `type_names`
+        self.type_names = type_names
+        self._names = names
+
+    @classmethod
+    def build(cls, records: list[EntityRecord]) -> "Entities":
+        records = sorted(records, key=lambda r: r.id)
+        type_names = sorted({r.type for r in records})
+        return cls(
+            array("q", [r.id for r in records]),
+            Strings.build(r.imdb_id for r in records),
+            array("b", [type_names.index(r.type) for r in records]),
+            type_names,
+            Strings.build(r.name for r in records),
+        )
+
+    def to_arrays(self, prefix: str) -> Arrays:
+        return {
+            f"{prefix}.ids": self._ids,
+            **self._imdb_ids.to_arrays(f"{prefix}.imdb_ids"),
+            f"{prefix}.types": self._types,
+            **self._names.to_arrays(f"{prefix}.names"),
+        }
+
+    @classmethod
+    def from_arrays(
+        cls, arrays: Arrays, prefix: str, type_names: list[str]
+    ) -> "Entities":
+        return cls(
+            arrays[f"{prefix}.ids"],
+            Strings.from_arrays(arrays, f"{prefix}.imdb_ids"),
+            arrays[f"{prefix}.types"],
+            type_names,
+            Strings.from_arrays(arrays, f"{prefix}.names"),
+        )
+
+    def __getitem__(self, id: int) -> EntityRecord:
+        i = _index(self._ids, id)
+        return EntityRecord(
+            id, self._imdb_ids[i], self.type_names[self._types[i]], self._names[i]
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+def _index(ids: Sequence[int], id: int) -> int:
+    i = bisect_left(ids, id)
+    if i == len(ids) or ids[i] != id:
+        raise KeyError(id)
+    return i
+
+
+class Directory:
+    def __init__(self, dataset: Dataset):
+        self.titles = Titles.build(list(dataset.titles.values()))
+        self.entities = Entities.build(list(dataset.entities.values()))
+        self.categories: dict[int, CategoryRecord] = dict(dataset.categories)
+
+    def to_arrays(self, prefix: str) -> tuple[Arrays, dict[str, Any]]:
+        return {
+            **self.titles.to_arrays(f"{prefix}.titles"),
+            **self.entities.to_arrays(f"{prefix}.entities"),
+        }, {
+            "entity_types": self.entities.type_names,
+            "categories": [
+                [c.id, c.award, c.name, c.category_group_id, c.category_group]
+                for c in self.categories.values()
+            ],
+        }
+
+    @classmethod
+    def from_arrays(
+        cls, arrays: Arrays, meta: dict[str, Any], prefix: str
+    ) -> "Directory":
+        res = cls.__new__(cls)
+        res.titles = Titles.from_arrays(arrays, f"{prefix}.titles")
+        res.entities = Entities.from_arrays(
+            arrays, f"{prefix}.entities", meta["entity_types"]
+        )
+        res.categories = {c[0]: CategoryRecord(*c) for c in meta["categories"]}
+        return res
@@ -0,0 +1,741 @@
+"""
+Database-free versions of the queries behind the nominations, ceremony,
+category, entity, title, and search routes, used when the API runs with
+`DATA_BACKEND=csv`.
+
+Each function returns the same rows, in the same order, as the matching SQL
+query in the routers, computed from the in-memory dataset, so responses are
+assembled by the same code for either backend. The exception is `/search`,
+whose text matching approximates pg_trgm's similarity with word prefixes (see
+`text_dists`).
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, TypeVar
+
+from ..enums import EntityOrTitleSection, SortType
+from ..models.category import CategoryInfoRow, CategoryRow
+from ..models.ceremony import CeremonyInfo
+from ..models.entity_title import BatchEditionRow, EntityOrTitleRow, RankingsRow
+from ..models.nominations import EditionRow, EntityStats, TitleStats
+from ..models.search import CategoryResult, CeremonyResult, EntityResult, TitleResult
+from .category_bits import IdFilter
+from .dataset import Dataset, NomineeRecord
+from .nominee_filter import NomineeFilter
+from .suggest import fold
+
+K = TypeVar("K", bound=Hashable)
+R = TypeVar("R", EditionRow, BatchEditionRow)
+
+
+def grouped(dataset: Dataset, n: NomineeRecord) -> bool:
+    # nominees in categories without a group are excluded by the db queries'
+    # inner joins
+    return dataset.categories[n.category_id].category_group_id is not None
+
+
+def nominee_rows(
+    dataset: Dataset, n: NomineeRecord, row_type: type[R], **extra: Any
+) -> list[R]:
+    """Returns one row per credited entity and title of `n`, like the
+    nominations queries' joins of `nominees_entities` and `nominees_titles`."""
+    e = dataset.editions[n.edition_id]
+    c = dataset.categories[n.category_id]
+    cn = dataset.category_names[n.category_name_id]
+    common = dict(
+        edition_id=e.id,
+        iteration=e.iteration,
+        official_year=e.official_year,
+        ceremony_date=e.ceremony_date,
+        category_id=c.id,
+        category_name_id=cn.id,
+        category_group=c.category_group,
+        official_name=cn.official_name,
+        common_name=cn.common_name,
+        short_name=c.name,
+        nominee_id=n.id,
+        winner=n.winner,
+        statement=n.statement,
+        is_person=n.is_person,
+        note=n.note,
+        official=n.official,
+        stat=n.stat,
+        pending=n.pending,
+        **extra,
+    )
+
+    people: list[dict[str, Any]] = [
+        dict(
+            person_id=id,
+            name=name,
+            person_imdb_id=dataset.entities[id].imdb_id,
+            statement_ind=statement_ind,
+        )
+        for (id, name), statement_ind in zip(n.entities, n.entity_statement_inds)
+    ] or [dict(person_id=None, name=None, person_imdb_id=None, statement_ind=None)]
+    titles: list[dict[str, Any]] = [
+        dict(
+            title_id=id,
+            title=dataset.titles[id].title,
+            title_imdb_id=dataset.titles[id].imdb_id,
+            detail=detail,
+            title_winner=winner,
+        )
+        for (id, winner), detail in zip(n.titles, n.title_details)
+    ] or [
+        dict(
+            title_id=None,
+            title=None,
+            title_imdb_id=None,
+            detail=None,
+            title_winner=None,
+        )
+    ]
+
+    return [
+        row_type.model_construct(**common, **person, **title)
+        for person in people
+        for title in titles
+    ]
+
+
+def sort_nominees(
+    dataset: Dataset,
+    nominees: list[NomineeRecord],
+    sort_editions: SortType = SortType.ASC,
+    sort_categories: SortType = SortType.ASC,
+) -> list[NomineeRecord]:
+    """Sorts by iteration, official category name, winner, then id."""
+    res = sorted(nominees, key=lambda n: (not n.winner, n.id))
+    res.sort(
+        key=lambda n: dataset.category_names[n.category_name_id].official_name,
+        reverse=sort_categories == SortType.DESC,
+    )
+    res.sort(key=lambda n: n.iteration, reverse=sort_editions == SortType.DESC)
+    return res
+
+
+def edition_rows(
+    dataset: Dataset,
+    f: NomineeFilter,
+    sort_editions: SortType,
+    sort_categories: SortType,
+) -> list[EditionRow]:
+    nominees = [
+        n
+        for n in dataset.nominees
+        if grouped(dataset, n)
+        and f.matches_nominee(n)
+        and f.matches_range(n)
+        and f.matches_category(dataset.categories[n.category_id])
+    ]
+    return [
+        row
+        for n in sort_nominees(dataset, nominees, sort_editions, sort_categories)
+        for row in nominee_rows(dataset, n, EditionRow)
+    ]
+
+
+@dataclass(slots=True)
+class _EntityCategoryCounts:
+    aliases: set[str] = field(default_factory=set)
+    valid: bool = False  # has a nominee within the edition range
+    noms: int = 0
+    wins: int = 0
+    career_noms: int = 0
+    career_wins: int = 0
+
+
+def entity_stats(
+    dataset: Dataset,
+    f: NomineeFilter,
+    after: list[int] | list[None],
+    limit: int | None,
+) -> list[EntityStats]:
+    """`after` is the (total_noms, total_wins, id, category_id) of the last row
+    of the previous page, or all None."""
+    counts: dict[tuple[int, int], _EntityCategoryCounts] = defaultdict(
+        _EntityCategoryCounts
+    )
+    for n in dataset.nominees:
+        if not grouped(dataset, n) or not f.matches_nominee(n):
+            continue
+        in_range = f.matches_range(n)
+        for id, name in n.entities:
+            c = counts[(id, n.category_id)]
+            c.aliases.add(name)
+            c.career_noms += n.stat
+            c.career_wins += n.winner
+            if in_range:
+                c.valid = True
+                c.noms += n.stat
+                c.wins += n.winner
+
+    # [noms, wins, career_noms, career_wins] over all categories
+    totals: dict[int, list[int]] = defaultdict(lambda: [0, 0, 0, 0])
+    for (id, _), c in counts.items():
+        t = totals[id]
+        t[0] += c.noms
+        t[1] += c.wins
+        t[2] += c.career_noms
+        t[3] += c.career_wins
+
+    res = []
+    for (id, category_id), c in counts.items():
+        t = totals[id]
+        if (
+            not c.valid
+            or not f.matches_category(dataset.categories[category_id])
+            or after[0] is not None
+            and (t[0], t[1], -id, -category_id)
+            >= (after[0], after[1], -after[2], -after[3])  # type: ignore
+        ):
+            continue
+        res.append(
+            EntityStats.model_construct(
+                id=id,
+                imdb_id=dataset.entities[id].imdb_id,
+                aliases=sorted(c.aliases),
+                category_id=category_id,
+                category_noms=c.noms,
+                category_wins=c.wins,
+                total_noms=t[0],
+                total_wins=t[1],
+                career_category_noms=c.career_noms,
+                career_category_wins=c.career_wins,
+                career_total_noms=t[2],
+                career_total_wins=t[3],
+            )
+        )
+    res.sort(key=lambda s: (-s.total_noms, -s.total_wins, s.id, s.category_id))
+    return res[:limit]
+
+
+def title_stats(
+    dataset: Dataset,
+    f: NomineeFilter,
+    after: list[int] | list[None],
+    limit: int | None,
+) -> list[TitleStats]:
+    """`after` is the (noms, wins, id) of the last row of the previous page, or
+    all None."""
+    counts: dict[int, list[int]] = defaultdict(lambda: [0, 0])
+    for n in dataset.nominees:
+        if (
+            grouped(dataset, n)
+            and f.matches_nominee(n)
+            and f.matches_range(n)
+            and f.matches_category(dataset.categories[n.category_id])
+        ):
+            for id, winner in n.titles:
+                counts[id][0] += n.stat
+                counts[id][1] += winner
+
+    res = [
+        TitleStats.model_construct(
+            id=id,
+            imdb_id=dataset.titles[id].imdb_id,
+            title=dataset.titles[id].title,
+            noms=noms,
+            wins=wins,
+        )
+        for id, (noms, wins) in counts.items()
+        if after[0] is None
+        or (noms, wins, -id) < (after[0], after[1], -after[2])  # type: ignore
+    ]
+    res.sort(key=lambda s: (-s.noms, -s.wins, s.id))
+    return res[:limit]
+
+
+class SubjectNominees:
+    """Nominees crediting each entity and title, in dataset order."""
+
+    def __init__(self, dataset: Dataset):
+        self.entities: dict[int, list[NomineeRecord]] = defaultdict(list)
+        self.titles: dict[int, list[NomineeRecord]] = defaultdict(list)
+        for n in dataset.nominees:
+            if not grouped(dataset, n):
+                continue
+            for id, _ in n.entities:
+                self.entities[id].append(n)
+            for id, _ in n.titles:
+                self.titles[id].append(n)
+
+
+def rank(values: dict[K, int], partition: Callable[[K], Hashable]) -> dict[K, int]:
+    """Ranks `values` in descending order within each partition, like SQL
+    `rank()`."""
+    partitions: dict[Hashable, list[tuple[int, K]]] = defaultdict(list)
+    for key, value in values.items():
+        partitions[partition(key)].append((value, key))
+
+    res: dict[K, int] = {}
+    for part in partitions.values():
+        part.sort(key=lambda x: -x[0])
+        r, prev = 0, None
+        for i, (value, key) in enumerate(part):
+            if value != prev:
+                r, prev = i + 1, value
+            res[key] = r
+    return res
+
+
+def rankings_rows(
+    dataset: Dataset,
+    counts: dict[tuple[int, int], list[int]],
+    info: Callable[[int], tuple[str, str, str]],
+) -> dict[int, list[RankingsRow]]:
+    """Builds rankings rows from [noms, wins] per (id, category id); `info`
+    returns the (imdb_id, type, name) of an id."""
+    group_counts: dict[tuple[int, int], list[int]] = defaultdict(lambda: [0, 0])
+    overall_counts: dict[int, list[int]] = defaultdict(lambda: [0, 0])
+    for (id, category_id), (noms, wins) in counts.items():
+        category_group_id: int = dataset.categories[category_id].category_group_id  # type: ignore
+        for c in [group_counts[(id, category_group_id)], overall_counts[id]]:
+            c[0] += noms
+            c[1] += wins
+
+    def ranks(values: dict, partition: Callable) -> tuple[dict, dict]:
+        return (
+            rank({k: v[0] for k, v in values.items()}, partition),
+            rank({k: v[1] for k, v in values.items()}, partition),
+        )
+
+    category_ranks = ranks(counts, lambda k: k[1])
+    group_ranks = ranks(group_counts, lambda k: k[1])
+    overall_ranks = ranks(overall_counts, lambda _: None)
+
+    res: dict[int, list[RankingsRow]] = defaultdict(list)
+    for id, category_id in sorted(counts):
+        c = dataset.categories[category_id]
+        group_key = (id, c.category_group_id)
+        imdb_id, type, name = info(id)
+        res[id].append(
+            RankingsRow.model_construct(
+                id=id,
+                imdb_id=imdb_id,
+                type=type,
+                name=name,
+                overall_noms=overall_counts[id][0],
+                overall_wins=overall_counts[id][1],
+                overall_noms_rank=overall_ranks[0][id],
+                overall_wins_rank=overall_ranks[1][id],
+                category_group_id=c.category_group_id,
+                category_group=c.category_group,
+                category_group_noms=group_counts[group_key][0],  # type: ignore
+                category_group_wins=group_counts[group_key][1],  # type: ignore
+                category_group_noms_rank=group_ranks[0][group_key],
+                category_group_wins_rank=group_ranks[1][group_key],
+                category_id=category_id,
+                category=c.name,
+                category_noms=counts[(id, category_id)][0],
+                category_wins=counts[(id, category_id)][1],
+                category_noms_rank=category_ranks[0][(id, category_id)],
+                category_wins_rank=category_ranks[1][(id, category_id)],
+            )
+        )
+    return res
+
+
+class SubjectRankings:
+    """Rankings rows of every entity and title, ordered by category id."""
+
+    def __init__(self, dataset: Dataset):
+        entity_counts: dict[tuple[int, int], list[int]] = defaultdict(lambda: [0, 0])
+        title_counts: dict[tuple[int, int], list[int]] = defaultdict(lambda: [0, 0])
+        for n in dataset.nominees:
+            if not grouped(dataset, n):
+                continue
+            for id, _ in n.entities:
+                entity_counts[(id, n.category_id)][0] += n.stat
+                entity_counts[(id, n.category_id)][1] += n.winner
+            for id, winner in n.titles:
+                title_counts[(id, n.category_id)][0] += n.stat
+                title_counts[(id, n.category_id)][1] += winner
+
+        def entity_info(id: int) -> tuple[str, str, str]:
+            en = dataset.entities[id]
+            return en.imdb_id, en.type, en.name
+
+        def title_info(id: int) -> tuple[str, str, str]:
+            t = dataset.titles[id]
+            return t.imdb_id, "title", t.title
+
+        self.entities = rankings_rows(dataset, entity_counts, entity_info)
+        self.titles = rankings_rows(dataset, title_counts, title_info)
+
+
+def subject_rows(
+    dataset: Dataset,
+    ids: list[int],
+    include: set[EntityOrTitleSection],
+    is_title: bool,
+) -> tuple[
+    list[EntityOrTitleRow] | None,
+    list[RankingsRow] | None,
+    list[BatchEditionRow] | None,
+]:
+    """Returns the summary, rankings, and nominations rows that
+    `get_entities_by_ids`/`get_titles_by_ids` would fetch for `ids`."""
+    index = dataset.derive("subject_nominees", SubjectNominees)
+    nominees = index.titles if is_title else index.entities
+
+    rankings: list[RankingsRow] | None = None
+    if EntityOrTitleSection.rankings in include:
+        subject_rankings = dataset.derive("subject_rankings", SubjectRankings)
+        by_id = subject_rankings.titles if is_title else subject_rankings.entities
+        rankings = [row for id in sorted(set(ids)) for row in by_id.get(id, [])]
+
+    rows: list[BatchEditionRow] | None = None
+    if EntityOrTitleSection.nominations in include:
+        rows = [
+            row
+            for id in sorted(set(ids))
+            for n in sort_nominees(dataset, nominees.get(id, []))
+            for row in nominee_rows(dataset, n, BatchEditionRow, requested_id=id)
+        ]
+
+    summary: list[EntityOrTitleRow] | None = None
+    if include != set(EntityOrTitleSection):
+        summary = []
+        for id in sorted(set(ids)):
+            if not nominees.get(id):
+                continue
+            if is_title:
+                t = dataset.titles[id]
+                imdb_id, type, name, aliases = t.imdb_id, "title", t.title, [t.title]
+                noms = sum(n.stat for n in nominees[id] for i, _ in n.titles if i == id)
+                wins = sum(w for n in nominees[id] for i, w in n.titles if i == id)
+            else:
+                en = dataset.entities[id]
+                imdb_id, type, name = en.imdb_id, en.type, en.name
+                aliases = sorted(
+                    {a for n in nominees[id] for i, a in n.entities if i == id}
+                )
+                noms = sum(n.stat for n in nominees[id])
+                wins = sum(n.winner for n in nominees[id])
+            summary.append(
+                EntityOrTitleRow(
+                    id=id,
+                    imdb_id=imdb_id,
+                    type=type,
+                    name=name,
+                    aliases=aliases,  # type: ignore
+                    total_noms=noms,
+                    total_wins=wins,
+                )
+            )
+
+    return summary, rankings, rows
+
+
+def ceremony_infos(dataset: Dataset) -> list[CeremonyInfo]:
+    return [
+        CeremonyInfo(
+            id=e.id,
+            award=e.award,  # type: ignore
+            iteration=e.iteration,
+            official_year=e.official_year,
+            ceremony_date=e.ceremony_date,
+        )
+        for e in sorted(dataset.editions.values(), key=lambda e: e.iteration)
+    ]
+
+
+def category_name_iterations(dataset: Dataset) -> dict[int, list[int]]:
+    """Returns the iterations using each category name."""
+    iterations: dict[int, set[int]] = defaultdict(set)
+    for n in dataset.nominees:
+        iterations[n.category_name_id].add(n.iteration)
+    return {id: sorted(its) for id, its in iterations.items()}
+
+
+def category_rows(dataset: Dataset) -> list[CategoryRow]:
+    iterations = category_name_iterations(dataset)
+    res = []
+    for cn in dataset.category_names.values():
+        c = dataset.categories[cn.category_id]
+        if c.category_group_id is None or cn.id not in iterations:
+            continue
+        res.append(
+            CategoryRow(
+                category_group_id=c.category_group_id,
+                category_group=c.category_group,  # type: ignore
+                category_id=c.id,
+                category=c.name,
+                category_name_id=cn.id,
+                official_name=cn.official_name,
+                common_name=cn.common_name,
+                iterations=iterations[cn.id],
+            )
+        )
+    res.sort(key=lambda r: (r.category_group_id, r.category_id, r.category_name_id))
+    return res
+
+
+def category_info_row(dataset: Dataset, id: int) -> CategoryInfoRow | None:
+    rows = [r for r in category_rows(dataset) if r.category_id == id]
+    if not rows:
+        return None
+    return CategoryInfoRow(
+        category_id=rows[0].category_id,
+        category=rows[0].category,
+        category_group_id=rows[0].category_group_id,
+        category_group=rows[0].category_group,
+        category_name_ids=[r.category_name_id for r in rows],
+        official_names=[r.official_name for r in rows],
+        common_names=[r.common_name for r in rows],
+        ranges=[r.iterations for r in rows],
+    )
+
+
+# stands in for the `<%` threshold of pg_trgm: at least half of the query's
+# words must start a word of the text
+MAX_WORD_DIST = 0.5
+
+
+def text_dists(query: str | None, texts: dict[int, list[str]]) -> dict | None:
+    """Stands in for pg_trgm's `<<->` and `<->` distances in `/search`.
+
+    Returns the (word_dist, dist) of each id in `texts` matching `query`, using
+    its closest text: `word_dist` is the share of the query's folded words that
+    do not start a word of the text, and `dist` is the share of the distinct
+    words of both that are not in both. Returns None if `query` is None.
+    """
+    if query is None:
+        return None
+    query_words = fold(query).split()
+    if not query_words:
+        return {}
+    res = {}
+    for id, strs in texts.items():
+        best = None
+        for text in strs:
+            words = fold(text).split()
+            matched = sum(any(w.startswith(q) for w in words) for q in query_words)
+            common = set(query_words) & set(words)
+            dist = (
+                1 - matched / len(query_words),
+                1 - len(common) / len(set(query_words) | set(words)),
+            )
+            if best is None or dist < best:
+                best = dist
+        if best is not None and best[0] <= MAX_WORD_DIST:
+            res[id] = best
+    return res
+
+
+@dataclass
+class CountFilter:
+    min_noms: int
+    max_noms: int | None
+    min_wins: int
+    max_wins: int | None
+    noms_eq_wins: bool | None
+
+    def matches(self, noms: int, wins: int) -> bool:
+        return (
+            noms >= self.min_noms
+            and (self.max_noms is None or noms <= self.max_noms)
+            and wins >= self.min_wins
+            and (self.max_wins is None or wins <= self.max_wins)
+            and (self.noms_eq_wins is None or (noms == wins) == self.noms_eq_wins)
+        )
+
+
+def title_results(
+    dataset: Dataset,
+    f: NomineeFilter,
+    counts: CountFilter,
+    query: str | None,
+    ids: IdFilter | None,
+    limit: int,
+    offset: int,
+) -> list[TitleResult]:
+    dists = text_dists(query, {id: [t.title] for id, t in dataset.titles.items()})
+
+    # [iterations, noms, wins]
+    stats: dict[int, list] = defaultdict(lambda: [set(), 0, 0])
+    for n in dataset.nominees:
+        if not (
+            grouped(dataset, n)
+            and f.matches_nominee(n)
+            and f.matches_range(n)
+            and f.matches_category(dataset.categories[n.category_id])
+        ):
+            continue
+        for id, winner in n.titles:
+            if (dists is None or id in dists) and (
+                ids is None or ids.matches(id, n.edition_id)
+            ):
+                s = stats[id]
+                s[0].add(n.iteration)
+                s[1] += n.stat
+                s[2] += winner
+
+    rows = [
+        (*(dists[id] if dists is not None else (0, 0)), -noms, -wins, id)
+        for id, (_, noms, wins) in stats.items()
+        if counts.matches(noms, wins)
+    ]
+    rows.sort()
+    return [
+        TitleResult(
+            id=id,
+            imdb_id=dataset.titles[id].imdb_id,
+            type="title",
+            title=dataset.titles[id].title,
+            iterations=sorted(stats[id][0]),
+            noms=-noms,
+            wins=-wins,
+            word_dist=word_dist,
+            dist=dist,
+        )
+        for word_dist, dist, noms, wins, id in rows[offset : offset + limit]
+    ]
+
+
+def entity_results(
+    dataset: Dataset,
+    f: NomineeFilter,
+    counts: CountFilter,
+    query: str | None,
+    entity_type: str | None,
+    ids: IdFilter | None,
+    single_ceremony: bool,
+    limit: int,
+    offset: int,
+) -> list[EntityResult]:
+    """Only nominees of the ids (or id and edition id pairs) matching `ids` are
+    counted. With `single_ceremony`, counts are per ceremony, and `occurrences`
+    is the number of ceremonies matching `counts`."""
+    aliases: dict[int, set[str]] = defaultdict(set)
+    for n in dataset.nominees:
+        for id, name in n.entities:
+            aliases[id].add(name)
+    dists = text_dists(
+        query,
+        {id: [en.name, *aliases[id]] for id, en in dataset.entities.items()},
+    )
+
+    # (id, edition id if `single_ceremony`) -> [iterations, noms, wins]
+    groups: dict[tuple[int, int], list] = defaultdict(lambda: [set(), 0, 0])
+    for n in dataset.nominees:
+        if not (
+            grouped(dataset, n)
+            and f.matches_nominee(n)
+            and f.matches_range(n)
+            and f.matches_category(dataset.categories[n.category_id])
+        ):
+            continue
+        for id, _ in n.entities:
+            if (
+                (entity_type is None or dataset.entities[id].type == entity_type)
+                and (dists is None or id in dists)
+                and (ids is None or ids.matches(id, n.edition_id))
+            ):
+                g = groups[(id, n.edition_id if single_ceremony else 0)]
+                g[0].add(n.iteration)
+                g[1] += n.stat
+                g[2] += n.winner
+
+    # [occurrences, iterations, noms, wins]
+    totals: dict[int, list] = defaultdict(lambda: [0, [], 0, 0])
+    for (id, _), (iterations, noms, wins) in groups.items():
+        if counts.matches(noms, wins):
+            t = totals[id]
+            t[0] += 1
+            t[1] += sorted(iterations)
+            t[2] += noms
+            t[3] += wins
+
+    rows = [
+        (*(dists[id] if dists is not None else (0, 0)), -t[0], -t[2], -t[3], id)
+        for id, t in totals.items()
+    ]
+    rows.sort()
+    return [
+        EntityResult(
+            id=id,
+            imdb_id=dataset.entities[id].imdb_id,
+            type=dataset.entities[id].type,
+            name=dataset.entities[id].name,
+            aliases=sorted(aliases[id]),
+            occurrences=totals[id][0],
+            iterations=totals[id][1],
+            noms=totals[id][2],
+            wins=totals[id][3],
+            word_dist=word_dist,
+            dist=dist,
+        )
+        for word_dist, dist, _, _, _, id in rows[offset : offset + limit]
+    ]
+
+
+def category_results(
+    dataset: Dataset, query: str, limit: int, offset: int
+) -> list[CategoryResult]:
+    names: dict[int, list[str]] = defaultdict(list)
+    for cn in dataset.category_names.values():
+        names[cn.category_id] += [cn.official_name, cn.common_name]
+    categories = {
+        c.id: c
+        for c in dataset.categories.values()
+        if c.category_group_id is not None and c.id in names
+    }
+    dists = text_dists(
+        query,
+        {
+            id: [" ".join([c.category_group, c.name, *names[id]])]  # type: ignore
+            for id, c in categories.items()
+        },
+    )
+    rows = sorted((word_dist, id, dist) for id, (word_dist, dist) in dists.items())  # type: ignore
+    return [
+        CategoryResult(
+            id=id,
+            category=categories[id].name,
+            category_group_id=categories[id].category_group_id,  # type: ignore
+            category_group=categories[id].category_group,  # type: ignore
+            word_dist=word_dist,
+            dist=dist,
+        )
+        for word_dist, id, dist in rows[offset : offset + limit]
+    ]
+
+
+def ordinal(num: int) -> str:
+    """Like the db's `integer_to_ordinal`."""
+    if num % 100 in (11, 12, 13):
+        suffix = "th"
+    else:
+        suffix = {1: "st", 2: "nd", 3: "rd"}.get(num % 10, "th")
+    return f"{num}{suffix}"
+
+
+def ceremony_results(
+    dataset: Dataset, query: str, limit: int, offset: int
+) -> list[CeremonyResult]:
+    dists = text_dists(
+        query,
+        {
+            e.id: [
+                f"{ordinal(e.iteration)} {e.ceremony_date.year} {e.official_year}"
+                " Academy Awards"
+            ]
+            for e in dataset.editions.values()
+        },
+    )
+    rows = sorted((*dist, id) for id, dist in dists.items())  # type: ignore
+    return [
+        CeremonyResult(
+            id=id,
+            iteration=dataset.editions[id].iteration,
+            official_year=dataset.editions[id].official_year,
+            ceremony_date=dataset.editions[id].ceremony_date,
+            word_dist=word_dist,
+            dist=dist,
+        )
+        for word_dist, dist, id in rows[offset : offset + limit]
+    ]
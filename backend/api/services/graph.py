@@ -0,0 +1,159 @@
+"""
+Co-nomination graphs used by the collaborator and path endpoints.
+
+Two entities are connected if they were nominated for the same title (or
+credited in the same nomination, for nominations without a title), weighted by
+the number of such titles and nominations. Two titles are connected if the same
+entity was nominated for both, weighted by the number of such entities.
+
+Each graph is stored in compressed sparse row (CSR) form: node `i`'s neighbors
+are `neighbors[indptr[i]:indptr[i + 1]]`, with matching `weights`, sorted by
+weight descending so the top collaborators are a prefix of the row.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict, deque
+from typing import Any, Iterable, Sequence
+
+from .dataset import Dataset
+from .directory import Directory
+from .shared import Arrays
+
+
+class CsrGraph:
+    def __init__(self, groups: Iterable[Iterable[int]]):
+        """
+        Args:
+            groups: sets of node ids, where each pair of nodes within a set is
+                connected by one unit of weight
+        """
+        pair_weights: Counter[tuple[int, int]] = Counter()
+        for group in groups:
+            members = sorted(set(group))
+            for i, a in enumerate(members):
+                for b in members[i + 1 :]:
+                    pair_weights[(a, b)] += 1
+
+        self.ids: Sequence[int] = array(
+            "q", sorted({id for pair in pair_weights for id in pair})
+        )
+        rows: list[list[tuple[int, int]]] = [[] for _ in self.ids]
+        for (a, b), w in pair_weights.items():
+            i, j = self._index(a), self._index(b)
+            rows[i].append((-w, j))
+            rows[j].append((-w, i))
+
+        indptr = array("q", [0])
+        neighbors = array("q")  # node indices, not ids
+        weights = array("q")
+        for row in rows:
+            row.sort()
+            neighbors.extend(j for _, j in row)
+            weights.extend(-w for w, _ in row)
+            indptr.append(len(neighbors))
+        self.indptr: Sequence[int] = indptr
+        self.neighbors: Sequence[int] = neighbors
+        self.weights: Sequence[int] = weights
+
+    def to_arrays(self, prefix: str) -> Arrays:
+        return {
+            f"{prefix}.{name}": getattr(self, name)
+            for name in ["ids", "indptr", "neighbors", "weights"]
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, prefix: str) -> "CsrGraph":
+        res = cls.__new__(cls)
+        res.ids = arrays[f"{prefix}.ids"]
+        res.indptr = arrays[f"{prefix}.indptr"]
+        res.neighbors = arrays[f"{prefix}.neighbors"]
+        res.weights = arrays[f"{prefix}.weights"]
+        return res
+
+    def _index(self, id: int) -> int:
+        i = bisect_left(self.ids, id)
+        return i if i < len(self.ids) and self.ids[i] == id else -1
+
+    def top_neighbors(self, id: int, limit: int) -> list[tuple[int, int]]:
+        """Returns (id, weight) of the `limit` most strongly connected
+        neighbors of `id`."""
+        i = self._index(id)
+        if i < 0:
+            return []
+        start = self.indptr[i]
+        end = min(self.indptr[i + 1], start + limit)
+        return [
+            (self.ids[self.neighbors[k]], self.weights[k]) for k in range(start, end)
+        ]
+
+    def shortest_path(
+        self, source: int, target: int, max_hops: int
+    ) -> list[tuple[int, int | None]] | None:
+        """Returns (id, weight of edge from previous node) for each node on a
+        shortest path from `source` to `target`, or None if there is no path
+        within `max_hops` edges."""
+        s, t = self._index(source), self._index(target)
+        if s < 0 or t < 0:
+            return [(source, None)] if source == target else None
+
+        parent = array("q", [-1]) * len(self.ids)
+        parent_weight = array("q", [0]) * len(self.ids)
+        parent[s] = s
+        queue = deque([(s, 0)])
+        while queue and parent[t] < 0:
+            i, hops = queue.popleft()
+            if hops == max_hops:
+                continue
+            for k in range(self.indptr[i], self.indptr[i + 1]):
+                j = self.neighbors[k]
+                if parent[j] < 0:
+                    parent[j] = i
+                    parent_weight[j] = self.weights[k]
+                    queue.append((j, hops + 1))
+        if parent[t] < 0:
+            return None
+
+        path: list[tuple[int, int | None]] = []
+        i = t
+        while i != s:
+            path.append((self.ids[i], parent_weight[i]))
+            i = parent[i]
+        path.append((source, None))
+        return path[::-1]
+
+
+class CoNominationGraphs:
+    def __init__(self, dataset: Dataset):
+        title_entities: dict[int, set[int]] = defaultdict(set)
+        entity_titles: dict[int, set[int]] = defaultdict(set)
+        untitled: list[list[int]] = []
+        for n in dataset.nominees:
+            entity_ids = [id for id, _ in n.entities]
+            if not n.titles:
+                untitled.append(entity_ids)
+            for title_id, _ in n.titles:
+                title_entities[title_id].update(entity_ids)
+            for entity_id in entity_ids:
+                entity_titles[entity_id].update(id for id, _ in n.titles)
+
+        self.entities = CsrGraph([*title_entities.values(), *untitled])
+        self.titles = CsrGraph(entity_titles.values())
+        # names of the nodes
+        self.directory = Directory(dataset)
+
+    def to_arrays(self) -> tuple[Arrays, dict[str, Any]]:
+        directory_arrays, directory_meta = self.directory.to_arrays("directory")
+        return {
+            **self.entities.to_arrays("entities"),
+            **self.titles.to_arrays("titles"),
+            **directory_arrays,
+        }, {"directory": directory_meta}
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, meta: dict[str, Any]) -> "CoNominationGraphs":
+        res = cls.__new__(cls)
+        res.directory = Directory.from_arrays(arrays, meta["directory"], "directory")
+        res.entities = CsrGraph.from_arrays(arrays, "entities")
+        res.titles = CsrGraph.from_arrays(arrays, "titles")
+        return res
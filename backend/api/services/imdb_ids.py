@@ -0,0 +1,118 @@
+"""
+Map from IMDb ids to oscy ids, used to resolve `/imdb` lookups without querying
+the db.
+
+Ids of the form `<2-letter prefix><digits>` are stored per prefix as sorted
+arrays of integer keys (the numeric part, combined with the digit count so that
+zero padding is preserved) alongside the matching oscy ids; the remaining ids
+(manual ids, countries) are kept in a dict. Since the map covers every title and
+entity, an id that is not found is known not to exist.
+
+The map is built with the other indexes of the current version (see
+`get_index`), but when the dataset isn't loaded, ex. on a serverless cold start,
+it is built from the ids of titles and entities alone.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Iterable, Sequence
+
+from ..dependencies import EMBEDDED, connect
+from .dataset import Dataset, get_index
+from .shared import Arrays
+
+
+class ImdbIdMap:
+    def __init__(self, dataset: Dataset):
+        self._build(
+            (r.imdb_id, r.id)
+            for r in [*dataset.titles.values(), *dataset.entities.values()]
+        )
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[tuple[str, int]]) -> "ImdbIdMap":
+        """Builds the map from (IMDb id, oscy id) pairs of every title and
+        entity."""
+        res = cls.__new__(cls)
+        res._build(ids)
+        return res
+
+    def _build(self, ids: Iterable[tuple[str, int]]):
+        pairs: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._other: dict[str, int] = {}
+
+        for imdb_id, id in ids:
+            prefix, digits = imdb_id[:2], imdb_id[2:]
+            if is_numeric(digits):
+                pairs[prefix].append((to_key(digits), id))
+            else:
+                self._other[imdb_id] = id
+
+        self._keys: dict[str, Sequence[int]] = {}
+        self._ids: dict[str, Sequence[int]] = {}
+        for prefix, prefix_pairs in pairs.items():
+            prefix_pairs.sort()
+            self._keys[prefix] = array("q", [key for key, _ in prefix_pairs])
+            self._ids[prefix] = array("q", [id for _, id in prefix_pairs])
+
+    def to_arrays(self) -> tuple[Arrays, dict[str, Any]]:
+        arrays: Arrays = {}
+        for prefix in self._keys:
+            arrays[f"{prefix}.keys"] = self._keys[prefix]
+            arrays[f"{prefix}.ids"] = self._ids[prefix]
+        return arrays, {"other": self._other}
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, meta: dict[str, Any]) -> "ImdbIdMap":
+        res = cls.__new__(cls)
+        prefixes = {name.split(".")[0] for name in arrays}
+        res._keys = {prefix: arrays[f"{prefix}.keys"] for prefix in prefixes}
+        res._ids = {prefix: arrays[f"{prefix}.ids"] for prefix in prefixes}
+        res._other = meta["other"]
+        return res
+
+    def lookup(self, imdb_id: str) -> int | None:
+        """Returns the oscy title id (for `tt` ids) or entity id matching
+        `imdb_id`, or None if it does not exist."""
+        prefix, digits = imdb_id[:2], imdb_id[2:]
+        if not is_numeric(digits):
+            return self._other.get(imdb_id)
+        if prefix not in self._keys:
+            return None
+
+        keys = self._keys[prefix]
+        key = to_key(digits)
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return self._ids[prefix][i]
+        return None
+
+
+def to_key(digits: str) -> int:
+    return int(digits) << 5 | len(digits)
+
+
+def is_numeric(digits: str) -> bool:
+    return digits.isascii() and digits.isdigit()
+
+
+async def get_imdb_id_map() -> ImdbIdMap:
+    """Returns the map of the current version, rebuilt on first use whenever the
+    version changes."""
+    return await get_index(
+        "imdb_ids", ImdbIdMap, None if EMBEDDED else load_imdb_id_map
+    )
+
+
+async def load_imdb_id_map() -> ImdbIdMap:
+    async with connect() as con:
+        async with con.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT imdb_id, id FROM titles
+                UNION ALL
+                SELECT imdb_id, id FROM entities
+                """
+            )
+            return ImdbIdMap.from_ids(await cur.fetchall())  # type: ignore
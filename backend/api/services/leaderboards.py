@@ -0,0 +1,269 @@
+"""
+Sorted leaderboards used by `/leaderboards`.
+
+For every subject type and scope (overall, each category group, each category),
+nominations and wins across all editions are counted once and sorted by each
+metric, so reading the top k entries of a full-history leaderboard only walks
+the first k standings. Leaderboards limited to a range of editions are counted
+on request from the credited subjects of the nominees within that range, which
+are stored as arrays ordered by iteration.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Iterable, Sequence
+
+from ..enums import LeaderboardMetric, LeaderboardType
+from ..models.leaderboard import LeaderboardEntry
+from .dataset import Dataset, NomineeRecord
+from .directory import Directory
+from .shared import Arrays
+
+# ("overall", None), ("category_group", name), or ("category", name)
+Scope = tuple[str, str | None]
+OVERALL: Scope = ("overall", None)
+
+TYPES = list(LeaderboardType)
+ARRAY_NAMES = [
+    "iterations",
+    "types",
+    "ids",
+    "category_ids",
+    "stats",
+    "winners",
+    "standing_ids",
+    "noms",
+    "wins",
+    "order",
+]
+
+
+@dataclass(slots=True)
+class Standing:
+    id: int
+    noms: int = 0
+    wins: int = 0
+
+    @property
+    def win_rate(self) -> float | None:
+        return self.wins / self.noms if self.noms else None
+
+
+def sort_standings(
+    standings: Iterable[Standing], metric: LeaderboardMetric
+) -> list[Standing]:
+    if metric == LeaderboardMetric.noms:
+        return sorted(
+            (s for s in standings if s.noms or s.wins),
+            key=lambda s: (-s.noms, -s.wins, s.id),
+        )
+    if metric == LeaderboardMetric.wins:
+        return sorted(
+            (s for s in standings if s.noms or s.wins),
+            key=lambda s: (-s.wins, -s.noms, s.id),
+        )
+    return sorted(
+        (s for s in standings if s.noms),
+        key=lambda s: (-s.wins / s.noms, -s.noms, s.id),
+    )
+
+
+def metric_value(s: Standing, metric: LeaderboardMetric) -> float | None:
+    if metric == LeaderboardMetric.noms:
+        return s.noms
+    if metric == LeaderboardMetric.wins:
+        return s.wins
+    return s.win_rate
+
+
+def credited_subjects(
+    dataset: Dataset, n: NomineeRecord
+) -> list[tuple[LeaderboardType, int, bool]]:
+    """Returns (type, id, winner) for each title and entity credited in `n`;
+    entities are listed both as entities and under their own type."""
+    res = [(LeaderboardType.title_, id, winner) for id, winner in n.titles]
+    for id, _ in n.entities:
+        res.append((LeaderboardType.entity, id, n.winner))
+        res.append((LeaderboardType(dataset.entities[id].type), id, n.winner))
+    return res
+
+
+def subject_info(
+    records: Dataset | Directory, type: LeaderboardType, id: int
+) -> tuple[str, str, str]:
+    """Returns (imdb id, type, name) of a title or entity."""
+    if type == LeaderboardType.title_:
+        t = records.titles[id]
+        return t.imdb_id, "title", t.title
+    en = records.entities[id]
+    return en.imdb_id, en.type, en.name
+
+
+class Leaderboards:
+    def __init__(self, dataset: Dataset):
+        self.directory = Directory(dataset)
+        self._last_iteration = max(
+            (e.iteration for e in dataset.editions.values()), default=0
+        )
+
+        # credited subjects of each nominee, ordered by iteration like the
+        # nominees
+        self._iterations: Sequence[int] = array("i")
+        self._types: Sequence[int] = array("b")  # index into TYPES
+        self._ids: Sequence[int] = array("q")
+        self._category_ids: Sequence[int] = array("q")
+        self._stats: Sequence[int] = array("b")
+        self._winners: Sequence[int] = array("b")
+        for n in dataset.nominees:
+            for type, id, winner in credited_subjects(dataset, n):
+                self._iterations.append(n.iteration)  # type: ignore
+                self._types.append(TYPES.index(type))  # type: ignore
+                self._ids.append(id)  # type: ignore
+                self._category_ids.append(n.category_id)  # type: ignore
+                self._stats.append(n.stat)  # type: ignore
+                self._winners.append(winner)  # type: ignore
+
+        # full-history standings of every (type, scope), and for each metric,
+        # the order of its standings as a range of `_order`
+        self._standing_ids: Sequence[int] = array("q")
+        self._noms: Sequence[int] = array("q")
+        self._wins: Sequence[int] = array("q")
+        self._order: Sequence[int] = array("q")
+        self._ranges: dict[
+            tuple[LeaderboardType, Scope, LeaderboardMetric], tuple[int, int]
+        ] = {}
+        for (type, scope), by_id in self._count(0, len(self._ids), None).items():
+            index = {}
+            for s in by_id.values():
+                index[s.id] = len(self._standing_ids)
+                self._standing_ids.append(s.id)  # type: ignore
+                self._noms.append(s.noms)  # type: ignore
+                self._wins.append(s.wins)  # type: ignore
+            for metric in LeaderboardMetric:
+                start = len(self._order)
+                self._order.extend(  # type: ignore
+                    index[s.id] for s in sort_standings(by_id.values(), metric)
+                )
+                self._ranges[(type, scope, metric)] = (start, len(self._order))
+
+    def to_arrays(self) -> tuple[Arrays, dict[str, Any]]:
+        directory_arrays, directory_meta = self.directory.to_arrays("directory")
+        return {
+            **{name: getattr(self, f"_{name}") for name in ARRAY_NAMES},
+            **directory_arrays,
+        }, {
+            "last_iteration": self._last_iteration,
+            "ranges": [
+                [type, *scope, metric, start, end]
+                for (type, scope, metric), (start, end) in self._ranges.items()
+            ],
+            "directory": directory_meta,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, meta: dict[str, Any]) -> "Leaderboards":
+        res = cls.__new__(cls)
+        res.directory = Directory.from_arrays(arrays, meta["directory"], "directory")
+        res._last_iteration = meta["last_iteration"]
+        for name in ARRAY_NAMES:
+            setattr(res, f"_{name}", arrays[name])
+        res._ranges = {
+            (LeaderboardType(type), (kind, name), LeaderboardMetric(metric)): (
+                start,
+                end,
+            )
+            for type, kind, name, metric, start, end in meta["ranges"]
+        }
+        return res
+
+    def _count(
+        self, lo: int, hi: int, only: tuple[LeaderboardType, Scope] | None
+    ) -> dict[tuple[LeaderboardType, Scope], dict[int, Standing]]:
+        """Counts the credited subjects in `lo:hi`."""
+        counts: dict[tuple[LeaderboardType, Scope], dict[int, Standing]] = defaultdict(
+            dict
+        )
+        for i in range(lo, hi):
+            category = self.directory.categories[self._category_ids[i]]
+            scopes = [OVERALL, ("category", category.name)]
+            if category.category_group is not None:
+                scopes.append(("category_group", category.category_group))
+
+            type, id = TYPES[self._types[i]], self._ids[i]
+            for scope in scopes:
+                if only is not None and (type, scope) != only:
+                    continue
+                by_id = counts[(type, scope)]
+                if id not in by_id:
+                    by_id[id] = Standing(id)
+                by_id[id].noms += self._stats[i]
+                by_id[id].wins += self._winners[i]
+        return counts
+
+    def top(
+        self,
+        type: LeaderboardType,
+        metric: LeaderboardMetric,
+        category_group: str | None,
+        category: str | None,
+        start_edition: int,
+        end_edition: int | None,
+        min_noms: int,
+        limit: int,
+        offset: int,
+    ) -> list[LeaderboardEntry]:
+        scope: Scope = (
+            ("category", category)
+            if category
+            else ("category_group", category_group) if category_group else OVERALL
+        )
+
+        standings: Iterable[Standing]
+        if start_edition <= 1 and (
+            end_edition is None or end_edition >= self._last_iteration
+        ):
+            start, end = self._ranges.get((type, scope, metric), (0, 0))
+            standings = (
+                Standing(self._standing_ids[j], self._noms[j], self._wins[j])
+                for j in self._order[start:end]
+            )
+        else:
+            lo = bisect_left(self._iterations, start_edition)
+            hi = (
+                len(self._iterations)
+                if end_edition is None
+                else bisect_right(self._iterations, end_edition)
+            )
+            counts = self._count(lo, hi, (type, scope))
+            standings = sort_standings(counts[(type, scope)].values(), metric)
+
+        res: list[LeaderboardEntry] = []
+        rank = count = 0
+        prev = None
+        for s in standings:
+            if s.noms < min_noms:
+                continue
+            value = metric_value(s, metric)
+            if value != prev:
+                rank, prev = count + 1, value
+            count += 1
+            if count > offset:
+                res.append(self._entry(rank, type, s))
+                if len(res) == limit:
+                    break
+        return res
+
+    def _entry(self, rank: int, type: LeaderboardType, s: Standing) -> LeaderboardEntry:
+        imdb_id, entry_type, name = subject_info(self.directory, type, s.id)
+        return LeaderboardEntry(
+            rank=rank,
+            id=s.id,
+            imdb_id=imdb_id,
+            type=entry_type,
+            name=name,
+            noms=s.noms,
+            wins=s.wins,
+            win_rate=s.win_rate,
+        )
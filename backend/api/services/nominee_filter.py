@@ -0,0 +1,37 @@
+"""
+Filters shared by the nominations and search queries, applied either as SQL
+predicates (see `NomineeQuery.filter`) or to the in-memory dataset.
+"""
+
+from dataclasses import dataclass
+
+from ..enums import FilterAwardType
+from .dataset import CategoryRecord, NomineeRecord
+
+
+@dataclass
+class NomineeFilter:
+    award: FilterAwardType
+    start_edition: int
+    end_edition: int | None
+    winners_only: bool
+    pending: bool | None
+    categories: list[str] | None
+    category_groups: list[str] | None
+
+    def matches_nominee(self, n: NomineeRecord) -> bool:
+        return (
+            (self.award == FilterAwardType.all or n.award == self.award)
+            and (not self.winners_only or n.winner)
+            and (self.pending is None or n.pending == self.pending)
+        )
+
+    def matches_range(self, n: NomineeRecord) -> bool:
+        return n.iteration >= self.start_edition and (
+            self.end_edition is None or n.iteration <= self.end_edition
+        )
+
+    def matches_category(self, c: CategoryRecord) -> bool:
+        return (not self.categories or c.name in self.categories) and (
+            not self.category_groups or c.category_group in self.category_groups
+        )
@@ -0,0 +1,145 @@
+"""
+Builds queries over `nomination_facts f` with `psycopg.sql`, emitting only the
+joins and predicates needed for a request's parameters, so that the planner
+sees simple, selective queries instead of catch-all `(%(x)s IS NULL OR ...)`
+predicates.
+
+`nomination_facts` has one row per nominee, title, and entity, with the
+nominee's edition, category ids and flags copied onto it (see `schema.sql`), so
+the filters only join the tables whose names they compare against. Queries
+that count per title or per entity pick a `grain`, which keeps one row per
+nominee and title (or entity). Like the inner join of `category_groups` in the
+original queries, nominees in categories without a group are always excluded.
+
+The nominee tables are partitioned by award, so their joins also match on
+`award`: the planner carries an `f.award` filter over to them and skips the
+other awards' partitions.
+"""
+
+from psycopg import sql
+
+from ..enums import FilterAwardType
+from .nominee_filter import NomineeFilter
+
+# joins onto `nomination_facts f`, in the order they are emitted
+JOINS = {
+    "n": "JOIN nominees n ON n.id = f.nominee_id AND n.award = f.award",
+    "e": "JOIN editions e ON e.id = f.edition_id",
+    "cn": "JOIN category_names cn ON cn.id = f.category_name_id",
+    "c": "JOIN categories c ON c.id = f.category_id",
+    "cg": "JOIN category_groups cg ON cg.id = f.category_group_id",
+}
+# predicates keeping one row per nominee and title, or nominee and entity
+GRAINS = {
+    "title": "f.title_id IS NOT NULL AND f.entity_ord = 1",
+    "entity": "f.entity_id IS NOT NULL AND f.title_ord = 1",
+}
+
+
+class Conditions:
+    """Predicates combined with AND, whose params are added to a shared
+    dict."""
+
+    def __init__(self, params: dict):
+        self.conditions: list[sql.Composable] = []
+        self.params = params
+
+    def add(self, condition: str, **params):
+        self.conditions.append(sql.SQL(condition))
+        self.params.update(params)
+
+    def clause(self, keyword: str) -> sql.Composable:
+        """Returns `<keyword> <conditions>`, or nothing if there are no
+        conditions."""
+        if not self.conditions:
+            return sql.SQL("")
+        return sql.SQL(keyword + " ") + sql.SQL(" AND ").join(self.conditions)
+
+
+class NomineeQuery:
+    """Joins and predicates of a query over `nomination_facts f`. `aliases` are
+    joined regardless of the filters applied. With a `grain` of "title" or
+    "entity", only rows of nominees with titles (or entities) are kept, one per
+    nominee and title (or entity); otherwise, every row is kept."""
+
+    def __init__(self, *aliases: str, grain: str | None = None):
+        self.aliases: set[str] = set()
+        self.params: dict = {}
+        self.where = Conditions(self.params)
+        self.having = Conditions(self.params)
+        self.join(*aliases)
+        if grain is not None:
+            self.where.add(GRAINS[grain])
+        if "cg" not in self.aliases:
+            self.where.add("f.category_group_id IS NOT NULL")
+
+    def join(self, *aliases: str):
+        self.aliases.update(aliases)
+
+    def from_clause(self, *joins: str) -> sql.Composable:
+        """Returns the FROM clause with the joins of `self.aliases`, followed by
+        `joins`."""
+        lines = ["FROM nomination_facts f"]
+        lines += [join for alias, join in JOINS.items() if alias in self.aliases]
+        lines += joins
+        return sql.SQL("\n").join([sql.SQL(line) for line in lines])
+
+    def filter(
+        self, f: NomineeFilter, edition_range: bool = True, categories: bool = True
+    ):
+        """Adds the predicates of `f` to the WHERE clause, optionally excluding
+        its edition range or category filters."""
+        if f.award != FilterAwardType.all:
+            self.where.add("f.award = %(award)s", award=f.award)
+        if f.winners_only:
+            self.where.add("f.winner = TRUE")
+        if f.pending is not None:
+            self.where.add("f.pending = %(pending)s", pending=f.pending)
+        if edition_range:
+            condition = self.edition_range(f)
+            if condition:
+                self.where.add(condition)
+        if categories and f.categories:
+            self.join("c")
+            self.where.add("c.name = ANY(%(filter_c)s)", filter_c=f.categories)
+        if categories and f.category_groups:
+            self.join("cg")
+            self.where.add("cg.name = ANY(%(filter_cg)s)", filter_cg=f.category_groups)
+
+    def edition_range(self, f: NomineeFilter) -> str | None:
+        """Returns the condition restricting `f.iteration` to the edition range
+        of the filter, or None if it includes every edition."""
+        conditions = []
+        # iterations start at 1
+        if f.start_edition > 1:
+            conditions.append("f.iteration >= %(start_edition)s")
+            self.params["start_edition"] = f.start_edition
+        if f.end_edition is not None:
+            conditions.append("f.iteration <= %(end_edition)s")
+            self.params["end_edition"] = f.end_edition
+        if not conditions:
+            return None
+        return " AND ".join(conditions)
+
+    def count_filters(
+        self,
+        noms: str,
+        wins: str,
+        min_noms: int,
+        max_noms: int | None,
+        min_wins: int,
+        max_wins: int | None,
+        noms_eq_wins: bool | None,
+    ):
+        """Adds HAVING predicates bounding the aggregate expressions `noms` and
+        `wins`."""
+        if min_noms > 0:
+            self.having.add(f"{noms} >= %(min_noms)s", min_noms=min_noms)
+        if max_noms is not None:
+            self.having.add(f"{noms} <= %(max_noms)s", max_noms=max_noms)
+        if min_wins > 0:
+            self.having.add(f"{wins} >= %(min_wins)s", min_wins=min_wins)
+        if max_wins is not None:
+            self.having.add(f"{wins} <= %(max_wins)s", max_wins=max_wins)
+        if noms_eq_wins is not None:
+            self.having.add(f"{noms} {'=' if noms_eq_wins else '!='} {wins}")
@@ -0,0 +1,59 @@
+"""
+Reader for `data/oscars.csv`, the flattened export of the db with one row per
+nominee, credited entity, and title. Used in place of the db when the API runs
+with `DATA_BACKEND=csv`.
+"""
+
+import csv
+import hashlib
+import os
+from datetime import datetime, timezone
+
+from ..dependencies import CSV_PATH
+from ..enums import AwardType, UpdateType
+from ..models.version import Version
+
+_mtime: float | None = None
+_rows: list[dict[str, str]] = []
+_version: Version | None = None
+
+
+def _load():
+    """Reads the CSV if it has been modified since it was last read."""
+    global _mtime, _rows, _version
+
+    mtime = os.path.getmtime(CSV_PATH)
+    if mtime == _mtime:
+        return
+
+    with open(CSV_PATH, "rb") as f:
+        content = f.read()
+    rows = list(csv.DictReader(content.decode("utf-8").splitlines()))
+
+    iteration = max(int(r["iteration"]) for r in rows)
+    stage = (
+        UpdateType.nominations
+        if any(r["pending"] == "True" for r in rows)
+        else UpdateType.official
+    )
+    # same format as db tags, with a content hash in place of the timestamp
+    tag = f"o{iteration}{stage.value[0]}{hashlib.sha1(content).hexdigest()[:12]}"
+
+    _mtime, _rows = mtime, rows
+    _version = Version(
+        award=AwardType.oscar,
+        iteration=iteration,
+        update_stage=stage,
+        updated_at=datetime.fromtimestamp(mtime, timezone.utc),
+        tag=tag,
+    )
+
+
+def read_rows() -> list[dict[str, str]]:
+    _load()
+    return _rows
+
+
+def csv_version() -> Version:
+    _load()
+    return _version  # type: ignore
@@ -0,0 +1,111 @@
+"""
+In-memory cache of serialized API responses and their content-hash ETags,
+shared by the full app's middleware and the serverless fast path
+(api/serverless.py).
+
+Each response is cached under the version it was computed for (its resource's
+data version or the current version tag, see `get_cache_version`), along with a
+strong hash of its body that is used as its ETag. A response whose body an
+update didn't change keeps its ETag, so CDNs can revalidate it with a 304, and a
+request whose `If-None-Match` matches a cached hash is answered without running
+any queries. Responses of other versions are never served.
+
+The cache holds at most `RESPONSE_CACHE_MB` megabytes of bodies and
+`RESPONSE_CACHE_SIZE` responses (0 disables it), evicting the least recently
+used first. Responses over `RESPONSE_CACHE_MAX_KB` kilobytes, such as all-time
+nominations, are neither buffered nor cached: they use their version as ETag
+instead (see `version_etag`), like responses of an update that changed them.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode
+
+RESPONSE_CACHE_MB = float(os.getenv("RESPONSE_CACHE_MB") or 32)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE") or 500)
+RESPONSE_CACHE_MAX_KB = float(os.getenv("RESPONSE_CACHE_MAX_KB") or 1024)
+
+_max_bytes = int(RESPONSE_CACHE_MB * 1024 * 1024)
+_max_body = min(int(RESPONSE_CACHE_MAX_KB * 1024), _max_bytes)
+
+# response headers that are recomputed for every response
+_EXCLUDED_HEADERS = {"content-length", "cache-control", "etag"}
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str]
+    etag: str
+
+
+_cache: OrderedDict[tuple[str, str], CachedResponse] = OrderedDict()
+# total size of cached bodies
+_cache_bytes = 0
+
+
+def cache_key(path: str, query_string: str, accept_encoding: str) -> str:
+    """Returns the key of a request's response, which ignores the order of its
+    query params and its `v` query param."""
+    params = sorted(p for p in parse_qsl(query_string, True) if p[0] != "v")
+    # snapshotted responses are gzipped if accepted
+    encoding = "gzip" if "gzip" in accept_encoding else ""
+    return f"{path}?{urlencode(params)}#{encoding}"
+
+
+def content_etag(body: bytes) -> str:
+    """Returns the strong ETag of a response with body `body`."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def version_etag(version: str) -> str:
+    """Returns the ETag of a response too large to cache, computed for
+    `version`."""
+    return f'"{version}"'
+
+
+def is_cacheable(headers) -> bool:
+    """Returns whether a response with headers `headers` is small enough to be
+    buffered and cached."""
+    length = headers.get("content-length")
+    return (
+        RESPONSE_CACHE_SIZE > 0
+        and length is not None
+        and length.isdigit()
+        and int(length) <= _max_body
+    )
+
+
+def get_response(version: str, key: str) -> CachedResponse | None:
+    """Returns the cached response with key `key` computed for `version`."""
+    cached = _cache.get((version, key))
+    if cached is not None:
+        _cache.move_to_end((version, key))
+    return cached
+
+
+def cache_response(
+    version: str, key: str, body: bytes, headers: dict[str, str]
+) -> CachedResponse:
+    """Caches the response with key `key` computed for `version`, returning it
+    with its ETag. Check `is_cacheable` before buffering the body."""
+    global _cache_bytes
+    cached = CachedResponse(
+        body,
+        {k: v for k, v in headers.items() if k.lower() not in _EXCLUDED_HEADERS},
+        content_etag(body),
+    )
+    if RESPONSE_CACHE_SIZE <= 0 or len(body) > _max_body:
+        return cached
+
+    old = _cache.pop((version, key), None)
+    if old is not None:
+        _cache_bytes -= len(old.body)
+    _cache[(version, key)] = cached
+    _cache_bytes += len(body)
+    while len(_cache) > RESPONSE_CACHE_SIZE or _cache_bytes > _max_bytes:
+        _, evicted = _cache.popitem(last=False)
+        _cache_bytes -= len(evicted.body)
+    return cached
@@ -0,0 +1,135 @@
+"""
+Read-only index arrays shared between API worker processes through
+memory-mapped files.
+
+When `SHARED_DIR` is set, indexes that implement `to_arrays`/`from_arrays` (see
+`get_index`) are written once per data version to
+`$SHARED_DIR/<tag>/<name>.bin`. Every worker maps that file read-only and wraps
+its arrays as memoryviews (or NumPy views) without copying, so the pages are
+shared through the OS page cache instead of being duplicated per worker.
+
+A file is written to a temporary path and atomically renamed into place, so
+workers never see a partial file. Once a new version is written, the files of
+all but the previous version are deleted: workers still on the previous version
+may be about to map its files, while workers that already map older files are
+unaffected. A worker that finds its version's file deleted anyway builds the
+index itself (see `get_index`).
+
+File layout: an 8-byte little-endian header length, a JSON header, then the raw
+bytes of each array, aligned to 8 bytes.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import struct
+from array import array
+from typing import Any, Iterable, Sequence
+
+SHARED_DIR = os.getenv("SHARED_DIR")
+
+ALIGNMENT = 8
+
+# name -> buffer of a 1-d array, ex. `array.array` or `np.ndarray`
+Arrays = dict[str, Any]
+
+
+def shared_path(tag: str, name: str) -> str | None:
+    if not SHARED_DIR:
+        return None
+    return os.path.join(SHARED_DIR, tag, f"{name}.bin")
+
+
+def write_arrays(path: str, arrays: Arrays, meta: dict[str, Any]):
+    """Writes `arrays` and JSON-serializable `meta` to `path`."""
+    views = {name: memoryview(a) for name, a in arrays.items()}
+
+    header: dict[str, Any] = {"meta": meta, "arrays": {}}
+    offset = 0
+    for name, view in views.items():
+        header["arrays"][name] = [view.format, offset, view.nbytes]
+        offset += -(-view.nbytes // ALIGNMENT) * ALIGNMENT
+    header_bytes = json.dumps(header).encode()
+    data_start = -(-(8 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for name, view in views.items():
+            f.seek(data_start + header["arrays"][name][1])
+            f.write(view.cast("B"))
+    os.replace(tmp_path, path)
+
+    # remove files of versions before the previous one, which is the most
+    # recently modified of the others
+    tag_dir = os.path.dirname(path)
+    root = os.path.dirname(tag_dir)
+    others = [
+        os.path.join(root, entry)
+        for entry in os.listdir(root)
+        if os.path.join(root, entry) != tag_dir
+    ]
+    others.sort(key=mtime, reverse=True)
+    for other in others[1:]:
+        shutil.rmtree(other, ignore_errors=True)
+
+
+def mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0
+
+
+def map_arrays(path: str) -> tuple[dict[str, memoryview], dict[str, Any]]:
+    """Maps the file at `path` and returns zero-copy views of its arrays, along
+    with its metadata. Raises FileNotFoundError if it does not exist."""
+    with open(path, "rb") as f:
+        # the mapping stays valid after the file is closed
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    (header_length,) = struct.unpack_from("<Q", mm, 0)
+    header = json.loads(mm[8 : 8 + header_length])
+    data_start = -(-(8 + header_length) // ALIGNMENT) * ALIGNMENT
+
+    buffer = memoryview(mm)
+    arrays = {
+        name: buffer[data_start + offset : data_start + offset + nbytes].cast(format)
+        for name, (format, offset, nbytes) in header["arrays"].items()
+    }
+    return arrays, header["meta"]
+
+
+class Strings(Sequence[str]):
+    """List of strings stored as one UTF-8 buffer and an array of end offsets,
+    so that it can be shared like any other array. Strings are decoded on
+    access."""
+
+    def __init__(self, data: Any, offsets: Sequence[int]):
+        self._data = data
+        self._offsets = offsets  # offsets[i + 1] is the end of string i
+
+    @classmethod
+    def build(cls, strings: Iterable[str]) -> "Strings":
+        data = bytearray()
+        offsets = array("q", [0])
+        for s in strings:
+            data += s.encode()
+            offsets.append(len(data))
+        return cls(bytes(data), offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):  # type: ignore
+        return str(self._data[self._offsets[i] : self._offsets[i + 1]], "utf-8")
+
+    def to_arrays(self, prefix: str) -> Arrays:
+        return {f"{prefix}.data": self._data, f"{prefix}.offsets": self._offsets}
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, prefix: str) -> "Strings":
+        return cls(arrays[f"{prefix}.data"], arrays[f"{prefix}.offsets"])
@@ -0,0 +1,65 @@
+"""
+Serves pre-rendered responses generated by `api/snapshot.py`.
+
+A snapshot of version `<tag>` lives in `$SNAPSHOT_DIR/<tag>/`, with one JSON
+file (and a gzipped copy) per resource, ex. `entities/123.json`. It is only used
+once complete (i.e. its manifest exists) and while `<tag>` is the current version
+tag; any request that cannot be answered from it falls back to the live routes.
+"""
+
+import os
+import re
+
+from fastapi import Request, Response
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR")
+MANIFEST = "manifest.json"
+
+_RESOURCE_PATH = re.compile(
+    r"^/(ceremonies|categories)$|^/(ceremonies|categories|entities|titles)/(\d+)$"
+)
+
+_complete_tags: set[str] = set()
+
+
+def resource_file(path: str) -> str | None:
+    """Returns the snapshot file for request path `path`, if it is snapshotted."""
+    m = _RESOURCE_PATH.match(path)
+    if m is None:
+        return None
+    if m.group(1):
+        return f"{m.group(1)}.json"
+    return f"{m.group(2)}/{m.group(3)}.json"
+
+
+def is_complete(tag: str) -> bool:
+    if tag not in _complete_tags and SNAPSHOT_DIR:
+        if os.path.exists(os.path.join(SNAPSHOT_DIR, tag, MANIFEST)):
+            _complete_tags.add(tag)
+    return tag in _complete_tags
+
+
+def snapshot_response(tag: str, request: Request) -> Response | None:
+    """Returns the snapshotted response to `request` for version `tag`, or None
+    if it must be computed live."""
+    if not SNAPSHOT_DIR or request.method != "GET":
+        return None
+    # only the default response is snapshotted
+    if any(param != "v" for param in request.query_params):
+        return None
+    file = resource_file(request.url.path)
+    if file is None or not is_complete(tag):
+        return None
+
+    use_gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+    path = os.path.join(SNAPSHOT_DIR, tag, file + (".gz" if use_gzip else ""))
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+    except FileNotFoundError:
+        return None
+
+    headers = {"Vary": "Accept-Encoding"}
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+    return Response(content, media_type="application/json", headers=headers)
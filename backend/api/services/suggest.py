@@ -0,0 +1,291 @@
+"""
+Prefix index used for typeahead suggestions.
+
+Names are accent- and case-folded, and every word suffix of a name is indexed so
+that `hanks` matches "Tom Hanks". Keys are kept in a sorted array; the matches
+for a prefix are a contiguous range found by binary search. Items are stored in
+order of rank, so the top suggestions are the smallest item indexes in the
+range. Top suggestions for short prefixes, whose ranges are large, are
+precomputed.
+"""
+
+import heapq
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from itertools import accumulate
+from typing import Any, Sequence
+
+from ..enums import FilterType
+from ..models.search import (
+    CategorySuggestion,
+    EntitySuggestion,
+    SuggestResults,
+    TitleSuggestion,
+)
+from .dataset import Dataset
+from .shared import Arrays, Strings
+
+MAX_SUGGESTIONS = 20
+PRECOMPUTED_PREFIX_LEN = 3
+
+TITLE_COLUMNS = ["ids", "imdb_ids", "titles", "noms", "wins"]
+ENTITY_COLUMNS = [
+    "ids",
+    "imdb_ids",
+    "types",
+    "names",
+    "aliases",
+    "alias_offsets",
+    "noms",
+    "wins",
+]
+
+_APOSTROPHES = re.compile(r"['’`]")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def fold(text: str) -> str:
+    """Strips accents, punctuation, and case from `text`."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    stripped = _APOSTROPHES.sub("", stripped.casefold())
+    return " ".join(_NON_WORD.sub(" ", stripped).split())
+
+
+def word_suffixes(folded: str) -> list[str]:
+    words = folded.split(" ")
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class PrefixIndex:
+    def __init__(self, names: list[list[str]]):
+        """
+        Args:
+            names: names of each item, in order of rank; items with lower
+                ranks are suggested first
+        """
+        entries = sorted(
+            {
+                (key, i)
+                for i, item_names in enumerate(names)
+                for name in item_names
+                for key in word_suffixes(fold(name))
+                if key
+            }
+        )
+        self._keys: Sequence[str] = Strings.build(key for key, _ in entries)
+        self._item_inds: Sequence[int] = array("i", [i for _, i in entries])
+
+        # top items for each short prefix are
+        # `_top_inds[_top_offsets[j]:_top_offsets[j + 1]]`
+        prefixes = sorted(
+            {
+                key[:length]
+                for key, _ in entries
+                for length in range(1, PRECOMPUTED_PREFIX_LEN + 1)
+            }
+        )
+        self._top_prefixes: Sequence[str] = Strings.build(prefixes)
+        self._top_offsets: Sequence[int] = array("q", [0])
+        self._top_inds: Sequence[int] = array("i")
+        for prefix in prefixes:
+            self._top_inds.extend(self._scan(prefix, MAX_SUGGESTIONS))  # type: ignore
+            self._top_offsets.append(len(self._top_inds))  # type: ignore
+
+    def to_arrays(self, prefix: str) -> Arrays:
+        return {
+            **self._keys.to_arrays(f"{prefix}.keys"),  # type: ignore
+            f"{prefix}.item_inds": self._item_inds,
+            **self._top_prefixes.to_arrays(f"{prefix}.top_prefixes"),  # type: ignore
+            f"{prefix}.top_offsets": self._top_offsets,
+            f"{prefix}.top_inds": self._top_inds,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, prefix: str) -> "PrefixIndex":
+        res = cls.__new__(cls)
+        res._keys = Strings.from_arrays(arrays, f"{prefix}.keys")
+        res._item_inds = arrays[f"{prefix}.item_inds"]
+        res._top_prefixes = Strings.from_arrays(arrays, f"{prefix}.top_prefixes")
+        res._top_offsets = arrays[f"{prefix}.top_offsets"]
+        res._top_inds = arrays[f"{prefix}.top_inds"]
+        return res
+
+    def _scan(self, prefix: str, limit: int) -> list[int]:
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_right(self._keys, prefix + "\U0010ffff", lo)
+        return heapq.nsmallest(limit, set(self._item_inds[lo:hi]))
+
+    def search(self, query: str, limit: int) -> list[int]:
+        """Returns the indexes of the top `limit` items matching `query`."""
+        prefix = fold(query)
+        if not prefix:
+            return []
+        if len(prefix) > PRECOMPUTED_PREFIX_LEN:
+            return self._scan(prefix, limit)
+        j = bisect_left(self._top_prefixes, prefix)
+        if j == len(self._top_prefixes) or self._top_prefixes[j] != prefix:
+            return []
+        start = self._top_offsets[j]
+        return list(
+            self._top_inds[start : min(start + limit, self._top_offsets[j + 1])]
+        )
+
+
+class SuggestIndex:
+    def __init__(self, dataset: Dataset):
+        title_noms: dict[int, int] = defaultdict(int)
+        title_wins: dict[int, int] = defaultdict(int)
+        entity_noms: dict[int, int] = defaultdict(int)
+        entity_wins: dict[int, int] = defaultdict(int)
+        entity_aliases: dict[int, set[str]] = defaultdict(set)
+        category_noms: dict[int, int] = defaultdict(int)
+
+        for n in dataset.nominees:
+            for title_id, title_winner in n.titles:
+                title_noms[title_id] += n.stat
+                title_wins[title_id] += title_winner
+            for entity_id, name in n.entities:
+                entity_noms[entity_id] += n.stat
+                entity_wins[entity_id] += n.winner
+                entity_aliases[entity_id].add(name)
+            category_noms[n.category_id] += n.stat
+
+        # items of each type are stored as columns, in order of rank
+        titles = sorted(
+            dataset.titles.values(),
+            key=lambda t: (-title_noms[t.id], -title_wins[t.id], len(t.title), t.id),
+        )
+        self._titles: dict[str, Sequence] = {
+            "ids": array("q", [t.id for t in titles]),
+            "imdb_ids": Strings.build(t.imdb_id for t in titles),
+            "titles": Strings.build(t.title for t in titles),
+            "noms": array("q", [title_noms[t.id] for t in titles]),
+            "wins": array("q", [title_wins[t.id] for t in titles]),
+        }
+        self.titles = PrefixIndex([[t.title] for t in titles])
+
+        entities = sorted(
+            dataset.entities.values(),
+            key=lambda en: (
+                -entity_noms[en.id],
+                -entity_wins[en.id],
+                len(en.name),
+                en.id,
+            ),
+        )
+        aliases = [sorted(entity_aliases[en.id]) for en in entities]
+        self._entities: dict[str, Sequence] = {
+            "ids": array("q", [en.id for en in entities]),
+            "imdb_ids": Strings.build(en.imdb_id for en in entities),
+            "types": Strings.build(en.type for en in entities),
+            "names": Strings.build(en.name for en in entities),
+            # aliases of entity i are `aliases[alias_offsets[i]:alias_offsets[i + 1]]`
+            "aliases": Strings.build(
+                a for entity_aliases in aliases for a in entity_aliases
+            ),
+            "alias_offsets": array("q", [0, *accumulate(len(a) for a in aliases)]),
+            "noms": array("q", [entity_noms[en.id] for en in entities]),
+            "wins": array("q", [entity_wins[en.id] for en in entities]),
+        }
+        self.entities = PrefixIndex([[en.name, *a] for en, a in zip(entities, aliases)])
+
+        category_name_strs: dict[int, list[str]] = defaultdict(list)
+        for cn in dataset.category_names.values():
+            category_name_strs[cn.category_id] += [cn.official_name, cn.common_name]
+
+        categories = sorted(
+            dataset.categories.values(), key=lambda c: (-category_noms[c.id], c.id)
+        )
+        self._categories = [
+            CategorySuggestion(
+                id=c.id,
+                category=c.name,
+                category_group_id=c.category_group_id,
+                category_group=c.category_group,
+                noms=category_noms[c.id],
+            )
+            for c in categories
+        ]
+        self.categories = PrefixIndex(
+            [[c.name, *category_name_strs[c.id]] for c in categories]
+        )
+
+    def to_arrays(self) -> tuple[Arrays, dict[str, Any]]:
+        arrays: Arrays = {}
+        for prefix, columns in [("titles", self._titles), ("entities", self._entities)]:
+            for name, column in columns.items():
+                if isinstance(column, Strings):
+                    arrays |= column.to_arrays(f"{prefix}.{name}")
+                else:
+                    arrays[f"{prefix}.{name}"] = column
+        arrays |= self.titles.to_arrays("titles.index")
+        arrays |= self.entities.to_arrays("entities.index")
+        arrays |= self.categories.to_arrays("categories.index")
+        return arrays, {"categories": [c.model_dump() for c in self._categories]}
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, meta: dict[str, Any]) -> "SuggestIndex":
+        def columns(prefix: str, names: list[str]) -> dict[str, Sequence]:
+            return {
+                name: (
+                    Strings.from_arrays(arrays, f"{prefix}.{name}")
+                    if f"{prefix}.{name}.data" in arrays
+                    else arrays[f"{prefix}.{name}"]
+                )
+                for name in names
+            }
+
+        res = cls.__new__(cls)
+        res._titles = columns("titles", TITLE_COLUMNS)
+        res._entities = columns("entities", ENTITY_COLUMNS)
+        res._categories = [CategorySuggestion(**c) for c in meta["categories"]]
+        res.titles = PrefixIndex.from_arrays(arrays, "titles.index")
+        res.entities = PrefixIndex.from_arrays(arrays, "entities.index")
+        res.categories = PrefixIndex.from_arrays(arrays, "categories.index")
+        return res
+
+    def _title(self, i: int) -> TitleSuggestion:
+        c = self._titles
+        return TitleSuggestion(
+            id=c["ids"][i],
+            imdb_id=c["imdb_ids"][i],
+            title=c["titles"][i],
+            noms=c["noms"][i],
+            wins=c["wins"][i],
+        )
+
+    def _entity(self, i: int) -> EntitySuggestion:
+        c = self._entities
+        offsets = c["alias_offsets"]
+        return EntitySuggestion(
+            id=c["ids"][i],
+            imdb_id=c["imdb_ids"][i],
+            type=c["types"][i],
+            name=c["names"][i],
+            aliases=[c["aliases"][j] for j in range(offsets[i], offsets[i + 1])],
+            noms=c["noms"][i],
+            wins=c["wins"][i],
+        )
+
+    def suggest(self, query: str, type: FilterType, limit: int) -> SuggestResults:
+        return SuggestResults(
+            titles=(
+                [self._title(i) for i in self.titles.search(query, limit)]
+                if type in (FilterType.all, FilterType.title_)
+                else []
+            ),
+            entities=(
+                [self._entity(i) for i in self.entities.search(query, limit)]
+                if type in (FilterType.all, FilterType.entity)
+                else []
+            ),
+            categories=(
+                [self._categories[i] for i in self.categories.search(query, limit)]
+                if type in (FilterType.all, FilterType.category)
+                else []
+            ),
+        )
@@ -0,0 +1,186 @@
+"""
+Precomputed superlatives used by `/superlatives`.
+
+Longest nomination streaks and nominations before first win are gap-and-island
+style queries in SQL (see `DATABASE.md`). Since nominees are ordered by
+iteration, both are computed for every title and entity in a single pass over
+the dataset, then sorted once per type and stored as arrays.
+"""
+
+from array import array
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+from ..enums import LeaderboardType
+from ..models.superlative import FirstWinEntry, StreakEntry
+from .dataset import Dataset
+from .directory import Directory
+from .leaderboards import credited_subjects, subject_info
+from .shared import Arrays
+
+
+@dataclass(slots=True)
+class Progress:
+    iteration: int = 0  # edition currently being counted
+    last_nominated: int | None = None  # last edition with a nomination
+    streak_start: int = 0
+    best_streak: int = 0
+    best_streak_start: int = 0
+    noms: int = 0  # in editions before `iteration`
+    edition_noms: int = 0  # in `iteration`
+    first_win: int | None = None
+    noms_before_first_win: int = 0
+
+    def add(self, iteration: int, stat: bool, winner: bool):
+        """Counts one nomination; must be called in order of iteration."""
+        if iteration != self.iteration:
+            self.iteration = iteration
+            self.noms += self.edition_noms
+            self.edition_noms = 0
+
+        if stat:
+            self.edition_noms += 1
+            if self.last_nominated != iteration:
+                if self.last_nominated != iteration - 1:
+                    self.streak_start = iteration
+                self.last_nominated = iteration
+                if iteration - self.streak_start + 1 > self.best_streak:
+                    self.best_streak = iteration - self.streak_start + 1
+                    self.best_streak_start = self.streak_start
+
+        if winner and self.first_win is None:
+            self.first_win = iteration
+            self.noms_before_first_win = self.noms
+
+
+class Ranking:
+    """Subjects sorted by `value` descending, then id, along with the edition
+    that goes with each value (start of the streak, or first win)."""
+
+    def __init__(self, entries: list[tuple[int, int, int]]):
+        """
+        Args:
+            entries: (value, id, edition) triples
+        """
+        entries.sort(key=lambda x: (-x[0], x[1]))
+        self.values: Sequence[int] = array("q", [value for value, _, _ in entries])
+        self.ids: Sequence[int] = array("q", [id for _, id, _ in entries])
+        self.editions: Sequence[int] = array("q", [e for _, _, e in entries])
+
+    def to_arrays(self, prefix: str) -> Arrays:
+        return {
+            f"{prefix}.{name}": getattr(self, name)
+            for name in ["values", "ids", "editions"]
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, prefix: str) -> "Ranking":
+        res = cls.__new__(cls)
+        res.values = arrays[f"{prefix}.values"]
+        res.ids = arrays[f"{prefix}.ids"]
+        res.editions = arrays[f"{prefix}.editions"]
+        return res
+
+    def page(self, limit: int, offset: int) -> list[tuple[int, int]]:
+        """Returns (rank, index) for a page of the ranking; tied values share
+        the same rank."""
+        res = []
+        rank = 0
+        prev = None
+        for i in range(min(offset + limit, len(self.values))):
+            if self.values[i] != prev:
+                rank, prev = i + 1, self.values[i]
+            if i >= offset:
+                res.append((rank, i))
+        return res
+
+
+class Superlatives:
+    def __init__(self, dataset: Dataset):
+        self.directory = Directory(dataset)
+
+        progress: dict[tuple[LeaderboardType, int], Progress] = {}
+        for n in dataset.nominees:
+            for type, id, winner in credited_subjects(dataset, n):
+                if (type, id) not in progress:
+                    progress[(type, id)] = Progress()
+                progress[(type, id)].add(n.iteration, n.stat, winner)
+
+        streaks: dict[LeaderboardType, list[tuple[int, int, int]]] = {
+            type: [] for type in LeaderboardType
+        }
+        first_wins: dict[LeaderboardType, list[tuple[int, int, int]]] = {
+            type: [] for type in LeaderboardType
+        }
+        for (type, id), p in progress.items():
+            if p.best_streak:
+                streaks[type].append((p.best_streak, id, p.best_streak_start))
+            if p.first_win is not None:
+                first_wins[type].append((p.noms_before_first_win, id, p.first_win))
+
+        self._streaks = {type: Ranking(streaks[type]) for type in LeaderboardType}
+        self._first_wins = {type: Ranking(first_wins[type]) for type in LeaderboardType}
+
+    def to_arrays(self) -> tuple[Arrays, dict[str, Any]]:
+        arrays, directory_meta = self.directory.to_arrays("directory")
+        for type in LeaderboardType:
+            arrays |= self._streaks[type].to_arrays(f"streaks.{type.value}")
+            arrays |= self._first_wins[type].to_arrays(f"first_wins.{type.value}")
+        return arrays, {"directory": directory_meta}
+
+    @classmethod
+    def from_arrays(cls, arrays: Arrays, meta: dict[str, Any]) -> "Superlatives":
+        res = cls.__new__(cls)
+        res.directory = Directory.from_arrays(arrays, meta["directory"], "directory")
+        res._streaks = {
+            type: Ranking.from_arrays(arrays, f"streaks.{type.value}")
+            for type in LeaderboardType
+        }
+        res._first_wins = {
+            type: Ranking.from_arrays(arrays, f"first_wins.{type.value}")
+            for type in LeaderboardType
+        }
+        return res
+
+    def streaks(
+        self, type: LeaderboardType, limit: int, offset: int
+    ) -> list[StreakEntry]:
+        ranking = self._streaks[type]
+        res = []
+        for rank, i in ranking.page(limit, offset):
+            id, streak, start = ranking.ids[i], ranking.values[i], ranking.editions[i]
+            imdb_id, entry_type, name = subject_info(self.directory, type, id)
+            res.append(
+                StreakEntry(
+                    rank=rank,
+                    id=id,
+                    imdb_id=imdb_id,
+                    type=entry_type,
+                    name=name,
+                    streak=streak,
+                    start_edition=start,
+                    end_edition=start + streak - 1,
+                )
+            )
+        return res
+
+    def first_wins(
+        self, type: LeaderboardType, limit: int, offset: int
+    ) -> list[FirstWinEntry]:
+        ranking = self._first_wins[type]
+        res = []
+        for rank, i in ranking.page(limit, offset):
+            id = ranking.ids[i]
+            imdb_id, entry_type, name = subject_info(self.directory, type, id)
+            res.append(
+                FirstWinEntry(
+                    rank=rank,
+                    id=id,
+                    imdb_id=imdb_id,
+                    type=entry_type,
+                    name=name,
+                    noms_before_first_win=ranking.values[i],
+                    first_win_edition=ranking.editions[i],
+                )
+            )
+        return res
@@ -1,11 +1,28 @@
 from psycopg.rows import class_row
 
-from ..dependencies import connect
+from ..dependencies import EMBEDDED, connect
 from ..enums import AwardType
 from ..models.version import Version
+from .cache_headers import resource_scope, resource_tag
+from .oscars_csv import csv_version
+
+# most recent version fetched from db for each award; lets in-memory indexes
+# detect version changes without issuing their own query
+_latest_versions: dict[AwardType, Version | None] = {}
+
+# `data_versions` of the resources looked up since version tag
+# `_data_versions_tag`, in order of lookup
+_data_versions: dict[tuple[str, int], int | None] = {}
+_data_versions_tag: str | None = None
+MAX_CACHED_DATA_VERSIONS = 1024
 
 
 async def get_current_version(award: AwardType) -> Version | None:
+    if EMBEDDED:
+        res = csv_version() if award == AwardType.oscar else None
+        _latest_versions[award] = res
+        return res
+
     async with connect() as con:
         async with con.cursor(row_factory=class_row(Version)) as cur:  # type: ignore
             await cur.execute(
@@ -17,4 +34,63 @@ async def get_current_version(award: AwardType) -> Version | None:
                 (award,),
             )
             res: Version | None = await cur.fetchone()  # type: ignore
+            _latest_versions[award] = res
             return res
+
+
+def set_latest_version(award: AwardType, version: Version):
+    """Records a current version fetched elsewhere, ex. by `api.serverless`."""
+    _latest_versions[award] = version
+
+
+async def get_latest_version(award: AwardType) -> Version | None:
+    """Returns the version last seen by `get_current_version`, querying the db
+    only if no version has been fetched yet."""
+    if award in _latest_versions:
+        return _latest_versions[award]
+    return await get_current_version(award)
+
+
+async def get_data_version(tag: str, scope: tuple[str, int]) -> int | None:
+    """Returns the `data_versions` row of the resource `scope`, or None if it
+    has none. Rows are cached until the current version tag changes (every
+    update bumps it), up to `MAX_CACHED_DATA_VERSIONS` resources."""
+    global _data_versions_tag
+    if EMBEDDED:
+        return None
+    if tag != _data_versions_tag:
+        _data_versions.clear()
+        _data_versions_tag = tag
+    if scope in _data_versions:
+        return _data_versions[scope]
+
+    async with connect() as con:
+        async with con.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT version
+                FROM data_versions
+                WHERE scope = %s AND scope_id = %s
+                """,
+                scope,
+            )
+            row = await cur.fetchone()
+    if _data_versions_tag == tag:
+        if len(_data_versions) >= MAX_CACHED_DATA_VERSIONS:
+            # evict the oldest entry
+            del _data_versions[next(iter(_data_versions))]
+        _data_versions[scope] = row[0] if row else None
+    return row[0] if row else None
+
+
+async def get_cache_version(version: Version, path: str, include: str | None) -> str:
+    """Returns the version that responses for the resource at `path` (with
+    `include` query param) are cached under: its data version if it has one,
+    otherwise the current version tag."""
+    scope = resource_scope(path, include)
+    if scope is None:
+        return version.tag
+    data_version = await get_data_version(version.tag, scope)
+    if data_version is None:
+        return version.tag
+    return resource_tag(*scope, data_version)
@@ -0,0 +1,86 @@
+"""
+Startup warm-up run by the `lifespan` hook before the API starts serving.
+
+Waits for the pool to open its `min_size` connections, then requests each hot
+route in-process once per connection, so that connections, the db's caches,
+and in-memory indexes are ready before the first real request. Meanwhile, the
+indexes in `WARMUP_INDEXES`, which take too long to build on a request, are
+built (or mapped from their shared files). The warm-up is bounded by
+`WARMUP_TIMEOUT` seconds (0 disables it); if it times out, startup continues and
+anything left cold is handled on demand.
+"""
+
+import asyncio
+import os
+import time
+
+from fastapi import FastAPI
+from psycopg_pool import PoolTimeout
+
+from ..dependencies import EMBEDDED, get_pool
+from ..enums import AwardType
+from .dataset import get_dataset, get_index
+from .suggest import SuggestIndex
+from .version import get_current_version
+
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT") or 10)
+# comma-separated paths; defaults to `DEFAULT_ROUTES` and the current ceremony
+WARMUP_ROUTES = os.getenv("WARMUP_ROUTES")
+
+DEFAULT_ROUTES = ["/version", "/ceremonies", "/categories"]
+WARMUP_INDEXES = [("suggest", SuggestIndex)]
+
+
+async def hot_routes() -> list[str]:
+    if WARMUP_ROUTES:
+        return [r.strip() for r in WARMUP_ROUTES.split(",") if r.strip()]
+
+    routes = list(DEFAULT_ROUTES)
+    version = await get_current_version(AwardType.oscar)
+    if version:
+        dataset = await get_dataset()
+        routes += [
+            f"/ceremonies/{e.id}"
+            for e in dataset.editions.values()
+            if e.award == version.award and e.iteration == version.iteration
+        ]
+    return routes
+
+
+async def request_routes(app: FastAPI):
+    # only needed at startup, so kept out of the import path
+    import httpx
+
+    connections = 1
+    if not EMBEDDED:
+        await get_pool().wait(timeout=WARMUP_TIMEOUT)
+        connections = get_pool().min_size
+
+    routes = await hot_routes()
+    # failed requests are reported as 500 responses instead of raising
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as c:
+        responses = await asyncio.gather(
+            *[c.get(route) for route in routes for _ in range(connections)]
+        )
+    for route, response in zip(routes, responses[::connections]):
+        if response.status_code != 200:
+            print(f"Warm-up request {route} returned {response.status_code}")
+
+
+async def build_indexes():
+    for key, cls in WARMUP_INDEXES:
+        await get_index(key, cls)
+
+
+async def warm_up(app: FastAPI):
+    if WARMUP_TIMEOUT <= 0:
+        return
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(request_routes(app), build_indexes()), WARMUP_TIMEOUT
+        )
+        print(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+    except (asyncio.TimeoutError, PoolTimeout):
+        print(f"Warm-up timed out after {WARMUP_TIMEOUT}s, continuing startup")
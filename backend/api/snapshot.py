@@ -0,0 +1,150 @@
+"""
+Script for pre-rendering API responses for the current data version.
+
+Renders `/ceremonies`, `/ceremonies/{id}`, `/categories`, `/categories/{id}`,
+`/entities/{id}`, and `/titles/{id}` for every id into `<out_dir>/<tag>/`, along
+with gzipped copies. Run the API with `SNAPSHOT_DIR=<out_dir>` to serve these
+files while `<tag>` is the current version tag.
+
+Usage:
+    python -m api.snapshot <out_dir> [--concurrency <n>]
+
+Example:
+    python -m api.snapshot snapshots --concurrency 4
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import shutil
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from psycopg import sql
+
+from .dependencies import connect, get_pool
+from .enums import AwardType
+from .models.entity_title import MAX_BATCH_SIZE
+from .routers.categories import get_category_by_id, get_category_hierarchy
+from .routers.ceremonies import get_ceremony_by_id, list_ceremonies
+from .routers.entities_titles import get_entities_by_ids, get_titles_by_ids
+from .services.snapshot import MANIFEST
+from .services.version import get_current_version
+
+
+def write(dir: str, file: str, content: Any):
+    """Writes `content` as rendered by the API, plus a gzipped copy."""
+    body = JSONResponse(jsonable_encoder(content)).body
+    path = os.path.join(dir, file)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(body)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(body, mtime=0))
+
+
+async def fetch_ids(table: str) -> list[int]:
+    async with connect() as con:
+        async with con.cursor() as cur:
+            await cur.execute(
+                sql.SQL("SELECT id FROM {} ORDER BY id").format(sql.Identifier(table))
+            )
+            return [id for (id,) in await cur.fetchall()]
+
+
+async def snapshot(out_dir: str, concurrency: int):
+    version = await get_current_version(AwardType.oscar)
+    if version is None:
+        raise ValueError("no current version to snapshot")
+
+    tag_dir = os.path.join(out_dir, version.tag)
+    tmp_dir = tag_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    # bounds the number of concurrent db queries
+    semaphore = asyncio.Semaphore(concurrency)
+    count = 0
+
+    async def render(file: str, fetch: Callable[[], Awaitable[Any]]):
+        nonlocal count
+        async with semaphore:
+            res = await fetch()
+        if res is not None:
+            write(tmp_dir, file, res)
+            count += 1
+
+    async def render_batch(resource: str, get_by_ids: Callable, ids: list[int]):
+        nonlocal count
+        async with semaphore:
+            async with connect() as con:
+                res = await get_by_ids(con, ids)
+        for id, entity_or_title in res.items():
+            write(tmp_dir, f"{resource}/{id}.json", entity_or_title)
+            count += 1
+
+    ceremony_ids = await fetch_ids("editions")
+    category_ids = await fetch_ids("categories")
+    entity_ids = await fetch_ids("entities")
+    title_ids = await fetch_ids("titles")
+
+    await asyncio.gather(
+        render("ceremonies.json", list_ceremonies),
+        render("categories.json", get_category_hierarchy),
+        *[
+            render(f"ceremonies/{id}.json", partial(get_ceremony_by_id, id))
+            for id in ceremony_ids
+        ],
+        *[
+            render(f"categories/{id}.json", partial(get_category_by_id, id))
+            for id in category_ids
+        ],
+        # entities and titles are fetched in batches so that rankings are
+        # computed once per batch rather than once per id
+        *[
+            render_batch(
+                "entities", get_entities_by_ids, entity_ids[i : i + MAX_BATCH_SIZE]
+            )
+            for i in range(0, len(entity_ids), MAX_BATCH_SIZE)
+        ],
+        *[
+            render_batch("titles", get_titles_by_ids, title_ids[i : i + MAX_BATCH_SIZE])
+            for i in range(0, len(title_ids), MAX_BATCH_SIZE)
+        ],
+    )
+
+    current_version = await get_current_version(AwardType.oscar)
+    if current_version is None or current_version.tag != version.tag:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise RuntimeError("version changed during snapshot, discarding")
+
+    # manifest marks snapshot as complete
+    with open(os.path.join(tmp_dir, MANIFEST), "w") as f:
+        json.dump({"tag": version.tag, "files": count}, f)
+    shutil.rmtree(tag_dir, ignore_errors=True)
+    os.rename(tmp_dir, tag_dir)
+    print(f"Rendered {count} responses to {tag_dir}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("out_dir")
+    parser.add_argument("--concurrency", type=int, default=4)
+
+    args = parser.parse_args()
+    if args.concurrency <= 0:
+        raise ValueError("concurrency must be >= 1")
+
+    await get_pool().open()
+    try:
+        await snapshot(args.out_dir, args.concurrency)
+    finally:
+        await get_pool().close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
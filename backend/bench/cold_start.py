@@ -0,0 +1,87 @@
+"""
+Cold-start import profile of the API entry points.
+
+Imports each entry module in a fresh interpreter with `python -X importtime`
+and reports its total import time, along with the top-level packages that
+contribute most of it. `api.serverless` is the Vercel entry point and
+`api.main` is the full app it falls back to.
+
+Usage:
+    python -m bench.cold_start [--repeat <n>] [--top <n>] [--budget-ms <ms>]
+
+With `--budget-ms`, exits with status 1 if the serverless entry point takes
+longer than the budget to import.
+
+Example:
+    python -m bench.cold_start --repeat 5 --budget-ms 400
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ENTRY_POINTS = ["api.serverless", "api.main"]
+
+# import time: self [us] | cumulative | imported package
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(module: str) -> tuple[float, dict[str, float]]:
+    """Returns the total import time (ms) of `module` in a fresh interpreter,
+    and the import time (ms) of each top-level package it loaded."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    total = 0.0
+    packages: dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        packages[name.split(".")[0]] += int(self_us) / 1000
+        if len(indent) == 1:
+            total += int(cumulative_us) / 1000
+    return total, packages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float)
+
+    args = parser.parse_args()
+    if args.repeat <= 0:
+        raise ValueError("repeat must be >= 1")
+
+    totals: dict[str, float] = {}
+    for module in ENTRY_POINTS:
+        runs = [profile(module) for _ in range(args.repeat)]
+        totals[module] = statistics.median(total for total, _ in runs)
+        # packages of the median run
+        _, packages = sorted(runs, key=lambda r: r[0])[len(runs) // 2]
+
+        print(f"{module}: {totals[module]:.0f} ms")
+        for name, ms in sorted(packages.items(), key=lambda p: -p[1])[: args.top]:
+            print(f"    {name:<24}{ms:>8.1f} ms")
+        print()
+
+    if args.budget_ms is not None and totals["api.serverless"] > args.budget_ms:
+        print(
+            f"api.serverless import time {totals['api.serverless']:.0f} ms exceeds"
+            f" budget of {args.budget_ms:.0f} ms"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
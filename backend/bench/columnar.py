@@ -0,0 +1,136 @@
+"""
+Benchmark comparing `/` stats and entity/title rankings computed by the
+configured data backend (SQL, or the row-at-a-time embedded path with
+`DATA_BACKEND=csv`) against the NumPy columnar store (`COLUMNAR=1`).
+
+Reports the median latency of each case and the peak Python memory allocated
+while serving it, plus the time and memory needed to build the columnar store.
+Requires numpy.
+
+Usage:
+    python -m bench.columnar [--repeat <n>]
+
+Example:
+    DATA_BACKEND=csv python -m bench.columnar --repeat 20
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+
+from api.dependencies import EMBEDDED, get_pool
+from api.enums import EntityOrTitleSection
+from api.routers import entities_titles, nominations
+from api.services.columnar import ColumnarStore
+from api.services.dataset import get_dataset, get_index
+
+
+def set_columnar(enabled: bool):
+    nominations.COLUMNAR = enabled  # type: ignore
+    entities_titles.COLUMNAR = enabled  # type: ignore
+
+
+async def measure(run: Callable[[], Awaitable], repeat: int) -> tuple[float, float]:
+    """Returns the median latency (ms) and peak allocated memory (MB) of
+    `run`."""
+    await run()  # warm up
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await run()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # tracing slows down allocations, so memory is measured in a separate run
+    tracemalloc.start()
+    await run()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return statistics.median(latencies), peak
+
+
+async def bench(repeat: int):
+    dataset = await get_dataset()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    await get_index("columnar", ColumnarStore)
+    build_ms = (time.perf_counter() - start) * 1000
+    build_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+
+    rng = random.Random(0)
+    entity_ids = rng.sample(sorted(dataset.entities), 50)
+    title_ids = rng.sample(sorted(dataset.titles), 50)
+    rankings = {EntityOrTitleSection.rankings}
+
+    cases: list[tuple[str, Callable[[], Awaitable]]] = [
+        (
+            "stats, all ceremonies",
+            lambda: nominations.get_nominations(award="oscar", include="stats"),  # type: ignore
+        ),
+        (
+            "stats, Acting since 2000",
+            lambda: nominations.get_nominations(
+                award="oscar", start_edition=72, category_groups="Acting", include="stats"  # type: ignore
+            ),
+        ),
+        (
+            "top 10 entity stats, 1990s",
+            lambda: nominations.get_nominations(
+                award="oscar",  # type: ignore
+                start_edition=63,
+                end_edition=72,
+                include="entity_stats",
+                stats_limit=10,
+            ),
+        ),
+        (
+            "rankings, 50 entities",
+            lambda: entities_titles.fetch_entities_or_titles(
+                entity_ids, rankings, False
+            ),
+        ),
+        (
+            "rankings, 50 titles",
+            lambda: entities_titles.fetch_entities_or_titles(title_ids, rankings, True),
+        ),
+    ]
+
+    baseline = "embedded" if EMBEDDED else "sql"
+    print(f"columnar store: built in {build_ms:.0f} ms, {build_mb:.1f} MB\n")
+    print(
+        f"{'case':<30}{baseline + ' ms':>12}{'numpy ms':>12}{baseline + ' MB':>12}{'numpy MB':>12}"
+    )
+    for name, run in cases:
+        set_columnar(False)
+        base_ms, base_mb = await measure(run, repeat)
+        set_columnar(True)
+        numpy_ms, numpy_mb = await measure(run, repeat)
+        print(
+            f"{name:<30}{base_ms:>12.1f}{numpy_ms:>12.1f}{base_mb:>12.1f}{numpy_mb:>12.1f}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+
+    args = parser.parse_args()
+    if args.repeat <= 0:
+        raise ValueError("repeat must be >= 1")
+
+    if not EMBEDDED:
+        await get_pool().open()
+    try:
+        await bench(args.repeat)
+    finally:
+        if not EMBEDDED:
+            await get_pool().close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,361 @@
+"""
+Query-plan regression harness for the SQL issued by the API's routers.
+
+Restores `data/db.dump` into a throwaway Postgres cluster (see bench/load.py),
+then requests each case in `cases` in-process while recording every statement
+the routers execute, with its parameters. Each recorded statement is re-run
+with `EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`, and its median planning and
+execution time, shared buffer hits/reads, and scanned relations are reported.
+
+Compared to a baseline saved by a previous run (`--update-baseline`), a
+statement is flagged as a regression if a relation that was read with an index
+is now read with a sequential scan, or if its execution time grew by more than
+`--slowdown` times (and at least `--min-ms`). Exits with status 1 if any
+statement regressed.
+
+Usage:
+    python -m bench.explain [--baseline <path>] [--update-baseline]
+        [--repeat <n>] [--slowdown <x>] [--min-ms <ms>] [--no-migrations]
+
+Example:
+    python -m bench.explain --update-baseline
+    python -m bench.explain
+
+    # before/after numbers for the scripts in db/migrations
+    python -m bench.explain --no-migrations --update-baseline --baseline before.json
+    python -m bench.explain --baseline before.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import importlib
+import json
+import os
+import statistics
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+import psycopg
+from psycopg import sql
+
+from bench.load import (
+    SEARCH_FILTERS,
+    SEARCH_TYPES,
+    app_env,
+    free_port,
+    restore_dump,
+    search_combos,
+    start_db,
+    stop_db,
+)
+
+# routers that query the db through `connect`
+ROUTERS = ["categories", "ceremonies", "entities_titles", "nominations", "search"]
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan", "Bitmap Index Scan"}
+
+# entity and title ids ordered from most to least nominated
+ENTITIES_BY_NOMS = """
+    SELECT entity_id FROM nominees_entities
+    GROUP BY entity_id
+    ORDER BY count(*) DESC, entity_id
+"""
+TITLES_BY_NOMS = """
+    SELECT title_id FROM nominees_titles
+    GROUP BY title_id
+    ORDER BY count(*) DESC, title_id
+"""
+
+# one representative id (or list of ids) per name
+REPRESENTATIVE_IDS = {
+    "first_edition": """
+        SELECT id FROM editions WHERE award = 'oscar' ORDER BY iteration LIMIT 1
+    """,
+    "latest_edition": """
+        SELECT id FROM editions WHERE award = 'oscar' ORDER BY iteration DESC LIMIT 1
+    """,
+    "picture": """
+        SELECT id FROM categories WHERE award = 'oscar' AND name = 'Picture'
+    """,
+    "top_entity": f"{ENTITIES_BY_NOMS} LIMIT 1",
+    "rare_entity": f"""
+        SELECT entity_id FROM ({ENTITIES_BY_NOMS}) e
+        OFFSET (SELECT count(DISTINCT entity_id) - 1 FROM nominees_entities)
+    """,
+    "top_title": f"{TITLES_BY_NOMS} LIMIT 1",
+    "rare_title": f"""
+        SELECT title_id FROM ({TITLES_BY_NOMS}) t
+        OFFSET (SELECT count(DISTINCT title_id) - 1 FROM nominees_titles)
+    """,
+    "top_imdb_id": f"""
+        SELECT imdb_id FROM entities WHERE id = ({ENTITIES_BY_NOMS} LIMIT 1)
+    """,
+    "batch_entities": """
+        SELECT array_agg(id) FROM (SELECT id FROM entities ORDER BY id LIMIT 200) e
+    """,
+    "batch_titles": """
+        SELECT array_agg(id) FROM (SELECT id FROM titles ORDER BY id LIMIT 200) t
+    """,
+}
+
+# statements executed by the routers while requesting the current case
+recorded: list[tuple[Any, Any]] = []
+
+
+class RecordingCursor(psycopg.AsyncCursor):
+    async def execute(self, query, params=None, **kwargs):
+        recorded.append((query, params))
+        return await super().execute(query, params, **kwargs)
+
+
+def cases(ids: dict[str, Any]) -> list[tuple[str, str, str, Any]]:
+    """Returns the name, method, path, and JSON body of each case."""
+    res = [
+        ("nominations all awards", "GET", "/", None),
+        ("nominations all-time", "GET", "/?award=oscar", None),
+        (
+            "nominations acting since 2000",
+            "GET",
+            "/?award=oscar&start_edition=72&category_groups=Acting",
+            None,
+        ),
+        (
+            "nominations winners one ceremony",
+            "GET",
+            "/?award=oscar&start_edition=96&end_edition=96&winners_only=true",
+            None,
+        ),
+        (
+            "nominations categories decided",
+            "GET",
+            "/?award=oscar&categories=Actor,Actress&pending=false",
+            None,
+        ),
+        (
+            "nominations entity stats top 10",
+            "GET",
+            "/?award=oscar&start_edition=63&end_edition=72&include=entity_stats&stats_limit=10",
+            None,
+        ),
+        ("category hierarchy", "GET", "/categories", None),
+        ("category picture", "GET", f"/categories/{ids['picture']}", None),
+        ("ceremonies", "GET", "/ceremonies", None),
+        ("ceremony first", "GET", f"/ceremonies/{ids['first_edition']}", None),
+        ("ceremony latest", "GET", f"/ceremonies/{ids['latest_edition']}", None),
+        ("entity top", "GET", f"/entities/{ids['top_entity']}", None),
+        ("entity rare", "GET", f"/entities/{ids['rare_entity']}", None),
+        (
+            "entity top rankings",
+            "GET",
+            f"/entities/{ids['top_entity']}?include=rankings",
+            None,
+        ),
+        ("title top", "GET", f"/titles/{ids['top_title']}", None),
+        ("title rare", "GET", f"/titles/{ids['rare_title']}", None),
+        ("imdb", "GET", f"/imdb/{ids['top_imdb_id']}", None),
+        (
+            "entities batch 200",
+            "POST",
+            "/entities:batch",
+            {"ids": ids["batch_entities"]},
+        ),
+        ("titles batch 200", "POST", "/titles:batch", {"ids": ids["batch_titles"]}),
+    ]
+    for type_name, filter_name in search_combos():
+        params = {"award": "oscar"} | SEARCH_TYPES[type_name]
+        params |= SEARCH_FILTERS[filter_name]
+        if filter_name == "none":
+            params["query"] = "brad"
+        path = "/search?" + str(httpx.QueryParams(params))
+        res.append((f"search {type_name} {filter_name}", "GET", path, None))
+    return res
+
+
+def scans(plan: dict) -> list[list[str]]:
+    """Returns the node type and relation of each scan in `plan`."""
+    res = []
+    if "Relation Name" in plan:
+        res.append([plan["Node Type"], plan["Relation Name"]])
+    for child in plan.get("Plans", []):
+        res += scans(child)
+    return res
+
+
+async def explain(
+    con: psycopg.AsyncConnection, query: Any, params: Any, repeat: int
+) -> dict:
+    if not isinstance(query, sql.Composable):
+        query = sql.SQL(query)
+    text = query.as_string(con)
+    explain_query = sql.SQL("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {}").format(query)
+
+    runs = []
+    for _ in range(repeat):
+        cur = await con.execute(explain_query, params)
+        runs.append((await cur.fetchone())[0][0])  # type: ignore
+    await con.rollback()
+
+    plan = runs[-1]["Plan"]
+    return {
+        "fingerprint": hashlib.sha1(text.encode()).hexdigest()[:12],
+        "planning_ms": statistics.median(r["Planning Time"] for r in runs),
+        "execution_ms": statistics.median(r["Execution Time"] for r in runs),
+        "shared_hit": plan.get("Shared Hit Blocks", 0),
+        "shared_read": plan.get("Shared Read Blocks", 0),
+        "scans": scans(plan),
+    }
+
+
+def regressions(
+    current: dict, baseline: dict, slowdown: float, min_ms: float
+) -> list[str]:
+    """Returns a description of each way `current` regressed from `baseline`."""
+    if current["fingerprint"] != baseline["fingerprint"]:
+        return []  # query changed; nothing to compare against
+    res = []
+    was_indexed = {r for t, r in baseline["scans"] if t in INDEX_SCANS}
+    now_indexed = {r for t, r in current["scans"] if t in INDEX_SCANS}
+    for node_type, relation in current["scans"]:
+        if (
+            node_type == "Seq Scan"
+            and relation in was_indexed
+            and relation not in now_indexed
+        ):
+            res.append(f"seq scan on {relation}")
+    before, after = baseline["execution_ms"], current["execution_ms"]
+    if after > before * slowdown and after - before >= min_ms:
+        res.append(f"{after / before:.1f}x slower")
+    return res
+
+
+async def record_plans(args: argparse.Namespace, data_dir: str, db_port: int) -> dict:
+    # api reads its settings on import, so it is imported once they are set
+    # (with the routers querying the db rather than in-memory stores)
+    os.environ.update(
+        app_env(data_dir, db_port)
+        | {"DATA_BACKEND": "db", "COLUMNAR": "0", "SNAPSHOT_DIR": ""}
+    )
+    from api import dependencies
+    from api.main import app
+
+    @asynccontextmanager
+    async def recording_connect():
+        async with await psycopg.AsyncConnection.connect(
+            dependencies.conninfo, cursor_factory=RecordingCursor
+        ) as con:
+            yield con
+
+    for name in ROUTERS:
+        importlib.import_module(f"api.routers.{name}").connect = recording_connect
+
+    plans: dict[str, list[dict]] = {}
+    await dependencies.get_pool().open()
+    try:
+        async with await psycopg.AsyncConnection.connect(dependencies.conninfo) as con:
+            ids = {}
+            for name, query in REPRESENTATIVE_IDS.items():
+                (ids[name],) = await (await con.execute(query)).fetchone()  # type: ignore
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://explain"
+            ) as client:
+                for name, method, path, body in cases(ids):
+                    recorded.clear()
+                    response = await client.request(method, path, json=body)
+                    if response.status_code != 200:
+                        print(f"{name}: {path} returned {response.status_code}")
+                    plans[name] = [
+                        await explain(con, query, params, args.repeat)
+                        for query, params in recorded
+                    ]
+    finally:
+        await dependencies.get_pool().close()
+    return plans
+
+
+def report(plans: dict, baseline: dict | None, args: argparse.Namespace) -> int:
+    """Prints each statement's plan summary and returns the number of
+    regressions."""
+    count = 0
+    print(
+        f"{'case':<40}{'plan ms':>9}{'exec ms':>9}{'vs base':>9}{'hit':>8}{'read':>8}"
+        "  regressions"
+    )
+    for name, statements in plans.items():
+        base_statements = (baseline or {}).get(name)
+        if base_statements is not None and len(base_statements) != len(statements):
+            print(
+                f"{name}: {len(base_statements)} statements in baseline, now {len(statements)}"
+            )
+            base_statements = None
+        for i, s in enumerate(statements):
+            flags = (
+                regressions(s, base_statements[i], args.slowdown, args.min_ms)
+                if base_statements
+                else []
+            )
+            count += len(flags)
+            # execution time relative to the baseline, ex. 0.5x after adding
+            # an index
+            ratio = (
+                f"{s['execution_ms'] / base_statements[i]['execution_ms']:.2f}x"
+                if base_statements and base_statements[i]["execution_ms"]
+                else ""
+            )
+            print(
+                f"{name + f' #{i}':<40}{s['planning_ms']:>9.2f}{s['execution_ms']:>9.2f}"
+                f"{ratio:>9}{s['shared_hit']:>8}{s['shared_read']:>8}  {', '.join(flags)}"
+            )
+    return count
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", default="explain-baseline.json")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--slowdown", type=float, default=2.0)
+    parser.add_argument("--min-ms", type=float, default=1.0)
+    parser.add_argument(
+        "--no-migrations",
+        action="store_true",
+        help="explain against the dump without db/migrations applied",
+    )
+
+    args = parser.parse_args()
+    if args.repeat <= 0:
+        raise ValueError("repeat must be >= 1")
+
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory(prefix="oscy-explain-") as data_dir:
+        db_port = free_port()
+        start_db(data_dir, db_port)
+        try:
+            print("Restoring db dump...")
+            restore_dump(data_dir, db_port, not args.no_migrations)
+            plans = await record_plans(args, data_dir, db_port)
+        finally:
+            stop_db(data_dir)
+
+    count = report(plans, baseline, args)
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(plans, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+    elif baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline")
+    elif count:
+        print(f"\n{count} regressions")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
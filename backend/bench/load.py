@@ -0,0 +1,508 @@
+"""
+Load test replaying a weighted mix of realistic API traffic.
+
+Restores `data/db.dump` into a throwaway Postgres cluster (created with `initdb`
+in a temporary directory and deleted afterwards) and applies the scripts in
+`db/migrations`, starts the API against it with
+uvicorn, and replays the scenarios in `SCENARIOS` from `--concurrency`
+concurrent clients for `--duration` seconds. Reports throughput and p50/p95/p99
+latency per scenario, and saves the results as JSON so that runs can be compared
+between commits with `--compare`.
+
+Requires the Postgres server binaries (`initdb`, `pg_ctl`) and `pg_restore` on
+PATH, and the pg_trgm extension. Other settings of the API (ex. `COLUMNAR`,
+`SHARED_DIR`) are passed through from the environment; `.env` is not loaded.
+
+Usage:
+    python -m bench.load [--concurrency <n>] [--duration <s>] [--warmup <s>]
+        [--workers <n>] [--seed <n>] [--output <path>] [--compare <path>]
+        [--no-migrations]
+
+Example:
+    python -m bench.load --concurrency 32 --duration 60 --output before.json
+    python -m bench.load --concurrency 32 --duration 60 --compare before.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable
+
+import httpx
+import psycopg
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DUMP_PATH = os.path.join(BACKEND_DIR, "..", "data", "db.dump")
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, "db", "migrations")
+DBNAME = "oscy"
+USER = "postgres"
+
+# search params by result type; filters only apply to titles and entities
+SEARCH_TYPES = {
+    "all": {},
+    "title": {"type": "title"},
+    "entity": {"type": "entity"},
+    "person": {"type": "entity", "entity_type": "person"},
+    "category": {"type": "category"},
+    "ceremony": {"type": "ceremony"},
+}
+SEARCH_FILTERS = {
+    "none": {},
+    "range": {"start_edition": 72},
+    "categories": {"categories": "Actor,Actress"},
+    "category_groups": {"category_groups": "Acting"},
+    "noms": {"min_noms": 2},
+    "wins": {"min_noms": 1, "noms_eq_wins": "true"},
+    "in_categories": {
+        "noms_in_categories": "Picture",
+        "no_noms_in_categories": "Director",
+    },
+    "single_ceremony": {"min_noms": 2, "single_ceremony": "true"},
+}
+
+
+@dataclass
+class Samples:
+    """Ids and search terms that requests are generated from."""
+
+    editions: list[int]
+    entities: list[int]
+    titles: list[int]
+    imdb_ids: list[str]
+    words: list[str]
+    # ETag last returned for each path, revalidated by "conditional 304"
+    etags: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Scenario:
+    name: str
+    weight: float
+    # returns the path and headers of one request
+    request: Callable[[random.Random, Samples], tuple[str, dict[str, str]]]
+
+
+def search_combos() -> list[tuple[str, str]]:
+    """Each combination of result type and filter in `SEARCH_TYPES` and
+    `SEARCH_FILTERS`."""
+    return [
+        (type_name, filter_name)
+        for type_name, filter_name in itertools.product(SEARCH_TYPES, SEARCH_FILTERS)
+        if filter_name == "none"
+        or SEARCH_TYPES[type_name].get("type") in ("title", "entity")
+    ]
+
+
+def search_scenarios(weight: float) -> list[Scenario]:
+    """One scenario per search combination, sharing `weight` equally."""
+    combos = search_combos()
+
+    def request(type_name: str, filter_name: str):
+        def build(rng: random.Random, s: Samples) -> tuple[str, dict[str, str]]:
+            params = {"award": "oscar"} | SEARCH_TYPES[type_name]
+            params |= SEARCH_FILTERS[filter_name]
+            # filtered searches browse without a query, like the examples in
+            # the `/search` docs
+            if filter_name == "none":
+                params["query"] = rng.choice(s.words)
+            return "/search?" + str(httpx.QueryParams(params)), {}
+
+        return build
+
+    return [
+        Scenario(f"search {t} {f}", weight / len(combos), request(t, f))
+        for t, f in combos
+    ]
+
+
+def not_modified(rng: random.Random, s: Samples) -> tuple[str, dict[str, str]]:
+    scenario = rng.choice(PAGE_SCENARIOS)
+    path, _ = scenario.request(rng, s)
+    # paths not requested yet are fetched in full, like a CDN's first request
+    return path, {"If-None-Match": s.etags[path]} if path in s.etags else {}
+
+
+PAGE_SCENARIOS = [
+    Scenario("nominations all-time", 10, lambda rng, s: ("/?award=oscar", {})),
+    Scenario(
+        "ceremony", 20, lambda rng, s: (f"/ceremonies/{rng.choice(s.editions)}", {})
+    ),
+    Scenario("entity", 20, lambda rng, s: (f"/entities/{rng.choice(s.entities)}", {})),
+    Scenario("title", 15, lambda rng, s: (f"/titles/{rng.choice(s.titles)}", {})),
+    Scenario("imdb", 10, lambda rng, s: (f"/imdb/{rng.choice(s.imdb_ids)}", {})),
+]
+
+SCENARIOS = [
+    *PAGE_SCENARIOS,
+    Scenario("version", 5, lambda rng, s: ("/version", {})),
+    Scenario("conditional 304", 10, not_modified),
+    *search_scenarios(10),
+]
+
+
+@dataclass
+class RouteResults:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        if len(latencies) >= 2:
+            q = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p95, p99 = q[49], q[94], q[98]
+        else:
+            p50 = p95 = p99 = latencies[0] if latencies else 0.0
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "rps": len(latencies) / elapsed,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+        }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run(*args: str):
+    subprocess.run(args, check=True, stdout=subprocess.DEVNULL)
+
+
+def start_db(data_dir: str, port: int):
+    """Creates and starts a cluster in `data_dir`, listening only on a unix
+    socket in the same directory."""
+    run("initdb", "-D", data_dir, "-U", USER, "-A", "trust", "--no-sync")
+    run(
+        "pg_ctl",
+        "-D",
+        data_dir,
+        "-w",
+        "-l",
+        os.path.join(data_dir, "postgres.log"),
+        "-o",
+        f"-p {port} -k {data_dir} -c listen_addresses='' -c fsync=off",
+        "start",
+    )
+
+
+def restore_dump(data_dir: str, port: int, migrations: bool = True):
+    """Restores the dump, then applies the scripts in `MIGRATIONS_DIR` that
+    postdate it unless `migrations` is False."""
+    run("createdb", "-h", data_dir, "-p", str(port), "-U", USER, DBNAME)
+    run(
+        "pg_restore",
+        "--no-owner",
+        "--single-transaction",
+        "-h",
+        data_dir,
+        "-p",
+        str(port),
+        "-U",
+        USER,
+        "-d",
+        DBNAME,
+        DUMP_PATH,
+    )
+    scripts = sorted(os.listdir(MIGRATIONS_DIR)) if migrations else []
+    for script in scripts:
+        run(
+            "psql",
+            "-h",
+            data_dir,
+            "-p",
+            str(port),
+            "-U",
+            USER,
+            "-d",
+            DBNAME,
+            "-v",
+            "ON_ERROR_STOP=1",
+            "-f",
+            os.path.join(MIGRATIONS_DIR, script),
+        )
+    run(
+        "psql",
+        "-h",
+        data_dir,
+        "-p",
+        str(port),
+        "-U",
+        USER,
+        "-d",
+        DBNAME,
+        "-c",
+        "ANALYZE",
+    )
+
+
+def stop_db(data_dir: str):
+    run("pg_ctl", "-D", data_dir, "-m", "fast", "-w", "stop")
+
+
+def app_env(data_dir: str, port: int) -> dict[str, str]:
+    return os.environ | {
+        "PYTHON_DOTENV_DISABLED": "1",
+        "PG_HOST": data_dir,
+        "PG_PORT": str(port),
+        "PG_DBNAME": DBNAME,
+        "PG_USER": USER,
+        # ignored with trust auth, but must be non-empty in the conninfo string
+        "PG_PASSWORD": USER,
+        "PG_SSLMODE": "disable",
+    }
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/version")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError("API did not start")
+        await asyncio.sleep(0.5)
+
+
+async def sample(conninfo: str) -> Samples:
+    async with await psycopg.AsyncConnection.connect(conninfo) as con:
+        editions = await (
+            await con.execute("SELECT id FROM editions WHERE award = 'oscar'")
+        ).fetchall()
+        entities = await (
+            await con.execute("SELECT id, imdb_id, name FROM entities")
+        ).fetchall()
+        titles = await (
+            await con.execute("SELECT id, imdb_id, title FROM titles")
+        ).fetchall()
+
+    words = [
+        word
+        for _, _, name in entities + titles
+        for word in name.split()[:1]
+        if len(word) >= 3
+    ]
+    return Samples(
+        editions=[e for (e,) in editions],
+        entities=[e for e, _, _ in entities],
+        titles=[t for t, _, _ in titles],
+        imdb_ids=[i for _, i, _ in entities + titles],
+        words=words,
+    )
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    samples: Samples,
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> tuple[dict[str, RouteResults], float]:
+    results = {s.name: RouteResults() for s in SCENARIOS}
+    weights = [s.weight for s in SCENARIOS]
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(rng: random.Random):
+        while time.perf_counter() < deadline:
+            (scenario,) = rng.choices(SCENARIOS, weights)
+            path, headers = scenario.request(rng, samples)
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, headers=headers)
+                ok = response.status_code in (200, 304)
+                if "etag" in response.headers:
+                    samples.etags[path] = response.headers["etag"]
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                results[scenario.name].latencies.append(
+                    (time.perf_counter() - start) * 1000
+                )
+            else:
+                results[scenario.name].errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[client_loop(random.Random(seed + i)) for i in range(concurrency)]
+    )
+    return results, time.perf_counter() - start
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=BACKEND_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(routes: dict[str, dict], baseline: dict[str, dict] | None):
+    header = f"{'scenario':<32}{'req':>8}{'err':>6}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    if baseline:
+        header += f"{'Δp50':>9}{'Δp95':>9}{'Δrps':>9}"
+    print(header)
+    for name, r in routes.items():
+        line = (
+            f"{name:<32}{r['requests']:>8}{r['errors']:>6}{r['rps']:>9.1f}"
+            f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+        )
+        if baseline and name in baseline:
+            b = baseline[name]
+            deltas = [
+                (r[k] - b[k]) / b[k] * 100 if b[k] else 0.0
+                for k in ("p50_ms", "p95_ms", "rps")
+            ]
+            line += "".join(f"{d:>+8.0f}%" for d in deltas)
+        print(line)
+
+
+async def serve_and_replay(
+    args: argparse.Namespace, data_dir: str, db_port: int
+) -> tuple[dict[str, RouteResults], float]:
+    api_port = free_port()
+    env = app_env(data_dir, db_port)
+    app = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "api.main:app",
+            "--port",
+            str(api_port),
+            "--workers",
+            str(args.workers),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        # with CANONICAL_REDIRECTS=1, latencies include the redirect
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{api_port}",
+            limits=limits,
+            timeout=30,
+            follow_redirects=True,
+        ) as client:
+            await wait_until_ready(client)
+            conninfo = f"host={data_dir} port={db_port} dbname={DBNAME} user={USER}"
+            samples = await sample(conninfo)
+
+            if args.warmup > 0:
+                print(f"Warming up for {args.warmup}s...")
+                await replay(client, samples, args.concurrency, args.warmup, args.seed)
+            print(f"Replaying traffic for {args.duration}s...")
+            results, elapsed = await replay(
+                client, samples, args.concurrency, args.duration, args.seed
+            )
+    finally:
+        app.terminate()
+        app.wait()
+    return results, elapsed
+
+
+async def bench(args: argparse.Namespace, data_dir: str) -> dict:
+    db_port = free_port()
+    start_db(data_dir, db_port)
+    try:
+        print("Restoring db dump...")
+        restore_dump(data_dir, db_port, not args.no_migrations)
+        results, elapsed = await serve_and_replay(args, data_dir, db_port)
+    finally:
+        stop_db(data_dir)
+
+    total = RouteResults(
+        latencies=[l for r in results.values() for l in r.latencies],
+        errors=sum(r.errors for r in results.values()),
+    )
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "workers": args.workers,
+            "seed": args.seed,
+            "migrations": not args.no_migrations,
+            "columnar": os.getenv("COLUMNAR") == "1",
+        },
+        "total": total.summary(elapsed),
+        "routes": {
+            name: r.summary(elapsed)
+            for name, r in results.items()
+            if r.latencies or r.errors
+        },
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="defaults to load-<commit>.json")
+    parser.add_argument("--compare", help="results JSON of a previous run")
+    parser.add_argument(
+        "--no-migrations",
+        action="store_true",
+        help="benchmark the dump without db/migrations applied",
+    )
+
+    args = parser.parse_args()
+    if args.concurrency <= 0 or args.workers <= 0:
+        raise ValueError("concurrency and workers must be >= 1")
+    if args.duration <= 0:
+        raise ValueError("duration must be > 0")
+    for binary in ("initdb", "pg_ctl", "pg_restore", "createdb", "psql"):
+        if shutil.which(binary) is None:
+            raise RuntimeError(f"{binary} not found on PATH")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    # unix socket paths are limited to ~100 chars, so keep the directory short
+    with tempfile.TemporaryDirectory(prefix="oscy-load-") as data_dir:
+        results = await bench(args, data_dir)
+
+    print()
+    report(
+        results["routes"] | {"total": results["total"]},
+        baseline and baseline["routes"] | {"total": baseline["total"]},
+    )
+
+    output = args.output or f"load-{results['commit'] or 'unknown'}.json"
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved results to {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,14 @@
+-- Indexes on the entity and title ids of `nominees_entities` and
+-- `nominees_titles`, which the update pipeline looks up when it deletes entities
+-- and titles no longer credited on any nominee (and which the foreign keys to
+-- `entities` and `titles` check on every such delete). (nominee_id, entity_id)
+-- and (nominee_id, title_id) are already indexed by their UNIQUE constraints.
+-- Recreated by 003_partition_by_award.sql when it partitions these tables. Safe
+-- to run more than once; already included in schema.sql for new databases.
+--
+-- Usage:
+--     psql -U <username> -d oscy -f backend/db/migrations/001_nomination_indexes.sql
+
+CREATE INDEX IF NOT EXISTS nominees_entities_entity_idx ON nominees_entities (entity_id);
+
+CREATE INDEX IF NOT EXISTS nominees_titles_title_idx ON nominees_titles (title_id);
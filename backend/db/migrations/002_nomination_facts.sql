@@ -0,0 +1,38 @@
+-- Adds `nomination_facts`, a flat copy of the nominee joins with one row per
+-- nominee, title and entity, which the API reads instead of joining the
+-- normalized tables. `refresh_nomination_facts` and the initial fill are in the
+-- last migration, so that re-running this one never replaces them. Safe to run
+-- more than once; already included in schema.sql for new databases.
+--
+-- Usage:
+--     psql -U <username> -d oscy -f backend/db/migrations/002_nomination_facts.sql
+
+CREATE TABLE IF NOT EXISTS
+    nomination_facts (
+        id serial PRIMARY KEY,
+        nominee_id integer NOT NULL REFERENCES nominees (id) ON DELETE CASCADE,
+        award award_type NOT NULL,
+        edition_id integer NOT NULL,
+        iteration integer NOT NULL,
+        category_name_id integer NOT NULL,
+        category_id integer NOT NULL,
+        category_group_id integer, -- NULL if the category has no group
+        title_id integer, -- NULL if the nominee has no titles
+        title_ord integer NOT NULL, -- position of title_id among the nominee's titles
+        title_winner boolean, -- nominees_titles.winner
+        entity_id integer, -- NULL if the nominee has no entities
+        entity_ord integer NOT NULL, -- position of entity_id among the nominee's entities
+        is_person boolean NOT NULL,
+        pending boolean NOT NULL,
+        winner boolean NOT NULL,
+        official boolean NOT NULL,
+        stat boolean NOT NULL
+    );
+
+CREATE INDEX IF NOT EXISTS nomination_facts_nominee_idx ON nomination_facts (nominee_id);
+
+CREATE INDEX IF NOT EXISTS nomination_facts_edition_idx ON nomination_facts (iteration, category_id);
+
+CREATE INDEX IF NOT EXISTS nomination_facts_entity_idx ON nomination_facts (entity_id) INCLUDE (nominee_id, category_id, category_group_id, iteration, winner, stat) WHERE title_ord = 1;
+
+CREATE INDEX IF NOT EXISTS nomination_facts_title_idx ON nomination_facts (title_id) INCLUDE (nominee_id, category_id, category_group_id, iteration, title_winner, stat) WHERE entity_ord = 1;
@@ -0,0 +1,149 @@
+-- Converts `nominees`, `nominees_titles`, `nominees_entities` and
+-- `nomination_facts` to tables partitioned by award, adding the nominee's award
+-- to `nominees_titles` and `nominees_entities`. Rows and ids are kept;
+-- `nomination_facts` is refilled, with `refresh_nomination_facts` joining on
+-- award, by 004_data_versions.sql. Does nothing if `nominees` is already
+-- partitioned; already included in schema.sql for new databases.
+--
+-- Usage:
+--     psql -U <username> -d oscy -f backend/db/migrations/003_partition_by_award.sql
+
+DO $migrate$
+DECLARE
+    tbl text;
+    seq text;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'nominees'::regclass) = 'p' THEN
+        RAISE NOTICE 'nominees is already partitioned, skipping';
+        RETURN;
+    END IF;
+
+    -- id sequences may predate a table rename (ex. `nominee_entities_id_seq` in
+    -- data/db.dump); give them the names used below
+    FOREACH tbl IN ARRAY ARRAY['nominees', 'nominees_titles', 'nominees_entities'] LOOP
+        seq := pg_get_serial_sequence(tbl, 'id');
+        IF seq::regclass IS DISTINCT FROM to_regclass(tbl || '_id_seq') THEN
+            EXECUTE format('ALTER SEQUENCE %s RENAME TO %I', seq, tbl || '_id_seq');
+        END IF;
+    END LOOP;
+
+    CREATE TEMP TABLE nominees_copy AS
+    SELECT * FROM nominees;
+
+    CREATE TEMP TABLE nominees_titles_copy AS
+    SELECT nt.id, n.award, nt.nominee_id, nt.title_id, nt.detail, nt.winner
+    FROM nominees_titles nt
+    JOIN nominees n ON n.id = nt.nominee_id;
+
+    CREATE TEMP TABLE nominees_entities_copy AS
+    SELECT ne.id, n.award, ne.nominee_id, ne.entity_id, ne.name, ne.statement_ind, ne.role
+    FROM nominees_entities ne
+    JOIN nominees n ON n.id = ne.nominee_id;
+
+    -- keep the id sequences, which would otherwise be dropped with their tables
+    ALTER SEQUENCE nominees_id_seq OWNED BY NONE;
+    ALTER SEQUENCE nominees_titles_id_seq OWNED BY NONE;
+    ALTER SEQUENCE nominees_entities_id_seq OWNED BY NONE;
+
+    -- `nomination_facts` is recreated empty, and refilled by the last migration
+    DROP TABLE nomination_facts, nominees_titles, nominees_entities, nominees;
+
+    -- same as schema.sql, with the existing sequences in place of `serial`
+    CREATE TABLE nominees (
+        id integer NOT NULL DEFAULT nextval('nominees_id_seq'),
+        award award_type NOT NULL,
+        edition_id integer NOT NULL REFERENCES editions (id),
+        category_name_id integer NOT NULL REFERENCES category_names (id),
+        statement text NOT NULL,
+        is_person boolean NOT NULL,
+        pending boolean NOT NULL DEFAULT FALSE,
+        winner boolean NOT NULL,
+        note text NOT NULL,
+        official boolean NOT NULL,
+        stat boolean NOT NULL,
+        PRIMARY KEY (id, award)
+    ) PARTITION BY LIST (award);
+
+    CREATE TABLE nominees_oscar PARTITION OF nominees FOR VALUES IN ('oscar');
+    CREATE TABLE nominees_emmy PARTITION OF nominees FOR VALUES IN ('emmy');
+
+    CREATE TABLE nominees_titles (
+        id integer NOT NULL DEFAULT nextval('nominees_titles_id_seq'),
+        award award_type NOT NULL,
+        nominee_id integer NOT NULL,
+        title_id integer NOT NULL REFERENCES titles (id),
+        detail text[] NOT NULL,
+        winner boolean NOT NULL,
+        PRIMARY KEY (id, award),
+        UNIQUE (nominee_id, title_id, award),
+        FOREIGN KEY (nominee_id, award) REFERENCES nominees (id, award)
+    ) PARTITION BY LIST (award);
+
+    CREATE TABLE nominees_titles_oscar PARTITION OF nominees_titles FOR VALUES IN ('oscar');
+    CREATE TABLE nominees_titles_emmy PARTITION OF nominees_titles FOR VALUES IN ('emmy');
+
+    CREATE TABLE nominees_entities (
+        id integer NOT NULL DEFAULT nextval('nominees_entities_id_seq'),
+        award award_type NOT NULL,
+        nominee_id integer NOT NULL,
+        entity_id integer NOT NULL REFERENCES entities (id),
+        name text NOT NULL,
+        statement_ind integer NOT NULL,
+        role text NOT NULL,
+        PRIMARY KEY (id, award),
+        UNIQUE (nominee_id, entity_id, award),
+        FOREIGN KEY (nominee_id, award) REFERENCES nominees (id, award)
+    ) PARTITION BY LIST (award);
+
+    CREATE TABLE nominees_entities_oscar PARTITION OF nominees_entities FOR VALUES IN ('oscar');
+    CREATE TABLE nominees_entities_emmy PARTITION OF nominees_entities FOR VALUES IN ('emmy');
+
+    CREATE TABLE nomination_facts (
+        id serial,
+        nominee_id integer NOT NULL,
+        award award_type NOT NULL,
+        edition_id integer NOT NULL,
+        iteration integer NOT NULL,
+        category_name_id integer NOT NULL,
+        category_id integer NOT NULL,
+        category_group_id integer,
+        title_id integer,
+        title_ord integer NOT NULL,
+        title_winner boolean,
+        entity_id integer,
+        entity_ord integer NOT NULL,
+        is_person boolean NOT NULL,
+        pending boolean NOT NULL,
+        winner boolean NOT NULL,
+        official boolean NOT NULL,
+        stat boolean NOT NULL,
+        PRIMARY KEY (id, award),
+        FOREIGN KEY (nominee_id, award) REFERENCES nominees (id, award) ON DELETE CASCADE
+    ) PARTITION BY LIST (award);
+
+    CREATE TABLE nomination_facts_oscar PARTITION OF nomination_facts FOR VALUES IN ('oscar');
+    CREATE TABLE nomination_facts_emmy PARTITION OF nomination_facts FOR VALUES IN ('emmy');
+
+    ALTER SEQUENCE nominees_id_seq OWNED BY nominees.id;
+    ALTER SEQUENCE nominees_titles_id_seq OWNED BY nominees_titles.id;
+    ALTER SEQUENCE nominees_entities_id_seq OWNED BY nominees_entities.id;
+
+    INSERT INTO nominees SELECT * FROM nominees_copy;
+    INSERT INTO nominees_titles SELECT * FROM nominees_titles_copy;
+    INSERT INTO nominees_entities SELECT * FROM nominees_entities_copy;
+
+    DROP TABLE nominees_copy, nominees_titles_copy, nominees_entities_copy;
+
+    -- indexes of 002_nomination_facts.sql, created on each partition
+    CREATE INDEX nomination_facts_nominee_idx ON nomination_facts (nominee_id);
+    CREATE INDEX nomination_facts_edition_idx ON nomination_facts (iteration, category_id);
+    CREATE INDEX nomination_facts_entity_idx ON nomination_facts (entity_id) INCLUDE (nominee_id, category_id, category_group_id, iteration, winner, stat) WHERE title_ord = 1;
+    CREATE INDEX nomination_facts_title_idx ON nomination_facts (title_id) INCLUDE (nominee_id, category_id, category_group_id, iteration, title_winner, stat) WHERE entity_ord = 1;
+
+    -- indexes of 001_nomination_indexes.sql, dropped with the old tables
+    CREATE INDEX nominees_entities_entity_idx ON nominees_entities (entity_id);
+    CREATE INDEX nominees_titles_title_idx ON nominees_titles (title_id);
+
+    ANALYZE nominees, nominees_titles, nominees_entities;
+END
+$migrate$;
@@ -0,0 +1,101 @@
+-- Adds `data_versions`, which tracks a version per edition, entity and title
+-- that changes only when the data shown for that resource does, so that the API
+-- can use it as the resource's ETag instead of the global version tag. Also
+-- defines `refresh_nomination_facts` (only here, as the last migration) and
+-- fills `nomination_facts` if it is empty. Safe to run more than once; already
+-- included in schema.sql for new databases.
+--
+-- Usage:
+--     psql -U <username> -d oscy -f backend/db/migrations/004_data_versions.sql
+
+CREATE TABLE IF NOT EXISTS
+    data_versions (
+        id serial PRIMARY KEY,
+        scope text NOT NULL CHECK (scope IN ('edition', 'entity', 'title')),
+        scope_id integer NOT NULL, -- id of the edition, entity, or title
+        version bigint NOT NULL, -- from data_version_seq; increases whenever the data shown for this resource changes
+        UNIQUE (scope, scope_id)
+    );
+
+CREATE SEQUENCE IF NOT EXISTS data_version_seq;
+
+-- gives a new version to every resource showing nominees `nominee_ids` (or to
+-- every resource, if NULL): the nominees' editions, and the entities and titles
+-- they credit. Other editions of those entities and titles are left alone, so
+-- their ceremony pages stay cached when a recurring nominee is added.
+CREATE
+OR REPLACE FUNCTION bump_data_versions (nominee_ids integer[]) RETURNS void AS $$
+    WITH changed AS (
+        SELECT edition_id, entity_id, title_id
+        FROM nomination_facts
+        WHERE nominee_ids IS NULL OR nominee_id = ANY(nominee_ids)
+    ),
+    resources (scope, scope_id) AS (
+        SELECT 'edition', edition_id FROM changed
+        UNION
+        SELECT 'entity', entity_id FROM changed WHERE entity_id IS NOT NULL
+        UNION
+        SELECT 'title', title_id FROM changed WHERE title_id IS NOT NULL
+    )
+    INSERT INTO data_versions (scope, scope_id, version)
+    SELECT r.scope, r.scope_id, v.version
+    FROM resources r, (SELECT nextval('data_version_seq') AS version) v
+    ON CONFLICT (scope, scope_id)
+    DO UPDATE SET version = EXCLUDED.version;
+$$ LANGUAGE SQL;
+
+-- rebuilds the nomination_facts rows of `nominee_ids` (or of every nominee, if
+-- NULL) from the tables above, bumping the versions of resources that showed
+-- them before or show them after; called by the update pipeline whenever
+-- nominees or their titles or entities change
+CREATE
+OR REPLACE FUNCTION refresh_nomination_facts (nominee_ids integer[]) RETURNS void AS $$
+    SELECT bump_data_versions(nominee_ids);
+
+    DELETE FROM nomination_facts
+    WHERE nominee_ids IS NULL OR nominee_id = ANY(nominee_ids);
+
+    INSERT INTO nomination_facts (nominee_id, award, edition_id, iteration, category_name_id, category_id, category_group_id, title_id, title_ord, title_winner, entity_id, entity_ord, is_person, pending, winner, official, stat)
+    SELECT
+        n.id,
+        n.award,
+        n.edition_id,
+        e.iteration,
+        n.category_name_id,
+        c.id,
+        c.category_group_id,
+        nt.title_id,
+        row_number() OVER (PARTITION BY n.id, ne.entity_id ORDER BY nt.title_id),
+        nt.winner,
+        ne.entity_id,
+        row_number() OVER (PARTITION BY n.id, nt.title_id ORDER BY ne.statement_ind, ne.entity_id),
+        n.is_person,
+        n.pending,
+        n.winner,
+        n.official,
+        n.stat
+    FROM nominees n
+    JOIN editions e ON e.id = n.edition_id
+    JOIN category_names cn ON cn.id = n.category_name_id
+    JOIN categories c ON c.id = cn.category_id
+    LEFT JOIN nominees_titles nt ON nt.nominee_id = n.id AND nt.award = n.award
+    LEFT JOIN nominees_entities ne ON ne.nominee_id = n.id AND ne.award = n.award
+    WHERE nominee_ids IS NULL OR n.id = ANY(nominee_ids);
+
+    SELECT bump_data_versions(nominee_ids);
+$$ LANGUAGE SQL;
+
+-- initial fill of nomination_facts (which also assigns initial versions), only
+-- once; the update pipeline keeps it up to date afterwards
+DO $fill$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM nomination_facts) THEN
+        PERFORM refresh_nomination_facts (NULL);
+        ANALYZE nomination_facts;
+    END IF;
+END
+$fill$;
+
+-- initial versions, unless they were already assigned
+SELECT bump_data_versions (NULL)
+WHERE NOT EXISTS (SELECT 1 FROM data_versions);
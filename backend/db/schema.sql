@@ -78,9 +78,11 @@ CREATE TABLE IF NOT EXISTS
         title text NOT NULL -- name of film or show
     );
 
+-- nominee tables are partitioned by award, so that queries for one award skip
+-- the others' rows; see migrations/003_partition_by_award.sql
 CREATE TABLE IF NOT EXISTS
     nominees (
-        id serial PRIMARY KEY,
+        id serial,
         award award_type NOT NULL,
         edition_id integer NOT NULL REFERENCES editions (id),
         category_name_id integer NOT NULL REFERENCES category_names (id),
@@ -90,30 +92,170 @@ CREATE TABLE IF NOT EXISTS
         winner boolean NOT NULL, -- whether any title in this nominee won
         note text NOT NULL,
         official boolean NOT NULL, -- whether this nominee is considered official (for Oscars)
-        stat boolean NOT NULL -- whether this nominee counts towards aggregated nomination stats
-    );
+        stat boolean NOT NULL, -- whether this nominee counts towards aggregated nomination stats
+        PRIMARY KEY (id, award)
+    )
+PARTITION BY
+    LIST (award);
+
+CREATE TABLE IF NOT EXISTS
+    nominees_oscar PARTITION OF nominees FOR VALUES IN ('oscar');
+
+CREATE TABLE IF NOT EXISTS
+    nominees_emmy PARTITION OF nominees FOR VALUES IN ('emmy');
 
 CREATE TABLE IF NOT EXISTS
     nominees_titles (
-        id serial PRIMARY KEY,
-        nominee_id integer NOT NULL REFERENCES nominees (id),
+        id serial,
+        award award_type NOT NULL, -- award of the nominee
+        nominee_id integer NOT NULL,
         title_id integer NOT NULL REFERENCES titles (id),
         detail text[] NOT NULL, -- characters, song titles, or dance numbers assoc. with this title
         winner boolean NOT NULL, -- whether this particular title won (only important for 3rd oscars)
-        UNIQUE (nominee_id, title_id)
-    );
+        PRIMARY KEY (id, award),
+        UNIQUE (nominee_id, title_id, award),
+        FOREIGN KEY (nominee_id, award) REFERENCES nominees (id, award)
+    )
+PARTITION BY
+    LIST (award);
+
+CREATE TABLE IF NOT EXISTS
+    nominees_titles_oscar PARTITION OF nominees_titles FOR VALUES IN ('oscar');
+
+CREATE TABLE IF NOT EXISTS
+    nominees_titles_emmy PARTITION OF nominees_titles FOR VALUES IN ('emmy');
 
 CREATE TABLE IF NOT EXISTS
     nominees_entities (
-        id serial PRIMARY KEY,
-        nominee_id integer NOT NULL REFERENCES nominees (id),
+        id serial,
+        award award_type NOT NULL, -- award of the nominee
+        nominee_id integer NOT NULL,
         entity_id integer NOT NULL REFERENCES entities (id),
         name text NOT NULL, -- name listed on this nomination (could be alias)
         statement_ind integer NOT NULL, -- start index of name in nomination statement
         role text NOT NULL, -- entity's role on set (if applicable)
-        UNIQUE (nominee_id, entity_id)
+        PRIMARY KEY (id, award),
+        UNIQUE (nominee_id, entity_id, award),
+        FOREIGN KEY (nominee_id, award) REFERENCES nominees (id, award)
+    )
+PARTITION BY
+    LIST (award);
+
+CREATE TABLE IF NOT EXISTS
+    nominees_entities_oscar PARTITION OF nominees_entities FOR VALUES IN ('oscar');
+
+CREATE TABLE IF NOT EXISTS
+    nominees_entities_emmy PARTITION OF nominees_entities FOR VALUES IN ('emmy');
+
+CREATE TABLE IF NOT EXISTS
+    nomination_facts (
+        id serial,
+        nominee_id integer NOT NULL,
+        award award_type NOT NULL,
+        edition_id integer NOT NULL,
+        iteration integer NOT NULL,
+        category_name_id integer NOT NULL,
+        category_id integer NOT NULL,
+        category_group_id integer, -- NULL if the category has no group
+        title_id integer, -- NULL if the nominee has no titles
+        title_ord integer NOT NULL, -- position of title_id among the nominee's titles
+        title_winner boolean, -- nominees_titles.winner
+        entity_id integer, -- NULL if the nominee has no entities
+        entity_ord integer NOT NULL, -- position of entity_id among the nominee's entities
+        is_person boolean NOT NULL,
+        pending boolean NOT NULL,
+        winner boolean NOT NULL,
+        official boolean NOT NULL,
+        stat boolean NOT NULL,
+        PRIMARY KEY (id, award),
+        FOREIGN KEY (nominee_id, award) REFERENCES nominees (id, award) ON DELETE CASCADE
+    )
+PARTITION BY
+    LIST (award);
+
+CREATE TABLE IF NOT EXISTS
+    nomination_facts_oscar PARTITION OF nomination_facts FOR VALUES IN ('oscar');
+
+CREATE TABLE IF NOT EXISTS
+    nomination_facts_emmy PARTITION OF nomination_facts FOR VALUES IN ('emmy');
+
+CREATE TABLE IF NOT EXISTS
+    data_versions (
+        id serial PRIMARY KEY,
+        scope text NOT NULL CHECK (scope IN ('edition', 'entity', 'title')),
+        scope_id integer NOT NULL, -- id of the edition, entity, or title
+        version bigint NOT NULL, -- from data_version_seq; increases whenever the data shown for this resource changes
+        UNIQUE (scope, scope_id)
     );
 
+CREATE SEQUENCE IF NOT EXISTS data_version_seq;
+
+-- gives a new version to every resource showing nominees `nominee_ids` (or to
+-- every resource, if NULL): the nominees' editions, and the entities and titles
+-- they credit. Other editions of those entities and titles are left alone, so
+-- their ceremony pages stay cached when a recurring nominee is added.
+CREATE
+OR REPLACE FUNCTION bump_data_versions (nominee_ids integer[]) RETURNS void AS $$
+    WITH changed AS (
+        SELECT edition_id, entity_id, title_id
+        FROM nomination_facts
+        WHERE nominee_ids IS NULL OR nominee_id = ANY(nominee_ids)
+    ),
+    resources (scope, scope_id) AS (
+        SELECT 'edition', edition_id FROM changed
+        UNION
+        SELECT 'entity', entity_id FROM changed WHERE entity_id IS NOT NULL
+        UNION
+        SELECT 'title', title_id FROM changed WHERE title_id IS NOT NULL
+    )
+    INSERT INTO data_versions (scope, scope_id, version)
+    SELECT r.scope, r.scope_id, v.version
+    FROM resources r, (SELECT nextval('data_version_seq') AS version) v
+    ON CONFLICT (scope, scope_id)
+    DO UPDATE SET version = EXCLUDED.version;
+$$ LANGUAGE SQL;
+
+-- rebuilds the nomination_facts rows of `nominee_ids` (or of every nominee, if
+-- NULL) from the tables above, bumping the versions of resources that showed
+-- them before or show them after; called by the update pipeline whenever
+-- nominees or their titles or entities change
+CREATE
+OR REPLACE FUNCTION refresh_nomination_facts (nominee_ids integer[]) RETURNS void AS $$
+    SELECT bump_data_versions(nominee_ids);
+
+    DELETE FROM nomination_facts
+    WHERE nominee_ids IS NULL OR nominee_id = ANY(nominee_ids);
+
+    INSERT INTO nomination_facts (nominee_id, award, edition_id, iteration, category_name_id, category_id, category_group_id, title_id, title_ord, title_winner, entity_id, entity_ord, is_person, pending, winner, official, stat)
+    SELECT
+        n.id,
+        n.award,
+        n.edition_id,
+        e.iteration,
+        n.category_name_id,
+        c.id,
+        c.category_group_id,
+        nt.title_id,
+        row_number() OVER (PARTITION BY n.id, ne.entity_id ORDER BY nt.title_id),
+        nt.winner,
+        ne.entity_id,
+        row_number() OVER (PARTITION BY n.id, nt.title_id ORDER BY ne.statement_ind, ne.entity_id),
+        n.is_person,
+        n.pending,
+        n.winner,
+        n.official,
+        n.stat
+    FROM nominees n
+    JOIN editions e ON e.id = n.edition_id
+    JOIN category_names cn ON cn.id = n.category_name_id
+    JOIN categories c ON c.id = cn.category_id
+    LEFT JOIN nominees_titles nt ON nt.nominee_id = n.id AND nt.award = n.award
+    LEFT JOIN nominees_entities ne ON ne.nominee_id = n.id AND ne.award = n.award
+    WHERE nominee_ids IS NULL OR n.id = ANY(nominee_ids);
+
+    SELECT bump_data_versions(nominee_ids);
+$$ LANGUAGE SQL;
+
 CREATE TABLE IF NOT EXISTS
     current_versions (
         id serial PRIMARY KEY,
@@ -126,4 +268,20 @@ CREATE TABLE IF NOT EXISTS
 
 CREATE INDEX title_trgm_idx ON titles USING GIST (title gist_trgm_ops);
 
-CREATE INDEX entity_trgm_idx ON entities USING GIST (name gist_trgm_ops);
\ No newline at end of file
+CREATE INDEX entity_trgm_idx ON entities USING GIST (name gist_trgm_ops);
+
+-- indexes on partitioned tables are created on each of their partitions; see
+-- migrations/002_nomination_facts.sql and migrations/003_partition_by_award.sql
+CREATE INDEX nomination_facts_nominee_idx ON nomination_facts (nominee_id);
+
+CREATE INDEX nomination_facts_edition_idx ON nomination_facts (iteration, category_id);
+
+CREATE INDEX nomination_facts_entity_idx ON nomination_facts (entity_id) INCLUDE (nominee_id, category_id, category_group_id, iteration, winner, stat) WHERE title_ord = 1;
+
+CREATE INDEX nomination_facts_title_idx ON nomination_facts (title_id) INCLUDE (nominee_id, category_id, category_group_id, iteration, title_winner, stat) WHERE entity_ord = 1;
+
+-- entities and titles still credited on a nominee; see
+-- migrations/001_nomination_indexes.sql
+CREATE INDEX nominees_entities_entity_idx ON nominees_entities (entity_id);
+
+CREATE INDEX nominees_titles_title_idx ON nominees_titles (title_id);
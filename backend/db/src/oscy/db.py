@@ -390,18 +390,107 @@ def imdb_id_to_entity_type(imdb_id: str) -> str:
         raise ValueError("IMDb id is invalid:", imdb_id)
 
 
+@transaction
+def refresh_nomination_facts(nominee_ids: list[int] | None = None):
+    """Rebuilds the `nomination_facts` rows of the specified nominees.
+
+    Must be called after any change to a nominee or its titles or entities, so
+    that the API, which reads from `nomination_facts`, sees the change. Also
+    bumps the versions of the resources showing these nominees. Tables
+    impacted: `nomination_facts`, `data_versions`.
+
+    Args:
+        nominee_ids (list[int] | None, optional): db ids of nominees to
+            refresh; if None, refreshes all nominees. Defaults to None.
+    """
+    with conn().cursor() as cur:
+        cur.execute(
+            "SELECT refresh_nomination_facts(%s::integer[])",
+            (nominee_ids,),
+        )
+
+
+@transaction
+def bump_data_versions(nominee_ids: list[int]):
+    """Gives a new version to every resource showing the specified nominees.
+
+    `refresh_nomination_facts` already does this; only needed before deleting
+    nominees, whose `nomination_facts` rows are deleted along with them. Tables
+    impacted: `data_versions`.
+
+    Args:
+        nominee_ids (list[int]): db ids of nominees
+    """
+    with conn().cursor() as cur:
+        cur.execute(
+            "SELECT bump_data_versions(%s::integer[])",
+            (nominee_ids,),
+        )
+
+
+@transaction
+def bump_renamed_data_versions(
+    titles: list[tuple[str, str]], entities: list[tuple[str, str]]
+):
+    """Gives a new version to every resource showing the titles or entities
+    about to be renamed by an upsert.
+
+    A title or entity name is shown by every nomination crediting it, not only
+    by the nominees being upserted, so this bumps the editions, titles, and
+    entities of all of those nominations. Must be called before the upsert.
+    Tables impacted: `data_versions`.
+
+    Args:
+        titles (list[tuple[str, str]]): (IMDb id, new title) of upserted titles
+        entities (list[tuple[str, str]]): (IMDb id, new name) of upserted
+            entities
+    """
+    with conn().cursor() as cur:
+        cur.execute(
+            """
+            SELECT nf.nominee_id
+            FROM titles t
+            JOIN unnest(%s::text[], %s::text[]) AS r(imdb_id, title)
+                ON r.imdb_id = t.imdb_id AND r.title <> t.title
+            JOIN nomination_facts nf ON nf.title_id = t.id
+            UNION
+            SELECT nf.nominee_id
+            FROM entities en
+            JOIN unnest(%s::text[], %s::text[]) AS r(imdb_id, name)
+                ON r.imdb_id = en.imdb_id AND r.name <> en.name
+            JOIN nomination_facts nf ON nf.entity_id = en.id
+            """,
+            (
+                [t[0] for t in titles],
+                [t[1] for t in titles],
+                [en[0] for en in entities],
+                [en[1] for en in entities],
+            ),
+        )
+        nominee_ids = [r[0] for r in cur.fetchall()]
+
+    if nominee_ids:
+        bump_data_versions(nominee_ids)
+
+
 @transaction
 def insert_nominees(matched_nominees: list[MatchedNominee]):
     """Inserts matched nominees to db.
 
     Tables impacted: `nominees`, `titles`, `nominees_titles`, `entities`,
-    `nominees_entities`.
+    `nominees_entities`, `nomination_facts`, `data_versions`.
 
     Args:
         matched_nominees (list[MatchedNominee]): matched nominees to insert
     """
     # flatten to list of MatchedNominee dicts across all editions
     nominees = [dataclasses.asdict(n) for n in matched_nominees]
+    nominee_ids: list[int] = []
+
+    bump_renamed_data_versions(
+        [(t[1], t[0]) for n in nominees for t in n["films"]],
+        [(p[1], p[0]) for n in nominees for p in n["people"]],
+    )
 
     with conn().cursor() as cur:
         for nominee in tqdm(nominees):
@@ -430,6 +519,7 @@ def insert_nominees(matched_nominees: list[MatchedNominee]):
                 nominee,
             )
             nominee_id = cur.fetchone()[0]  # type: ignore
+            nominee_ids.append(nominee_id)
 
             # films: list[tuple[str, str, bool, list[str]]]
             # title, imdb id, winner, detail (song titles or dance numbers
@@ -450,8 +540,8 @@ def insert_nominees(matched_nominees: list[MatchedNominee]):
                         DO UPDATE SET title = EXCLUDED.title
                         RETURNING id                        
                     )
-                    INSERT INTO nominees_titles (nominee_id, title_id, detail, winner)
-                    SELECT %(nominee_id)s, ins.id, %(detail)s, %(winner)s
+                    INSERT INTO nominees_titles (award, nominee_id, title_id, detail, winner)
+                    SELECT 'oscar', %(nominee_id)s, ins.id, %(detail)s, %(winner)s
                     FROM ins;
                     """,
                     [
@@ -477,8 +567,8 @@ def insert_nominees(matched_nominees: list[MatchedNominee]):
                         DO UPDATE SET name = EXCLUDED.name
                         RETURNING id                        
                     )
-                    INSERT INTO nominees_entities (nominee_id, entity_id, name, statement_ind, role)
-                    SELECT %(nominee_id)s, ins.id, %(name)s, %(statement_ind)s, ''
+                    INSERT INTO nominees_entities (award, nominee_id, entity_id, name, statement_ind, role)
+                    SELECT 'oscar', %(nominee_id)s, ins.id, %(name)s, %(statement_ind)s, ''
                     FROM ins;
                     """,
                     [
@@ -493,6 +583,8 @@ def insert_nominees(matched_nominees: list[MatchedNominee]):
                     ],
                 )
 
+    refresh_nomination_facts(nominee_ids)
+
 
 @transaction
 def upsert_nominee_title(
@@ -501,7 +593,8 @@ def upsert_nominee_title(
     """Upserts nominee title to db.
 
     Upserts title, then uses returned id to upsert entry in associative table.
-    Tables impacted: `titles`, `nominees_titles`.
+    Tables impacted: `titles`, `nominees_titles`, `nomination_facts`,
+    `data_versions`.
 
     Args:
         nominee_id (int): db nominee id
@@ -511,6 +604,8 @@ def upsert_nominee_title(
         detail (list[str]): characters, song titles, dance numbers associated
             with the nominee's title
     """
+    bump_renamed_data_versions([(imdb_id, title)], [])
+
     with conn().cursor() as cur:
         cur.execute(
             """
@@ -521,10 +616,10 @@ def upsert_nominee_title(
                 DO UPDATE SET title = EXCLUDED.title
                 RETURNING id
             )
-            INSERT INTO nominees_titles (nominee_id, title_id, detail, winner)
-            SELECT %(nominee_id)s, ins.id, %(detail)s, %(winner)s
+            INSERT INTO nominees_titles (award, nominee_id, title_id, detail, winner)
+            SELECT 'oscar', %(nominee_id)s, ins.id, %(detail)s, %(winner)s
             FROM ins
-            ON CONFLICT (nominee_id, title_id)
+            ON CONFLICT (nominee_id, title_id, award)
             DO UPDATE SET
                 detail = EXCLUDED.detail,
                 winner = EXCLUDED.winner
@@ -538,13 +633,16 @@ def upsert_nominee_title(
             },
         )
 
+    refresh_nomination_facts([nominee_id])
+
 
 @transaction
 def delete_nominee_title(nominee_id: int, imdb_id: str):
     """Deletes from `nominees_titles` and potentially `titles`.
 
     Deletes entry from associative table, then deletes title if it has no more
-    entries in associative table. Tables impacted: `nominees_titles`, `titles`.
+    entries in associative table. Tables impacted: `nominees_titles`, `titles`,
+    `nomination_facts`.
 
     Args:
         nominee_id (int): db nominee id
@@ -564,7 +662,7 @@ def delete_nominee_title(nominee_id: int, imdb_id: str):
         cur.execute(
             """
             DELETE FROM nominees_titles
-            WHERE nominee_id = %s AND title_id = %s
+            WHERE award = 'oscar' AND nominee_id = %s AND title_id = %s
             """,
             (nominee_id, title_id),
         )
@@ -585,6 +683,8 @@ def delete_nominee_title(nominee_id: int, imdb_id: str):
         if deleted_titles:
             print(f"Deleted {len(deleted_titles)} titles from db: {deleted_titles}")
 
+    refresh_nomination_facts([nominee_id])
+
 
 @transaction
 def upsert_nominee_entity(
@@ -593,7 +693,8 @@ def upsert_nominee_entity(
     """Upserts nominee entity to db.
 
     Upserts entity, then uses returned id to upsert entry in associative table.
-    Tables impacted: `entities`, `nominees_entities`.
+    Tables impacted: `entities`, `nominees_entities`, `nomination_facts`,
+    `data_versions`.
 
     Args:
         nominee_id (int): db nominee id
@@ -602,6 +703,8 @@ def upsert_nominee_entity(
         statement_ind (str): start index of name in nomination statement
         role (str): entity's role on set (does not apply to Oscars)
     """
+    bump_renamed_data_versions([], [(imdb_id, name)])
+
     with conn().cursor() as cur:
         cur.execute(
             """
@@ -612,10 +715,10 @@ def upsert_nominee_entity(
                 DO UPDATE SET name = EXCLUDED.name
                 RETURNING id
             )
-            INSERT INTO nominees_entities (nominee_id, entity_id, name, statement_ind, role)
-            SELECT %(nominee_id)s, ins.id, %(name)s, %(statement_ind)s, %(role)s
+            INSERT INTO nominees_entities (award, nominee_id, entity_id, name, statement_ind, role)
+            SELECT 'oscar', %(nominee_id)s, ins.id, %(name)s, %(statement_ind)s, %(role)s
             FROM ins
-            ON CONFLICT (nominee_id, entity_id)
+            ON CONFLICT (nominee_id, entity_id, award)
             DO UPDATE SET
                 name = EXCLUDED.name,
                 statement_ind = EXCLUDED.statement_ind,
@@ -631,6 +734,8 @@ def upsert_nominee_entity(
             },
         )
 
+    refresh_nomination_facts([nominee_id])
+
 
 @transaction
 def delete_nominee_entity(nominee_id: int, imdb_id: str):
@@ -638,7 +743,7 @@ def delete_nominee_entity(nominee_id: int, imdb_id: str):
 
     Deletes entry from associative table, then deletes entity if it has no more
     entries in associative table. Tables impacted: `nominees_entities`,
-    `entities`.
+    `entities`, `nomination_facts`.
 
     Args:
         nominee_id (int): db nominee id
@@ -658,7 +763,7 @@ def delete_nominee_entity(nominee_id: int, imdb_id: str):
         cur.execute(
             """
             DELETE FROM nominees_entities
-            WHERE nominee_id = %s AND entity_id = %s
+            WHERE award = 'oscar' AND nominee_id = %s AND entity_id = %s
             """,
             (nominee_id, entity_id),
         )
@@ -681,12 +786,14 @@ def delete_nominee_entity(nominee_id: int, imdb_id: str):
                 f"Deleted {len(deleted_entities)} entities from db: {deleted_entities}"
             )
 
+    refresh_nomination_facts([nominee_id])
+
 
 @transaction
 def update_nominee(nominee_id: int, matched_nominee: MatchedNominee):
     """Updates existing entry in `nominees` based on `matched_nominee` data.
 
-    Tables impacted: `nominees`.
+    Tables impacted: `nominees`, `nomination_facts`.
 
     Args:
         nominee_id (int): db nominee id
@@ -710,17 +817,19 @@ def update_nominee(nominee_id: int, matched_nominee: MatchedNominee):
                 official = %(official)s,
                 stat = %(stat)s
             FROM category_names
-            WHERE nominees.id = %(id)s AND LOWER(category_names.official_name) = %(category_name)s
+            WHERE nominees.award = 'oscar' AND nominees.id = %(id)s AND LOWER(category_names.official_name) = %(category_name)s
             """,
             nominee,
         )
 
+    refresh_nomination_facts([nominee_id])
+
 
 @transaction
 def update_nominees_pending_false(edition: int):
     """Sets `pending=FALSE` for all nominees in specified `edition`.
 
-    Tables impacted: `nominees`.
+    Tables impacted: `nominees`, `nomination_facts`.
 
     Args:
         edition (int): edition of Oscars ceremony
@@ -732,9 +841,13 @@ def update_nominees_pending_false(edition: int):
             SET pending = FALSE
             FROM editions
             WHERE nominees.award = 'oscar' AND nominees.edition_id = editions.id AND editions.iteration = %s
+            RETURNING nominees.id
             """,
             (edition,),
         )
+        nominee_ids = [r[0] for r in cur.fetchall()]
+
+    refresh_nomination_facts(nominee_ids)
 
 
 @transaction
@@ -743,8 +856,10 @@ def delete_nominees(matched_nominees: list[MatchedNominee]):
 
     For each nominee: deletes entries from associative tables, then deletes
     corresponding titles/entities if they have no more entries in associative
-    table, then deletes entry in `nominees`. Tables impacted: `nominees_titles`,
-    `titles`, `nominees_entities`, `entities`, `nominees`.
+    table, then deletes entry in `nominees`, whose `nomination_facts` rows are
+    deleted along with it. Tables impacted: `nominees_titles`, `titles`,
+    `nominees_entities`, `entities`, `nominees`, `nomination_facts`,
+    `data_versions`.
 
     Args:
         matched_nominees (list[MatchedNominee]): matched nominees to delete
@@ -757,13 +872,17 @@ def delete_nominees(matched_nominees: list[MatchedNominee]):
     if len(nominees) < len(matched_nominees):
         raise Exception("All nominees in `matched_nominees` must have an integer id")
 
+    # bump resources showing these nominees while their nomination_facts rows
+    # still exist
+    bump_data_versions([n.id for n in nominees])  # type: ignore
+
     with conn().cursor() as cur:
         for nominee in nominees:
             # delete from nominees_titles and potentially titles
             cur.execute(
                 """
                 DELETE FROM nominees_titles
-                WHERE nominee_id = %s
+                WHERE award = 'oscar' AND nominee_id = %s
                 RETURNING title_id
                 """,
                 (nominee.id,),
@@ -790,7 +909,7 @@ def delete_nominees(matched_nominees: list[MatchedNominee]):
             cur.execute(
                 """
                 DELETE FROM nominees_entities
-                WHERE nominee_id = %s
+                WHERE award = 'oscar' AND nominee_id = %s
                 RETURNING entity_id
                 """,
                 (nominee.id,),
@@ -815,11 +934,11 @@ def delete_nominees(matched_nominees: list[MatchedNominee]):
                     f"Deleted {len(deleted_entities)} entities from db: {deleted_entities}"
                 )
 
-            # delete from nominees
+            # delete from nominees (and nomination_facts, by ON DELETE CASCADE)
             cur.execute(
                 """
                 DELETE FROM nominees
-                WHERE id = %s
+                WHERE award = 'oscar' AND id = %s
                 """,
                 (nominee.id,),
             )
@@ -837,8 +956,8 @@ def replace_edition_category_name(
     causes the old category name (as well as its parent category and category
     group) to no longer have entries in `nominees`, they will be deleted.
 
-    Tables impacted: `editions_category_names`, `nominees`, `category_names`,
-    `categories`, `category_groups`.
+    Tables impacted: `editions_category_names`, `nominees`, `nomination_facts`,
+    `category_names`, `categories`, `category_groups`.
 
     Args:
         edition (int): edition of Oscars ceremony
@@ -880,10 +999,12 @@ def replace_edition_category_name(
             """
             UPDATE nominees
             SET category_name_id = %s
-            WHERE edition_id = %s AND category_name_id = %s
+            WHERE award = 'oscar' AND edition_id = %s AND category_name_id = %s
+            RETURNING id
             """,
             (new_category_name_id, edition_id, old_category_name_id),
         )
+        refresh_nomination_facts([r[0] for r in cur.fetchall()])
 
         cur.execute(
             """
@@ -1096,14 +1217,14 @@ def get_matched_categories_by_edition(edition: int) -> list[MatchedCategory]:
                 FROM nominees n
                 JOIN editions e ON e.id = n.edition_id
                 JOIN category_names cn ON cn.id = n.category_name_id 
-                WHERE e.iteration = %s
+                WHERE n.award = 'oscar' AND e.iteration = %s
             ),
             films as (
                 SELECT
                     nt.nominee_id AS nominee_id,
                     json_agg(json_build_array(t.title, t.imdb_id, nt.winner, nt.detail) ORDER BY t.title) AS films
                 FROM filtered_nominees fn
-                LEFT JOIN nominees_titles nt ON nt.nominee_id = fn.id 
+                LEFT JOIN nominees_titles nt ON nt.nominee_id = fn.id AND nt.award = 'oscar'
                 LEFT JOIN titles t ON t.id = nt.title_id
                 GROUP BY nt.nominee_id
             ),
@@ -1112,7 +1233,7 @@ def get_matched_categories_by_edition(edition: int) -> list[MatchedCategory]:
                     ne.nominee_id AS nominee_id,
                     json_agg(json_build_array(ne.name, en.imdb_id, ne.statement_ind, ne.role) ORDER BY ne.name) AS people
                 FROM filtered_nominees fn
-                LEFT JOIN nominees_entities ne ON ne.nominee_id = fn.id 
+                LEFT JOIN nominees_entities ne ON ne.nominee_id = fn.id AND ne.award = 'oscar'
                 LEFT JOIN entities en ON en.id = ne.entity_id
                 GROUP BY ne.nominee_id
             )
@@ -1170,9 +1291,9 @@ def export_nominations_to_csv():
             JOIN editions_category_names ecn ON ecn.category_name_id = cn.id
             JOIN editions e ON e.id = ecn.edition_id
             JOIN nominees n ON n.edition_id = e.id AND n.category_name_id = cn.id
-            LEFT JOIN nominees_entities ne ON ne.nominee_id = n.id
+            LEFT JOIN nominees_entities ne ON ne.nominee_id = n.id AND ne.award = n.award
             LEFT JOIN entities en ON en.id = ne.entity_id
-            LEFT JOIN nominees_titles nt ON nt.nominee_id = n.id
+            LEFT JOIN nominees_titles nt ON nt.nominee_id = n.id AND nt.award = n.award
             LEFT JOIN titles t ON t.id = nt.title_id
             WHERE n.award = 'oscar'
             ORDER BY e.iteration, c.id, n.winner DESC, n.id ASC, ne.statement_ind ASC, nt.winner DESC
@@ -1192,9 +1313,9 @@ def initialize_db(current_edition: int):
     """Initializes database after initial creation.
 
     Creates db objects and initializes it with data spanning from the 1st
-    edition to `current_edition`. The `data/oscars/imdb` and
-    `data/oscars/official` directories should already be populated with data for
-    all editions prior to calling this function.
+    edition to `current_edition`, including `nomination_facts`. The
+    `data/oscars/imdb` and `data/oscars/official` directories should already be
+    populated with data for all editions prior to calling this function.
 
     This function should not be used to update the db with new data. See
     `update.py` for details.
@@ -5,6 +5,7 @@
 #      specified in .env
 #   2. Creates new database with name PG_DBNAME using newly created user
 #   3. Restores oscy data from data/db.dump into this database
+#   4. Applies the scripts in backend/db/migrations to it
 
 set -e
 
@@ -17,3 +18,7 @@ set PGPASSWORD=$PG_PASSWORD
 createdb --username "$PG_USER" "$PG_DBNAME"
 
 pg_restore --no-owner --single-transaction --username "$PG_USER" --dbname "$PG_DBNAME" ./data/db.dump
+
+for f in ./migrations/*.sql; do
+	psql --variable ON_ERROR_STOP=1 --username "$PG_USER" --dbname "$PG_DBNAME" --file "$f"
+done
@@ -1,7 +1,8 @@
 #!/bin/bash
 
 # Interactive update script (for local use)
-#   1. Runs Python database update script
+#   1. Applies `backend/db/migrations` to the local database, then runs Python
+#      database update script
 #   2. Updates `README.md`
 #   3. Creates new `data/db.dump`
 #   4. Creates new `data/oscars.csv`
@@ -54,7 +55,15 @@ set -a
 source .env
 set +a
 
-# 1. Run interactive Python database update script
+# 1. Apply migrations (each is safe to re-run), so that the new dump and the
+#    production database include them, then run interactive Python database
+#    update script
+for f in backend/db/migrations/*.sql; do
+    psql --variable ON_ERROR_STOP=1 --username "$PG_USER" --dbname "$PG_DBNAME" --quiet --file "$f"
+done
+
+echo 'Applied migrations'
+
 cd backend
 source .venv/Scripts/activate
 